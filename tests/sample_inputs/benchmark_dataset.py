@@ -0,0 +1,9 @@
+import textattack
+
+dataset = textattack.datasets.Dataset(
+    [
+        ("the acting is superb and the plot is gripping", 1),
+        ("a dull , lifeless film that drags on forever", 0),
+        ("one of the most charming movies of the year", 1),
+    ]
+)
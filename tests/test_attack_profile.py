@@ -0,0 +1,288 @@
+import json
+
+import numpy as np
+import pytest
+
+import textattack
+from textattack.constraints.pre_transformation import RepeatModification
+from textattack.goal_functions import UntargetedClassification
+from textattack.models.wrappers import ModelWrapper
+from textattack.search_methods import GreedyWordSwapWIR
+from textattack.shared import attack_profile
+from textattack.shared.attack_profile import AttackProfile
+from textattack.transformations import WordSwapNeighboringCharacterSwap
+
+DATA = [
+    ("this movie is good and great fun", 1),
+    ("a good film", 1),
+    ("great acting and a good plot overall", 1),
+    ("so great", 1),
+]
+
+
+class ToyModelWrapper(ModelWrapper):
+    """Scores texts by the words "good" and "great" they contain, and by
+    their characters, so that character swaps change the scores."""
+
+    def __init__(self):
+        self.model = None
+
+    def __call__(self, text_list):
+        outputs = []
+        for text in text_list:
+            score = sum(ord(c) for c in text) % 97 / 97.0
+            num_positive_words = ("good" in text) + ("great" in text)
+            p = min(0.99, 0.3 + 0.3 * num_positive_words + 0.1 * score)
+            outputs.append([1 - p, p])
+        return np.array(outputs)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces the timer of the profile with a clock that only moves when
+    ``clock.tick`` is called."""
+
+    class Clock:
+        now = 100.0
+
+        def tick(self, seconds):
+            self.now += seconds
+
+    clock = Clock()
+    monkeypatch.setattr(attack_profile, "default_timer", lambda: clock.now)
+    return clock
+
+
+def test_nested_timers_add_up(clock):
+    profile = AttackProfile(["MaxWordsPerturbed"])
+
+    with profile.timer("search_method"):
+        clock.tick(1)
+        with profile.timer("goal_function"):
+            clock.tick(2)
+        with profile.timer("constraints", "MaxWordsPerturbed"):
+            clock.tick(3)
+        with profile.timer("constraints", "MaxWordsPerturbed"):
+            clock.tick(4)
+    # Stages that are not known in advance are added.
+    with profile.timer("constraints", "PartOfSpeech"):
+        clock.tick(5)
+
+    assert profile.timers == {
+        "constraints": {"MaxWordsPerturbed": 7, "PartOfSpeech": 5},
+        "transformation": 0,
+        "search_method": 10,
+        "goal_function": 2,
+    }
+
+
+def test_timer_counts_time_of_failed_calls(clock):
+    profile = AttackProfile()
+    with pytest.raises(ValueError):
+        with profile.timer("transformation"):
+            clock.tick(1)
+            raise ValueError
+    assert profile.timers["transformation"] == 1
+
+
+def profile_example(profile, clock, cache_stats):
+    """Profiles an example that takes 3 seconds and 5 queries, and updates
+    the running ``cache_stats`` of the model cache."""
+    state = profile.start_example({"model": dict(cache_stats)})
+    with profile.timer("search_method"):
+        clock.tick(2)
+        profile.count("transformations", n=4)
+        profile.count("constraints", "MaxWordsPerturbed", "candidates", n=4)
+        profile.count("constraints", "MaxWordsPerturbed", "passed", n=3)
+        profile.count("caches", "transformation", "misses")
+    clock.tick(1)
+    cache_stats["hits"] += 2
+    cache_stats["misses"] += 5
+    return profile.end_example(state, 5, {"model": dict(cache_stats)})
+
+
+@pytest.mark.parametrize("record_examples", [False, True])
+def test_end_example_adds_example_to_totals(clock, record_examples):
+    profile = AttackProfile(["MaxWordsPerturbed"], record_examples=record_examples)
+    # The running counts of the model cache include earlier lookups.
+    cache_stats = {"hits": 10, "misses": 10}
+
+    records = [profile_example(profile, clock, cache_stats) for _ in range(2)]
+
+    assert profile.total_time == 6
+    assert profile.timers["search_method"] == 4
+    assert profile.counters["examples"] == 2
+    assert profile.counters["queries"] == 10
+    assert profile.counters["transformations"] == 8
+    assert profile.counters["constraints"]["MaxWordsPerturbed"] == {
+        "candidates": 8,
+        "passed": 6,
+    }
+    assert profile.counters["caches"]["model"] == {"hits": 4, "misses": 10}
+    assert profile.counters["caches"]["transformation"] == {"hits": 0, "misses": 2}
+    if not record_examples:
+        assert records == [None, None]
+        assert profile.examples == []
+        return
+
+    assert profile.examples == records
+    for record in records:
+        assert record["time"] == 3
+        assert record["timers"]["search_method"] == 2
+        assert record["counters"]["examples"] == 1
+        assert record["counters"]["queries"] == 5
+        assert record["counters"]["caches"]["model"] == {"hits": 2, "misses": 5}
+        assert "events" not in record
+
+
+@pytest.mark.parametrize("record_examples", [False, True])
+def test_add_example_merges_records_of_other_profiles(clock, record_examples):
+    worker_profile = AttackProfile(["MaxWordsPerturbed"], record_examples=True)
+    record = profile_example(worker_profile, clock, {"hits": 0, "misses": 0})
+    profile = AttackProfile(["MaxWordsPerturbed"], record_examples=record_examples)
+
+    profile.add_example(record)
+    profile.add_example(record)
+
+    assert profile.total_time == 6
+    assert profile.timers["search_method"] == 4
+    assert profile.counters["examples"] == 2
+    assert profile.counters["queries"] == 10
+    assert profile.counters["caches"]["model"] == {"hits": 4, "misses": 10}
+    assert profile.examples == ([record, record] if record_examples else [])
+
+
+def test_pop_totals_resets_totals(clock):
+    worker_profile = AttackProfile(["MaxWordsPerturbed"])
+    profile = AttackProfile(["MaxWordsPerturbed"])
+    expected_profile = AttackProfile(["MaxWordsPerturbed"])
+    cache_stats = {"hits": 0, "misses": 0}
+    expected_cache_stats = {"hits": 0, "misses": 0}
+
+    for _ in range(2):
+        profile_example(worker_profile, clock, cache_stats)
+        profile.add_example(worker_profile.pop_totals())
+        profile_example(expected_profile, clock, expected_cache_stats)
+
+    assert worker_profile.total_time == 0
+    assert worker_profile.counters["examples"] == 0
+    assert worker_profile.timers["constraints"] == {"MaxWordsPerturbed": 0}
+    assert profile.total_time == expected_profile.total_time
+    assert profile.timers == expected_profile.timers
+    assert profile.counters == expected_profile.counters
+    assert profile.examples == []
+
+
+def test_summary_rows(clock):
+    profile = AttackProfile(["MaxWordsPerturbed", "PartOfSpeech"])
+    cache_stats = {"hits": 0, "misses": 0}
+    for _ in range(2):
+        profile_example(profile, clock, cache_stats)
+    with profile.timer("constraints", "PartOfSpeech"):
+        clock.tick(0.5)
+
+    assert profile.summary_rows() == [
+        ["Total attack time (s):", 6],
+        ["Avg attack time per example (s):", 3],
+        ["Search method time (s):", 4],
+        ["Goal function time (s):", 0],
+        ["Transformation time (s):", 0],
+        ["MaxWordsPerturbed time (s):", 0],
+        ["PartOfSpeech time (s):", 0.5],
+        ["Avg num queries per example:", 5],
+        ["Avg num transformations per example:", 4],
+        # Constraints and caches that were never used are left out.
+        ["MaxWordsPerturbed candidates filtered:", "25.0%"],
+        ["Transformation cache hit rate:", "0.0%"],
+        ["Model cache hit rate:", "28.57%"],
+    ]
+    assert AttackProfile().summary_rows()[:2] == [
+        ["Total attack time (s):", 0],
+        ["Avg attack time per example (s):", 0],
+    ]
+
+
+def test_export_chrome_trace(clock, tmp_path):
+    profile = AttackProfile(trace=True, record_examples=True)
+    for _ in range(2):
+        state = profile.start_example()
+        clock.tick(1)
+        with profile.timer("search_method"):
+            with profile.timer("constraints", "MaxWordsPerturbed"):
+                clock.tick(0.25)
+        profile.end_example(state, 0)
+    path = tmp_path / "trace.json"
+
+    profile.export_chrome_trace(str(path))
+
+    with open(path) as f:
+        trace = json.load(f)
+    assert trace["displayTimeUnit"] == "ms"
+    events = [
+        (event["name"], event["cat"], event["ts"], event["dur"], event["tid"])
+        for event in trace["traceEvents"]
+    ]
+    # Times are in microseconds since the start of the first example.
+    assert events == [
+        ("attack", "attack", 0, 1.25e6, 0),
+        ("constraints/MaxWordsPerturbed", "constraints", 1e6, 0.25e6, 0),
+        ("search_method", "search_method", 1e6, 0.25e6, 0),
+        ("attack", "attack", 1.25e6, 1.25e6, 1),
+        ("constraints/MaxWordsPerturbed", "constraints", 2.25e6, 0.25e6, 1),
+        ("search_method", "search_method", 2.25e6, 0.25e6, 1),
+    ]
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
+    # Events are not kept in the records saved as JSON.
+    assert all("events" not in record for record in profile.example_records())
+
+
+def test_json_summary_logger_saves_example_records(clock, tmp_path):
+    profile = AttackProfile(["MaxWordsPerturbed"], trace=True, record_examples=True)
+    profile_example(profile, clock, {"hits": 0, "misses": 0})
+    filename = str(tmp_path / "summary.json")
+    json_logger = textattack.loggers.JsonSummaryLogger(filename=filename)
+
+    json_logger.log_attack_profile(profile)
+    json_logger.flush()
+
+    with open(filename) as f:
+        summary = json.load(f)
+    assert summary["Attack Profile Per Example"] == profile.example_records()
+    assert summary["Attack Profile Per Example"][0]["counters"]["queries"] == 5
+
+
+def attack_dataset(enable_profiling, **kwargs):
+    attack = textattack.Attack(
+        UntargetedClassification(ToyModelWrapper()),
+        [RepeatModification()],
+        WordSwapNeighboringCharacterSwap(random_one=False),
+        GreedyWordSwapWIR("delete"),
+    )
+    attack_args = textattack.AttackArgs(
+        num_examples=len(DATA),
+        enable_profiling=enable_profiling,
+        disable_stdout=True,
+        silent=True,
+        **kwargs,
+    )
+    attacker = textattack.Attacker(
+        attack, textattack.datasets.Dataset(DATA), attack_args
+    )
+    results = attacker.attack_dataset()
+    return attack.profile, results
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"num_concurrent_examples": 2}, {"parallel": True, "num_cpu_workers": 2}],
+)
+@pytest.mark.parametrize("enable_profiling", [False, True])
+def test_attacker_profiles_every_example(enable_profiling, kwargs):
+    profile, results = attack_dataset(enable_profiling, **kwargs)
+
+    assert profile.counters["examples"] == len(DATA)
+    assert profile.counters["queries"] == sum(result.num_queries for result in results)
+    assert profile.counters["transformations"] > 0
+    assert profile.timers["search_method"] > 0
+    assert profile.total_time > 0
+    assert len(profile.examples) == (len(DATA) if enable_profiling else 0)
@@ -203,4 +203,34 @@ class TestAttackedText:
             "tan",
         ]
 
+    def test_word_swap_matches_full_rebuild(self, attacked_text, attacked_text_pair):
+        for text in (attacked_text, attacked_text_pair):
+            indices = [0, 3, text.num_words - 1]
+            new_words = ["The", "down", "it's"]
+            words = text.words[:]
+            for i, new_word in zip(indices, new_words):
+                words[i] = new_word
+            swapped_text = text.replace_words_at_indices(indices, new_words)
+            rebuilt_text = text.generate_new_attacked_text(words)
+            assert swapped_text == rebuilt_text
+            assert swapped_text.words == textattack.shared.AttackedText(
+                swapped_text._text_input
+            ).words
+
+    def test_language_inherited(self, attacked_text, monkeypatch):
+        assert attacked_text.language == "ENGLISH"
+        detected_texts = []
+
+        def detect_language(s):
+            detected_texts.append(s)
+            return "Unknown"
+
+        monkeypatch.setattr(
+            textattack.shared.attacked_text, "detect_language", detect_language
+        )
+        new_text = attacked_text.replace_word_at_index(3, "down")
+        assert new_text.language == "ENGLISH"
+        assert detected_texts == []
+        assert new_text.words == textattack.shared.utils.words_from_text(new_text.text)
+
     # TODO: test align_words_with_tokens
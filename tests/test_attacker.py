@@ -0,0 +1,148 @@
+import numpy as np
+import pytest
+
+import textattack
+from textattack.attack_results import SuccessfulAttackResult
+from textattack.constraints import Constraint
+from textattack.constraints.pre_transformation import RepeatModification
+from textattack.goal_functions import UntargetedClassification
+from textattack.models.wrappers import ModelWrapper
+from textattack.search_methods import GreedyWordSwapWIR
+from textattack.transformations import WordSwapNeighboringCharacterSwap
+
+DATA = [
+    ("this movie is good and great fun", 1),
+    ("a good film", 1),
+    ("bad", 0),
+    ("great acting and a good plot overall", 1),
+    ("the good the bad", 1),
+    ("so great", 1),
+]
+
+
+class ToyModelWrapper(ModelWrapper):
+    """Scores texts by the words "good" and "great" they contain, and by
+    their characters, so that character swaps change the scores."""
+
+    def __init__(self):
+        self.model = None
+
+    def __call__(self, text_list):
+        outputs = []
+        for text in text_list:
+            score = sum(ord(c) for c in text) % 97 / 97.0
+            num_positive_words = ("good" in text) + ("great" in text)
+            p = min(0.99, 0.3 + 0.3 * num_positive_words + 0.1 * score)
+            outputs.append([1 - p, p])
+        return np.array(outputs)
+
+
+class CountingConstraint(Constraint):
+    """Accepts every transformation, and counts how many times its cache
+    is cleared."""
+
+    def __init__(self):
+        super().__init__(compare_against_original=True)
+        self.num_clears = 0
+
+    def _check_constraint(self, transformed_text, reference_text):
+        return True
+
+    def clear_cache(self):
+        self.num_clears += 1
+
+
+def attack_dataset(num_concurrent_examples=1, **kwargs):
+    constraint = CountingConstraint()
+    attack = textattack.Attack(
+        UntargetedClassification(ToyModelWrapper()),
+        [RepeatModification(), constraint],
+        WordSwapNeighboringCharacterSwap(random_one=False),
+        GreedyWordSwapWIR("delete"),
+    )
+    kwargs.setdefault("num_examples", len(DATA))
+    attack_args = textattack.AttackArgs(
+        num_concurrent_examples=num_concurrent_examples,
+        disable_stdout=True,
+        silent=True,
+        **kwargs,
+    )
+    attacker = textattack.Attacker(
+        attack, textattack.datasets.Dataset(DATA), attack_args
+    )
+    return attacker.attack_dataset(), constraint
+
+
+@pytest.mark.parametrize("num_concurrent_examples", [2, 4])
+def test_concurrent_examples_match_sequential_attack(num_concurrent_examples):
+    sequential_results, _ = attack_dataset(1)
+    concurrent_results, constraint = attack_dataset(num_concurrent_examples)
+
+    assert [type(result) for result in concurrent_results] == [
+        type(result) for result in sequential_results
+    ]
+    assert [result.perturbed_text() for result in concurrent_results] == [
+        result.perturbed_text() for result in sequential_results
+    ]
+    assert [result.num_queries for result in concurrent_results] == [
+        result.num_queries for result in sequential_results
+    ]
+    # Shared constraints are only cleared once no example is being attacked.
+    assert constraint.num_clears == 1
+
+
+@pytest.fixture
+def saved_checkpoints(monkeypatch):
+    """Records the results, worklist and candidates of each checkpoint saved
+    by the attacker, instead of saving it."""
+    saved = []
+
+    def save(checkpoint, quiet=False):
+        saved.append(
+            (
+                [
+                    result.perturbed_text()
+                    for result in checkpoint.attack_log_manager.results
+                ],
+                list(checkpoint.worklist),
+                list(checkpoint.worklist_candidates),
+            )
+        )
+
+    monkeypatch.setattr(textattack.shared.AttackCheckpoint, "save", save)
+    return saved
+
+
+@pytest.mark.parametrize(
+    "attack_args",
+    [
+        {"num_examples": len(DATA), "checkpoint_interval": 2},
+        {"num_successful_examples": 3},
+    ],
+)
+def test_cpu_workers_release_results_in_order(tmp_path, saved_checkpoints, attack_args):
+    attack_args = dict(attack_args, checkpoint_dir=str(tmp_path))
+    sequential_results, _ = attack_dataset(**attack_args)
+    sequential_checkpoints = saved_checkpoints[:]
+    saved_checkpoints.clear()
+
+    parallel_results, _ = attack_dataset(
+        parallel=True, num_cpu_workers=3, **attack_args
+    )
+
+    assert [result.perturbed_text() for result in parallel_results] == [
+        result.perturbed_text() for result in sequential_results
+    ]
+    assert [result.num_queries for result in parallel_results] == [
+        result.num_queries for result in sequential_results
+    ]
+    assert saved_checkpoints == sequential_checkpoints
+    if "checkpoint_interval" in attack_args:
+        assert len(saved_checkpoints) == len(DATA) // 2
+    else:
+        # Examples that were not successful were replaced by the next candidates.
+        num_successes = sum(
+            isinstance(result, SuccessfulAttackResult) for result in parallel_results
+        )
+        assert num_successes == 3
+        assert len(parallel_results) > 3
@@ -0,0 +1,134 @@
+import collections
+import os
+import pickle
+
+import textattack
+from textattack.attack_results import FailedAttackResult, SuccessfulAttackResult
+from textattack.goal_function_results.classification_goal_function_result import (
+    ClassificationGoalFunctionResult,
+)
+from textattack.shared import AttackCheckpoint, AttackedText, AttackJournal
+
+
+def goal_function_result(text, num_queries=1):
+    return ClassificationGoalFunctionResult(
+        AttackedText(text), None, 1, None, 0.5, num_queries, 1
+    )
+
+
+def example_results(text):
+    """Two perturbations of ``text``, which share its original result, as
+    returned by an attack with several results per example."""
+    original = goal_function_result(text)
+    return [
+        SuccessfulAttackResult(original, goal_function_result("one " + text, 5)),
+        SuccessfulAttackResult(original, goal_function_result("two " + text, 7)),
+    ]
+
+
+def make_checkpoint(checkpoint_dir, examples, num_examples, journal=None):
+    attack_args = textattack.AttackArgs(
+        num_examples=num_examples, checkpoint_dir=str(checkpoint_dir)
+    )
+    attack_log_manager = textattack.loggers.AttackLogManager()
+    for results in examples:
+        for result in results:
+            attack_log_manager.log_result(result)
+        if journal is not None:
+            journal.append(results)
+    worklist = collections.deque(range(len(examples), num_examples))
+    return AttackCheckpoint(
+        attack_args,
+        attack_log_manager,
+        worklist,
+        collections.deque(),
+        journal=journal,
+    )
+
+
+def saved_path(checkpoint):
+    return os.path.join(
+        checkpoint.attack_args.checkpoint_dir,
+        "{}.ta.chkpt".format(int(checkpoint.time * 1000)),
+    )
+
+
+def test_journal_keeps_results_of_an_example_together(tmp_path):
+    examples = [
+        example_results("a good film"),
+        [
+            FailedAttackResult(
+                goal_function_result("a great movie"),
+                goal_function_result("a great movie", 9),
+            )
+        ],
+    ]
+    journal = AttackJournal.create(str(tmp_path))
+    checkpoint = make_checkpoint(tmp_path, examples, 3, journal=journal)
+    live_metrics = checkpoint.attack_log_manager.live_metrics()
+    checkpoint.save(quiet=True)
+
+    loaded = AttackCheckpoint.load(saved_path(checkpoint))
+    results = loaded.attack_log_manager.results
+
+    assert len(results) == 3
+    assert results[0].original_result is results[1].original_result
+    assert loaded.attack_log_manager.live_metrics() == live_metrics
+    assert live_metrics["successful_attacks"] == 1
+    assert live_metrics["successful_peturbs"] == 2
+    assert live_metrics["failed_attacks"] == 1
+    assert loaded.results_count == 2
+    assert len(loaded.attack_log_manager.batched_results) == 2
+
+
+def test_journal_drops_records_after_resumed_checkpoint(tmp_path):
+    journal = AttackJournal.create(str(tmp_path))
+    checkpoint = make_checkpoint(
+        tmp_path, [example_results("first"), example_results("second")], 4, journal
+    )
+    checkpoint.save(quiet=True)
+    # Records appended after the checkpoint, e.g. before the attack crashed.
+    journal.append(example_results("lost"))
+    journal.flush()
+
+    loaded = AttackCheckpoint.load(saved_path(checkpoint))
+    loaded.journal.append(example_results("third"))
+    loaded.journal.flush()
+
+    texts = [
+        result.original_result.attacked_text.text for result in loaded.journal.read()
+    ]
+    assert texts == ["first"] * 2 + ["second"] * 2 + ["third"] * 2
+
+
+def test_load_checkpoint_without_journal(tmp_path, monkeypatch):
+    checkpoint = make_checkpoint(
+        tmp_path, [example_results("first"), example_results("second")], 3
+    )
+    live_metrics = checkpoint.attack_log_manager.live_metrics()
+
+    # Checkpoints saved before journals and running metrics were added.
+    monkeypatch.setattr(
+        AttackCheckpoint,
+        "__getstate__",
+        lambda self: {k: v for k, v in self.__dict__.items() if k != "journal"},
+    )
+    monkeypatch.setattr(
+        textattack.loggers.AttackLogManager,
+        "__getstate__",
+        lambda self: {
+            k: v
+            for k, v in self.__dict__.items()
+            if k in ("loggers", "results", "enable_advance_metrics")
+        },
+    )
+    with open(saved_path(checkpoint), "wb") as f:
+        pickle.dump(checkpoint, f)
+    monkeypatch.undo()
+
+    loaded = AttackCheckpoint.load(saved_path(checkpoint))
+
+    assert loaded.journal is None
+    assert loaded.results_count == 2
+    assert loaded.num_successful_attacks == 2
+    assert loaded.attack_log_manager.live_metrics() == live_metrics
@@ -0,0 +1,26 @@
+import json
+
+from helpers import run_command_and_get_result
+
+
+def test_command_line_benchmark_recipe():
+    """Tests that `textattack benchmark-recipe` reports the latency of the
+    examples attacked."""
+    command = (
+        "textattack benchmark-recipe --recipe deepwordbug --random-model lstm -n 2 "
+        "--dataset-from-file tests/sample_inputs/benchmark_dataset.py"
+    )
+    result = run_command_and_get_result(command)
+
+    stdout = result.stdout.decode().strip()
+    print("stdout =>", stdout)
+    print("stderr =>", result.stderr.decode().strip())
+    assert result.returncode == 0
+
+    report = json.loads(stdout)
+    assert report["recipe"] == "deepwordbug"
+    assert report["num_examples"] == 2
+    assert sum(report["results"].values()) == 2
+    for stat in ["mean", "p50", "p95", "max"]:
+        assert isinstance(report["latency"][stat], float)
+    assert report["latency"]["p50"] <= report["latency"]["max"]
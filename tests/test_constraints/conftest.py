@@ -0,0 +1,50 @@
+import pytest
+
+
+def _transformed_texts(reference_text, replacements, multi_word_swaps=()):
+    """Returns every swap of one word of ``reference_text`` with a word of
+    ``replacements`` that changes the text, followed by a swap for each
+    ``(indices, words)`` pair of ``multi_word_swaps``."""
+    texts = []
+    for i in range(reference_text.num_words):
+        for word in replacements:
+            text = reference_text.replace_word_at_index(i, word)
+            if text.text != reference_text.text:
+                texts.append(text)
+    for indices, words in multi_word_swaps:
+        texts.append(reference_text.replace_words_at_indices(indices, words))
+    return texts
+
+
+def _check_batched_matches_scalar(
+    constraint, transformed_texts, reference_text, scalar_constraint=None
+):
+    """Checks that ``constraint._check_constraint_many`` keeps the same texts
+    as calling ``_check_constraint`` of ``scalar_constraint`` (or of
+    ``constraint``) on each text, and that it keeps some but not all of
+    them.
+
+    Returns:
+        The texts kept by ``_check_constraint_many``.
+    """
+    if scalar_constraint is None:
+        scalar_constraint = constraint
+    batched = constraint._check_constraint_many(transformed_texts, reference_text)
+    scalar = [
+        text
+        for text in transformed_texts
+        if scalar_constraint._check_constraint(text, reference_text)
+    ]
+    assert [text.text for text in batched] == [text.text for text in scalar]
+    assert 0 < len(batched) < len(transformed_texts)
+    return batched
+
+
+@pytest.fixture
+def transformed_texts():
+    return _transformed_texts
+
+
+@pytest.fixture
+def check_batched_matches_scalar():
+    return _check_batched_matches_scalar
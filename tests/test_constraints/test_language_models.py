@@ -0,0 +1,194 @@
+import json
+
+import pytest
+import torch
+import transformers
+from transformers.models.gpt2.tokenization_gpt2 import bytes_to_unicode
+
+import textattack
+from textattack.constraints.grammaticality.language_models import (
+    GPT2,
+    LearningToWriteLanguageModel,
+)
+from textattack.constraints.grammaticality.language_models.learning_to_write import (
+    language_model_helpers,
+)
+from textattack.constraints.grammaticality.language_models.learning_to_write.rnn_model import (
+    RNNModel,
+)
+from textattack.shared import AttackedText
+from textattack.shared.utils import has_letter
+
+REFERENCE_TEXT = "the quick brown fox jumps over the lazy dog"
+REPLACEMENTS = ["cat", "jumped", "slow", "a", "red", "under"]
+MULTI_WORD_SWAPS = [([2, 4], ["red", "ran"]), ([0, 8], ["a", "cat"])]
+
+
+class ForwardPassCounter:
+    def __init__(self, model):
+        self.num_passes = 0
+        model.register_forward_hook(self.count)
+
+    def count(self, module, inputs, outputs):
+        self.num_passes += 1
+
+
+@pytest.fixture
+def gpt2(tmp_path, monkeypatch):
+    """A GPT2 constraint with a tiny random model, and a tokenizer that
+    splits words into characters."""
+    vocab = {c: i for i, c in enumerate(bytes_to_unicode().values())}
+    vocab["<|endoftext|>"] = len(vocab)
+    with open(tmp_path / "vocab.json", "w") as f:
+        json.dump(vocab, f)
+    with open(tmp_path / "merges.txt", "w") as f:
+        f.write("#version: 0.2\n")
+    tokenizer = transformers.GPT2Tokenizer(
+        str(tmp_path / "vocab.json"), str(tmp_path / "merges.txt")
+    )
+    torch.manual_seed(0)
+    config = transformers.GPT2Config(
+        vocab_size=len(vocab), n_positions=128, n_embd=16, n_layer=1, n_head=2
+    )
+    model = transformers.GPT2LMHeadModel(config).eval()
+    monkeypatch.setattr(
+        transformers.GPT2LMHeadModel, "from_pretrained", lambda name: model
+    )
+    monkeypatch.setattr(
+        transformers.GPT2Tokenizer, "from_pretrained", lambda name: tokenizer
+    )
+    return GPT2(max_log_prob_diff=0.1)
+
+
+def old_gpt2_check(gpt2, transformed_text, reference_text):
+    """The check of ``GPT2`` before candidates were scored per prefix: one
+    forward pass for each candidate and modified index."""
+    for i in transformed_text.attack_attrs["newly_modified_indices"]:
+        prefix = reference_text.text_until_word_index(i)
+        if not has_letter(prefix):
+            continue
+        token_ids = torch.tensor([gpt2.tokenizer.encode(prefix)])
+        with torch.no_grad():
+            logits = gpt2.model(token_ids.to(textattack.shared.utils.device))[0]
+        ref_prob = logits[0, -1, gpt2.tokenizer.encode(reference_text.words[i])[0]]
+        prob = logits[0, -1, gpt2.tokenizer.encode(transformed_text.words[i])[0]]
+        if prob <= ref_prob - gpt2.max_log_prob_diff:
+            return False
+    return True
+
+
+def test_gpt2_check_constraint_many_matches_old_check(gpt2, transformed_texts):
+    reference_text = AttackedText(REFERENCE_TEXT)
+    texts = transformed_texts(reference_text, REPLACEMENTS, MULTI_WORD_SWAPS)
+
+    batched = gpt2._check_constraint_many(texts, reference_text)
+    old = [text for text in texts if old_gpt2_check(gpt2, text, reference_text)]
+
+    assert [text.text for text in batched] == [text.text for text in old]
+    assert 0 < len(batched) < len(texts)
+    assert [
+        text.text for text in texts if gpt2._check_constraint(text, reference_text)
+    ] == [text.text for text in old]
+
+
+def test_gpt2_runs_one_forward_pass_per_prefix(gpt2, transformed_texts):
+    reference_text = AttackedText(REFERENCE_TEXT)
+    texts = transformed_texts(reference_text, REPLACEMENTS, MULTI_WORD_SWAPS)
+    counter = ForwardPassCounter(gpt2.model)
+
+    batched = gpt2._check_constraint_many(texts, reference_text)
+
+    prefixes = {
+        reference_text.text_until_word_index(i)
+        for text in texts
+        for i in text.attack_attrs["newly_modified_indices"]
+    }
+    assert counter.num_passes == len([p for p in prefixes if has_letter(p)])
+    assert counter.num_passes < len(texts)
+
+    # Repeated calls read the next-word logits of each prefix from the cache.
+    assert gpt2._check_constraint_many(texts, reference_text) == batched
+    assert counter.num_passes == len([p for p in prefixes if has_letter(p)])
+
+    num_passes = counter.num_passes
+    gpt2.clear_cache()
+    gpt2._check_constraint_many(
+        [reference_text.replace_word_at_index(1, "slow")], reference_text
+    )
+    assert counter.num_passes == num_passes + 1
+
+
+@pytest.fixture
+def learning_to_write(monkeypatch):
+    """A Learning To Write constraint with a tiny random RNN language model,
+    that records the sentences of each query."""
+    words = ["<S>"] + REFERENCE_TEXT.split() + REPLACEMENTS + ["ran"]
+    word_to_idx = {word: i for i, word in enumerate(dict.fromkeys(words))}
+    torch.manual_seed(0)
+    model = RNNModel(
+        "GRU",
+        len(word_to_idx),
+        8,
+        16,
+        1,
+        [4, len(word_to_idx)],
+        dropout=0.0,
+        proj=True,
+        lm1b=True,
+    )
+    model.full = True
+    model.eval()
+    query_handler = language_model_helpers.QueryHandler(
+        model, word_to_idx, torch.arange(len(word_to_idx)), torch.device("cpu")
+    )
+    query_handler.queries = []
+    query = query_handler.query
+
+    def recording_query(sentences, swapped_words, batch_size=32):
+        query_handler.queries.append(list(sentences))
+        return query(sentences, swapped_words, batch_size=batch_size)
+
+    query_handler.query = recording_query
+    monkeypatch.setattr(
+        textattack.shared.utils, "download_from_s3", lambda path: "unused"
+    )
+    monkeypatch.setattr(
+        language_model_helpers.QueryHandler,
+        "load_model",
+        lambda path, device: query_handler,
+    )
+    return LearningToWriteLanguageModel(window_size=3, max_log_prob_diff=0.2)
+
+
+def old_check(constraint, transformed_text, reference_text):
+    """The check of ``LanguageModelConstraint`` before candidates were
+    batched: the reference and each candidate are scored in pairs."""
+    for i in transformed_text.attack_attrs["newly_modified_indices"]:
+        ref_prob, prob = constraint.get_log_probs_at_index(
+            (reference_text, transformed_text), i
+        )
+        if prob <= ref_prob - constraint.max_log_prob_diff:
+            return False
+    return True
+
+
+def test_learning_to_write_check_constraint_many_matches_old_check(
+    learning_to_write, transformed_texts
+):
+    reference_text = AttackedText(REFERENCE_TEXT)
+    texts = transformed_texts(reference_text, REPLACEMENTS, MULTI_WORD_SWAPS)
+
+    batched = learning_to_write._check_constraint_many(texts, reference_text)
+    queries = learning_to_write.query_handler.queries[:]
+    old = [text for text in texts if old_check(learning_to_write, text, reference_text)]
+
+    assert [text.text for text in batched] == [text.text for text in old]
+    assert 0 < len(batched) < len(texts)
+    # One query per modified index, of the reference and all texts modified there.
+    modified_indices = [
+        i for text in texts for i in text.attack_attrs["newly_modified_indices"]
+    ]
+    assert len(queries) == len(set(modified_indices))
+    assert sum(len(sentences) for sentences in queries) == len(queries) + len(
+        modified_indices
+    )
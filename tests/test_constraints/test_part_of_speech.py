@@ -0,0 +1,65 @@
+import pytest
+
+from textattack.constraints.grammaticality import PartOfSpeech
+from textattack.shared import AttackedText
+
+REPLACEMENTS = ["film", "watched", "quickly", "happy", "the", "run", "they"]
+MULTI_WORD_SWAPS = [([1, 3], ["film", "happy"]), ([1, 3], ["film", "quickly"])]
+
+
+@pytest.mark.parametrize("allow_verb_noun_swap", [True, False])
+def test_batched_and_scalar_checks_agree(
+    transformed_texts, check_batched_matches_scalar, allow_verb_noun_swap
+):
+    reference_text = AttackedText(
+        "the movie was surprisingly good and i enjoyed every minute of it"
+    )
+    texts = transformed_texts(reference_text, REPLACEMENTS, MULTI_WORD_SWAPS)
+    # Separate constraints, so that the scalar check does not reuse the tags
+    # cached by the batched check.
+    check_batched_matches_scalar(
+        PartOfSpeech(allow_verb_noun_swap=allow_verb_noun_swap),
+        texts,
+        reference_text,
+        scalar_constraint=PartOfSpeech(allow_verb_noun_swap=allow_verb_noun_swap),
+    )
+
+
+class StubPartOfSpeech(PartOfSpeech):
+    """Tags words by their length, and counts the contexts tagged."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.num_tagged_contexts = 0
+
+    @staticmethod
+    def _tag(word):
+        if len(word) % 2:
+            return "NOUN"
+        return "VERB" if len(word) % 3 else "ADJ"
+
+    def _tag_contexts(self, contexts):
+        self.num_tagged_contexts += len(contexts)
+        return [
+            (context_words, [self._tag(word) for word in context_words])
+            for context_words in contexts
+        ]
+
+
+def test_batched_and_scalar_checks_agree_with_stub_tagger(
+    transformed_texts, check_batched_matches_scalar
+):
+    reference_text = AttackedText("the quick brown fox jumps over the lazy dog")
+    texts = transformed_texts(reference_text, REPLACEMENTS, MULTI_WORD_SWAPS)
+    batched_constraint = StubPartOfSpeech(allow_verb_noun_swap=False)
+    scalar_constraint = StubPartOfSpeech(allow_verb_noun_swap=False)
+
+    check_batched_matches_scalar(
+        batched_constraint,
+        texts,
+        reference_text,
+        scalar_constraint=scalar_constraint,
+    )
+    assert (
+        batched_constraint.num_tagged_contexts == scalar_constraint.num_tagged_contexts
+    )
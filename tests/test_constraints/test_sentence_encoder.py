@@ -0,0 +1,90 @@
+import string
+
+import numpy as np
+import pytest
+import torch
+
+from textattack.constraints.semantics.sentence_encoders import SentenceEncoder
+from textattack.shared import AttackedText
+
+REFERENCE_TEXT = "the quick brown fox jumps over the lazy dog"
+
+
+class StubSentenceEncoder(SentenceEncoder):
+    """Encodes sentences by their letter counts, and records the sentences
+    of each call to ``encode``."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    def encode(self, sentences):
+        self.calls.append(list(sentences))
+        return np.array(
+            [
+                [sentence.count(letter) for letter in string.ascii_lowercase]
+                for sentence in sentences
+            ],
+            dtype=np.float32,
+        )
+
+
+def transformed_texts_with_repeat(transformed_texts, reference_text):
+    texts = transformed_texts(reference_text, ["cat", "jumped"])
+    # A text transformed twice the same way.
+    texts.append(texts[0])
+    return texts
+
+
+@pytest.mark.parametrize("metric", ["cosine", "angular", "max_euclidean"])
+@pytest.mark.parametrize("window_size", [None, 3])
+def test_sim_score_matches_score_list(transformed_texts, metric, window_size):
+    reference_text = AttackedText(REFERENCE_TEXT)
+    texts = transformed_texts_with_repeat(transformed_texts, reference_text)
+    encoder = StubSentenceEncoder(metric=metric, window_size=window_size)
+
+    scores = encoder._score_list(reference_text, texts)
+    scalar_encoder = StubSentenceEncoder(metric=metric, window_size=window_size)
+    scalar_scores = torch.cat(
+        [scalar_encoder._sim_score(reference_text, text) for text in texts]
+    )
+
+    assert scores.shape == (len(texts),)
+    assert torch.allclose(scores, scalar_scores)
+
+
+def test_score_list_encodes_each_window_once(transformed_texts):
+    reference_text = AttackedText(REFERENCE_TEXT)
+    texts = transformed_texts_with_repeat(transformed_texts, reference_text)
+    encoder = StubSentenceEncoder(window_size=3)
+
+    encoder._score_list(reference_text, texts)
+
+    windows = set()
+    for text in texts:
+        i = next(iter(text.attack_attrs["newly_modified_indices"]))
+        windows.add(reference_text.text_window_around_index(i, 3))
+        windows.add(text.text_window_around_index(i, 3))
+    assert len(encoder.calls) == 1
+    assert sorted(encoder.calls[0]) == sorted(windows)
+
+
+def test_encode_cached_only_encodes_missing_sentences():
+    encoder = StubSentenceEncoder()
+    sentences = ["a good movie", "a great film", "a good movie"]
+
+    embeddings = encoder.encode_cached(sentences)
+    assert encoder.calls == [["a good movie", "a great film"]]
+    assert torch.equal(embeddings[0], embeddings[2])
+
+    # Cached sentences are not encoded again.
+    cached_embeddings = encoder.encode_cached(sentences[:2])
+    assert len(encoder.calls) == 1
+    assert torch.equal(cached_embeddings, embeddings[:2])
+
+    encoder.encode_cached(["a great film", "a bad film"])
+    assert encoder.calls[1:] == [["a bad film"]]
+
+    encoder.clear_cache()
+    encoder.encode_cached(sentences[:1])
+    assert encoder.calls[2:] == [["a good movie"]]
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from textattack.constraints.semantics import WordEmbeddingDistance
+from textattack.shared import AttackedText, WordEmbedding
+
+WORDS = ["good", "great", "fine", "bad", "awful", "movie", "film"]
+EMBEDDING_MATRIX = np.array(
+    [
+        [1.0, 0.1],
+        [0.9, 0.2],
+        [0.6, 0.6],
+        [-1.0, 0.1],
+        [-0.9, -0.2],
+        [0.1, 1.0],
+        [0.2, 0.9],
+    ]
+)
+
+
+@pytest.fixture
+def word_embedding():
+    word2index = {word: i for i, word in enumerate(WORDS)}
+    index2word = {i: word for word, i in word2index.items()}
+    return WordEmbedding(EMBEDDING_MATRIX, word2index, index2word)
+
+
+REPLACEMENTS = WORDS + ["Great", "unknownword"]
+MULTI_WORD_SWAPS = [
+    ([1, 3], ["great", "film"]),
+    ([1, 3], ["bad", "film"]),
+    ([1, 3], ["unknownword", "awful"]),
+]
+
+
+@pytest.mark.parametrize("include_unknown_words", [True, False])
+@pytest.mark.parametrize(
+    "threshold", [{"min_cos_sim": 0.9}, {"min_cos_sim": 0.5}, {"max_mse_dist": 0.1}]
+)
+def test_batched_and_scalar_checks_agree(
+    transformed_texts,
+    check_batched_matches_scalar,
+    word_embedding,
+    include_unknown_words,
+    threshold,
+):
+    constraint = WordEmbeddingDistance(
+        embedding=word_embedding,
+        include_unknown_words=include_unknown_words,
+        **threshold,
+    )
+    reference_text = AttackedText("a good movie , a bad film")
+    texts = transformed_texts(reference_text, REPLACEMENTS, MULTI_WORD_SWAPS)
+
+    check_batched_matches_scalar(constraint, texts, reference_text)
+
+
+def test_batched_check_uses_constraint_hooks(word_embedding):
+    class ScaledWordEmbeddingDistance(WordEmbeddingDistance):
+        """Doubles cosine similarities, so that similar words pass a minimum
+        above 1."""
+
+        def get_cos_sim(self, a, b):
+            return 2 * super().get_cos_sim(a, b)
+
+        def get_cos_sim_many(self, a, b):
+            return 2 * super().get_cos_sim_many(a, b)
+
+    constraint = ScaledWordEmbeddingDistance(embedding=word_embedding, min_cos_sim=1.2)
+    reference_text = AttackedText("a good movie")
+    texts = [
+        reference_text.replace_word_at_index(1, "fine"),
+        reference_text.replace_word_at_index(1, "bad"),
+    ]
+
+    assert constraint._check_constraint_many(texts, reference_text) == texts[:1]
+    assert [constraint._check_constraint(text, reference_text) for text in texts] == [
+        True,
+        False,
+    ]
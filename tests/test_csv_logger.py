@@ -0,0 +1,228 @@
+import csv
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+import textattack
+from textattack.attack_results import (
+    FailedAttackResult,
+    SkippedAttackResult,
+    SuccessfulAttackResult,
+)
+from textattack.constraints.pre_transformation import RepeatModification
+from textattack.goal_function_results import ClassificationGoalFunctionResult
+from textattack.goal_functions import UntargetedClassification
+from textattack.loggers import CSVLogger
+from textattack.models.wrappers import ModelWrapper
+from textattack.search_methods import GreedyWordSwapWIR
+from textattack.shared import AttackedText
+from textattack.transformations import WordSwapNeighboringCharacterSwap
+
+DATA = [
+    ("this movie is good and great fun", 1),
+    ("a good film", 1),
+    ("bad", 0),
+    ("great acting and a good plot overall", 1),
+    ('a "quoted", good\nmulti-line film', 1),
+]
+
+
+class ToyModelWrapper(ModelWrapper):
+    """Scores texts by the words "good" and "great" they contain, and by
+    their characters, so that character swaps change the scores."""
+
+    def __init__(self):
+        self.model = None
+
+    def __call__(self, text_list):
+        outputs = []
+        for text in text_list:
+            score = sum(ord(c) for c in text) % 97 / 97.0
+            num_positive_words = ("good" in text) + ("great" in text)
+            p = min(0.99, 0.3 + 0.3 * num_positive_words + 0.1 * score)
+            outputs.append([1 - p, p])
+        return np.array(outputs)
+
+
+def goal_function_result(text, num_queries=1):
+    return ClassificationGoalFunctionResult(
+        AttackedText(text), torch.tensor([0.25, 0.75]), 1, None, 0.25, num_queries, 1
+    )
+
+
+def handmade_results():
+    """Returns two results of the same example, followed by results of
+    three other examples."""
+    original = goal_function_result("a good and fun film")
+    return [
+        SuccessfulAttackResult(original, goal_function_result("a bad and fun film", 7)),
+        SuccessfulAttackResult(original, goal_function_result("a good and dull fi", 9)),
+        FailedAttackResult(
+            goal_function_result("a great movie"),
+            goal_function_result("a great movie", 12),
+        ),
+        SkippedAttackResult(goal_function_result("a bad movie")),
+        SuccessfulAttackResult(
+            goal_function_result("so good"), goal_function_result("so bad", 3)
+        ),
+    ]
+
+
+@pytest.fixture(scope="module")
+def attack_results():
+    attack = textattack.Attack(
+        UntargetedClassification(ToyModelWrapper()),
+        [RepeatModification()],
+        WordSwapNeighboringCharacterSwap(random_one=False),
+        GreedyWordSwapWIR("delete"),
+    )
+    attack_args = textattack.AttackArgs(
+        num_examples=len(DATA), disable_stdout=True, silent=True
+    )
+    attacker = textattack.Attacker(
+        attack, textattack.datasets.Dataset(DATA), attack_args
+    )
+    return attacker.attack_dataset()
+
+
+def old_to_csv(results, filename, color_method="file"):
+    """Writes ``results`` like ``CSVLogger`` did before it buffered rows: one
+    ``pandas.DataFrame`` of every result, saved with ``to_csv``."""
+    df = pd.DataFrame()
+    num_results = 1
+    prev_result = None
+    for result in results:
+        if (
+            prev_result is not None
+            and prev_result.original_result != result.original_result
+        ):
+            num_results += 1
+        prev_result = result
+        original_text, perturbed_text = result.diff_color(color_method)
+        original_text = original_text.replace("\n", AttackedText.SPLIT_TOKEN)
+        perturbed_text = perturbed_text.replace("\n", AttackedText.SPLIT_TOKEN)
+        result_type = result.__class__.__name__.replace("AttackResult", "")
+        row = {
+            "result_index": num_results,
+            "original_text": original_text,
+            "perturbed_text": perturbed_text,
+            "original_score": result.original_result.score,
+            "perturbed_score": result.perturbed_result.score,
+            "original_output": result.original_result.output,
+            "perturbed_output": result.perturbed_result.output,
+            "ground_truth_output": result.original_result.ground_truth_output,
+            "num_queries": result.num_queries,
+            "result_type": result_type,
+        }
+        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+    df.to_csv(filename, quoting=csv.QUOTE_NONNUMERIC, index=False)
+
+
+def read_rows(filename):
+    with open(filename, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+@pytest.mark.parametrize("buffer_size", [1, 2, 1000])
+def test_csv_logger_matches_pandas_to_csv(tmp_path, attack_results, buffer_size):
+    results = list(attack_results) + handmade_results()
+    filename = str(tmp_path / "results.csv")
+    csv_logger = CSVLogger(filename=filename, buffer_size=buffer_size)
+    for result in results:
+        csv_logger.log_attack_result(result)
+    csv_logger.flush()
+
+    old_filename = str(tmp_path / "old_results.csv")
+    old_to_csv(results, old_filename)
+
+    with open(filename, encoding="utf-8") as f, open(
+        old_filename, encoding="utf-8"
+    ) as old_f:
+        assert f.read() == old_f.read()
+
+
+def test_buffer_size_triggers_write(tmp_path):
+    results = handmade_results()
+    filename = tmp_path / "results.csv"
+    csv_logger = CSVLogger(filename=str(filename), buffer_size=2)
+
+    csv_logger.log_attack_result(results[0])
+    assert not filename.exists()
+    csv_logger.log_attack_result(results[1])
+    assert len(read_rows(filename)) == 3
+    csv_logger.log_attack_result(results[2])
+    assert len(read_rows(filename)) == 3
+    assert not csv_logger._flushed
+
+    csv_logger.flush()
+    csv_logger.flush()
+    rows = read_rows(filename)
+    # The header is only written once, and flushing with no pending rows adds nothing.
+    assert rows[0] == CSVLogger.COLUMNS
+    assert CSVLogger.COLUMNS not in rows[1:]
+    assert len(rows) == 4
+    assert csv_logger._flushed
+
+
+def test_result_index_groups_results_of_same_example(tmp_path):
+    filename = str(tmp_path / "results.csv")
+    csv_logger = CSVLogger(filename=filename, buffer_size=2)
+    for result in handmade_results():
+        csv_logger.log_attack_result(result)
+    csv_logger.flush()
+
+    rows = read_rows(filename)
+    assert [row[0] for row in rows[1:]] == ["1", "1", "2", "3", "4"]
+    assert [row[-1] for row in rows[1:]] == [
+        "Successful",
+        "Successful",
+        "Failed",
+        "Skipped",
+        "Successful",
+    ]
+
+
+def test_resumed_logger_overwrites_rows_after_checkpoint(tmp_path):
+    results = handmade_results()
+    filename = str(tmp_path / "results.csv")
+    csv_logger = CSVLogger(filename=filename)
+    for result in results[:2]:
+        csv_logger.log_attack_result(result)
+    csv_logger.flush()
+    checkpoint = pickle.dumps(csv_logger)
+    # Rows written after the checkpoint, which a resumed attack logs again.
+    for result in results[2:4]:
+        csv_logger.log_attack_result(result)
+    csv_logger.flush()
+
+    resumed_logger = pickle.loads(checkpoint)
+    for result in results[2:]:
+        resumed_logger.log_attack_result(result)
+    resumed_logger.flush()
+
+    expected_filename = str(tmp_path / "expected_results.csv")
+    expected_logger = CSVLogger(filename=expected_filename)
+    for result in results:
+        expected_logger.log_attack_result(result)
+    expected_logger.flush()
+    assert read_rows(filename) == read_rows(expected_filename)
+    assert len(read_rows(filename)) == len(results) + 1
+
+
+def test_logger_starts_over_if_file_is_missing(tmp_path):
+    results = handmade_results()
+    filename = tmp_path / "results.csv"
+    csv_logger = CSVLogger(filename=str(filename))
+    csv_logger.log_attack_result(results[0])
+    csv_logger.flush()
+    filename.unlink()
+
+    csv_logger.log_attack_result(results[2])
+    csv_logger.flush()
+
+    rows = read_rows(filename)
+    assert rows[0] == CSVLogger.COLUMNS
+    assert [row[0] for row in rows[1:]] == ["2"]
@@ -0,0 +1,207 @@
+import numpy as np
+import pytest
+import torch
+import transformers
+
+from textattack.goal_functions import UntargetedClassification
+from textattack.models.wrappers import HuggingFaceModelWrapper, ModelWrapper
+from textattack.shared import AsyncModelExecutor, AttackedText
+
+TEXTS = [
+    "this movie is good",
+    "a great film",
+    "bad",
+    "the plot is good and the acting great",
+]
+
+
+class CountingModelWrapper(ModelWrapper):
+    """Scores texts by their characters, and records the texts of each
+    call."""
+
+    def __init__(self):
+        self.model = None
+        self.calls = []
+
+    def __call__(self, text_list):
+        self.calls.append(list(text_list))
+        scores = [sum(ord(c) for c in text) % 97 / 97.0 for text in text_list]
+        return np.array([[1 - score, score] for score in scores])
+
+
+class ListModelWrapper(CountingModelWrapper):
+    """Like ``CountingModelWrapper``, but returns a list of scores."""
+
+    def __call__(self, text_list):
+        return super().__call__(text_list).tolist()
+
+
+def goal_function(async_model_calls=False, model=None, **kwargs):
+    if model is None:
+        model = CountingModelWrapper()
+    goal_function = UntargetedClassification(model, **kwargs)
+    if async_model_calls:
+        goal_function.enable_async_model_calls()
+    goal_function.init_attack_example(AttackedText(TEXTS[0]), 1)
+    return goal_function
+
+
+def result_values(results):
+    return [
+        (
+            result.attacked_text.text,
+            result.raw_output.tolist(),
+            result.goal_status,
+            result.score,
+            result.num_queries,
+        )
+        for result in results
+    ]
+
+
+def test_async_model_executor_runs_requests_in_order():
+    calls = []
+
+    def call_fn(inputs):
+        calls.append(inputs)
+        return [x * 2 for x in inputs]
+
+    executor = AsyncModelExecutor(call_fn, max_pending=1)
+    futures = [executor.submit([i, i + 1]) for i in range(4)]
+    outputs = [future.result() for future in futures]
+    executor.shutdown()
+
+    assert outputs == [[2 * i, 2 * i + 2] for i in range(4)]
+    assert calls == [[i, i + 1] for i in range(4)]
+
+
+@pytest.mark.parametrize("query_budget", [float("inf"), 5])
+def test_get_results_async_matches_get_results(query_budget):
+    texts = [AttackedText(text) for text in TEXTS]
+    sync_goal_function = goal_function(query_budget=query_budget)
+    async_goal_function = goal_function(True, query_budget=query_budget)
+
+    expected = []
+    actual = []
+    for batch in (texts[:3], texts[1:]):
+        results, search_over = sync_goal_function.get_results(batch)
+        expected.append((result_values(results), search_over))
+        wait_for_results, search_over = async_goal_function.get_results_async(batch)
+        actual.append((result_values(wait_for_results()), search_over))
+    async_goal_function.shutdown_model_executor()
+
+    assert actual == expected
+    assert async_goal_function.num_queries == sync_goal_function.num_queries
+    assert async_goal_function.cache_stats() == sync_goal_function.cache_stats()
+    assert async_goal_function.model.calls == sync_goal_function.model.calls
+
+
+def test_prefetched_texts_are_not_queried_again():
+    texts = [AttackedText(text) for text in TEXTS[1:]]
+    prefetching_goal_function = goal_function(True)
+    model = prefetching_goal_function.model
+    num_calls = len(model.calls)
+
+    prefetching_goal_function.prefetch(texts[:2])
+    results, _ = prefetching_goal_function.get_results(texts)
+    prefetching_goal_function.shutdown_model_executor()
+
+    # Prefetched texts are not counted as queries until they are queried.
+    assert prefetching_goal_function.num_queries == 1 + len(texts)
+    assert model.calls[num_calls:] == [TEXTS[1:3], TEXTS[3:]]
+    assert result_values(results) == result_values(
+        goal_function().get_results(texts)[0]
+    )
+
+
+def test_repeated_texts_are_queried_once():
+    texts = [AttackedText(text) for text in TEXTS[1:]]
+    repeating_goal_function = goal_function()
+    model = repeating_goal_function.model
+    num_calls = len(model.calls)
+
+    results, _ = repeating_goal_function.get_results(texts + texts[:2])
+
+    assert model.calls[num_calls:] == [TEXTS[1:]]
+    assert repeating_goal_function.num_queries == 1 + len(texts) + 2
+    assert result_values(results[len(texts) :]) == result_values(results[:2])
+
+
+@pytest.mark.parametrize("model_class", [CountingModelWrapper, ListModelWrapper])
+def test_batch_by_length_keeps_order_of_outputs(model_class):
+    texts = [
+        AttackedText(text)
+        for text in TEXTS + ["so good", "a film that is fun", "a good film"]
+    ]
+    expected = goal_function(model=model_class(), model_batch_size=3)
+    sorting_goal_function = goal_function(
+        model=model_class(), model_batch_size=3, batch_by_length=True
+    )
+    model = sorting_goal_function.model
+    num_calls = len(model.calls)
+
+    outputs = sorting_goal_function._call_model_uncached(texts)
+
+    assert isinstance(outputs, torch.Tensor)
+    assert torch.equal(outputs, expected._call_model_uncached(texts))
+    # Batches are made of texts of similar lengths.
+    queried_texts = sum(model.calls[num_calls:], [])
+    assert [len(batch) for batch in model.calls[num_calls:]] == [3, 3, 1]
+    assert queried_texts == sorted((text.text for text in texts), key=len)
+
+
+@pytest.fixture
+def huggingface_model_wrapper(tmp_path):
+    """A tiny random HuggingFace classifier, with a tokenizer for the words
+    of ``TEXTS``."""
+    words = sorted({word for text in TEXTS for word in text.split()})
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(vocab) + "\n")
+    tokenizer = transformers.BertTokenizerFast(vocab_file=str(vocab_file))
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=16,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=32,
+        max_position_embeddings=512,
+        num_labels=2,
+    )
+    model = transformers.BertForSequenceClassification(config).eval()
+    return HuggingFaceModelWrapper(model, tokenizer)
+
+
+def test_huggingface_padding_to_longest_keeps_predictions(huggingface_model_wrapper):
+    model_wrapper = huggingface_model_wrapper
+    tokenizer = model_wrapper.tokenizer
+    # Padded to `max_length`, as before inputs were padded to the longest in the batch.
+    inputs = tokenizer(
+        TEXTS,
+        add_special_tokens=True,
+        padding="max_length",
+        max_length=512,
+        truncation=True,
+        return_tensors="pt",
+    )
+    with torch.no_grad():
+        max_length_logits = model_wrapper.model(**inputs).logits
+
+    logits = model_wrapper(TEXTS)
+
+    assert torch.allclose(logits, max_length_logits, atol=1e-5)
+    # Each text gets the same predictions whichever texts it is batched with.
+    for text, text_logits in zip(TEXTS, logits):
+        assert torch.allclose(model_wrapper([text])[0], text_logits, atol=1e-5)
+
+    texts = [AttackedText(text) for text in TEXTS]
+    outputs = goal_function(model=model_wrapper, model_batch_size=2)
+    sorted_outputs = goal_function(
+        model=model_wrapper, model_batch_size=2, batch_by_length=True
+    )
+    assert torch.allclose(
+        outputs._call_model_uncached(texts),
+        sorted_outputs._call_model_uncached(texts),
+        atol=1e-5,
+    )
@@ -1,3 +1,6 @@
+import pytest
+
+
 def test_perplexity():
     from textattack.attack_results import SuccessfulAttackResult
     from textattack.goal_function_results.classification_goal_function_result import (
@@ -56,3 +59,207 @@ def test_use():
     usem = USEMetric().calculate(results)
 
     assert usem["avg_attack_use_score"] == 0.76
+
+
+def attack_results():
+    """Returns two successful results of the same example, followed by a
+    failed and a skipped result."""
+    from textattack.attack_results import (
+        FailedAttackResult,
+        SkippedAttackResult,
+        SuccessfulAttackResult,
+    )
+    from textattack.goal_function_results.classification_goal_function_result import (
+        ClassificationGoalFunctionResult,
+    )
+    from textattack.shared.attacked_text import AttackedText
+
+    def goal_function_result(text, num_queries):
+        return ClassificationGoalFunctionResult(
+            AttackedText(text), None, 1, None, 0.5, num_queries, 1
+        )
+
+    original = goal_function_result("a good and fun film", 1)
+    return [
+        SuccessfulAttackResult(original, goal_function_result("a bad and fun film", 7)),
+        SuccessfulAttackResult(original, goal_function_result("a good and dull fi", 9)),
+        FailedAttackResult(
+            goal_function_result("a great movie", 1),
+            goal_function_result("a great movie", 12),
+        ),
+        SkippedAttackResult(goal_function_result("a bad movie", 1)),
+    ]
+
+
+def test_attack_metrics_on_summaries():
+    from textattack.attack_results import summarize_results
+    from textattack.metrics import AttackQueries, AttackSuccessRate, WordsPerturbed
+
+    results = attack_results()
+    summaries = list(summarize_results(results))
+
+    assert [s.same_example for s in summaries] == [False, True, False, False]
+    assert [s.num_words_changed for s in summaries] == [1, 2, 0, 0]
+    for metric in (AttackSuccessRate, AttackQueries):
+        assert metric().calculate(summaries) == metric().calculate(results)
+    words_perturbed = WordsPerturbed().calculate(summaries)
+    assert words_perturbed["avg_word_perturbed_perc"] == 30.0
+    assert words_perturbed["max_words_changed"] == 2
+
+    words_perturbed = WordsPerturbed()
+    for i, result in enumerate(results):
+        words_perturbed.update(result)
+        if i == 0:
+            assert words_perturbed.snapshot()["avg_word_perturbed_perc"] == 20.0
+    assert words_perturbed.snapshot()["avg_word_perturbed_perc"] == 30.0
+    assert list(words_perturbed.snapshot()["num_words_changed_until_success"]) == [1, 1]
+
+
+def test_attack_log_manager_streaming():
+    from textattack.attack_results import AttackResultSummary
+    from textattack.loggers import AttackLogManager, Logger
+
+    class RecordingLogger(Logger):
+        def __init__(self):
+            self.rows = []
+            self.hists = []
+
+        def log_summary_rows(self, rows, title, window_id):
+            self.rows.append((rows, title, window_id))
+
+        def log_hist(self, arr, numbins, title, window_id):
+            self.hists.append((list(arr), numbins, title, window_id))
+
+    results = attack_results()
+    log_managers = {}
+    for streaming in (False, True):
+        log_manager = AttackLogManager(streaming=streaming)
+        log_manager.loggers.append(RecordingLogger())
+        for result in results:
+            log_manager.log_result(result)
+        log_manager.log_summary(num_queries=30, elapsed_time=2e9)
+        log_managers[streaming] = log_manager
+
+    # Streaming keeps only the summaries of the results.
+    assert log_managers[False].results == results
+    streamed_results = log_managers[True].results
+    assert all(isinstance(r, AttackResultSummary) for r in streamed_results)
+    assert [r.perturbed_text for r in streamed_results] == [
+        r.perturbed_result.attacked_text.text for r in results
+    ]
+
+    # The summary is the same either way.
+    logger, streaming_logger = [log_managers[s].loggers[0] for s in (False, True)]
+    assert streaming_logger.rows == logger.rows
+    assert streaming_logger.hists == logger.hists
+    assert logger.rows[0][0][:4] == [
+        ["Number of successful perturbations:", 2],
+        ["Number of successful attacks:", 1],
+        ["Number of failed attacks:", 1],
+        ["Number of skipped attacks:", 1],
+    ]
+
+    # Summaries are grouped by `same_example`, like results are by original text.
+    for log_manager in log_managers.values():
+        assert [len(batch) for batch in log_manager.batched_results] == [2, 1, 1]
+    assert [
+        [r.perturbed_text for r in batch]
+        for batch in log_managers[True].batched_results
+    ] == [
+        [r.perturbed_result.attacked_text.text for r in batch]
+        for batch in log_managers[False].batched_results
+    ]
+
+
+def test_use_metric_matches_per_pair_scores(monkeypatch):
+    import string
+
+    import numpy as np
+
+    from textattack.attack_results import (
+        FailedAttackResult,
+        SkippedAttackResult,
+        SuccessfulAttackResult,
+        summarize_results,
+    )
+    from textattack.constraints.semantics.sentence_encoders import (
+        UniversalSentenceEncoder,
+    )
+    from textattack.goal_function_results.classification_goal_function_result import (
+        ClassificationGoalFunctionResult,
+    )
+    from textattack.metrics.quality_metrics import USEMetric
+    from textattack.shared.attacked_text import AttackedText
+
+    encoded = []
+
+    def encode(self, sentences):
+        # Encodes sentences by their letter counts, instead of loading the model.
+        encoded.append(list(sentences))
+        return np.array(
+            [
+                [sentence.count(letter) for letter in string.ascii_lowercase]
+                for sentence in sentences
+            ],
+            dtype=np.float32,
+        )
+
+    monkeypatch.setattr(UniversalSentenceEncoder, "encode", encode)
+
+    def goal_function_result(attacked_text):
+        return ClassificationGoalFunctionResult(attacked_text, None, 1, None, 0.5, 1, 1)
+
+    original_text = AttackedText("a good and fun film about a dog")
+    other_text = AttackedText("  the acting was great ")
+    original = goal_function_result(original_text)
+    results = [
+        SuccessfulAttackResult(
+            original,
+            goal_function_result(original_text.replace_word_at_index(1, "bad")),
+        ),
+        SuccessfulAttackResult(
+            original,
+            goal_function_result(original_text.replace_word_at_index(3, "dull")),
+        ),
+        FailedAttackResult(
+            goal_function_result(AttackedText("a great movie")),
+            goal_function_result(AttackedText("a great movie")),
+        ),
+        SkippedAttackResult(goal_function_result(AttackedText("a bad movie"))),
+        SuccessfulAttackResult(
+            goal_function_result(other_text),
+            goal_function_result(other_text.replace_word_at_index(3, "poor")),
+        ),
+    ]
+
+    # Scores before texts were deduplicated and encoded in batches.
+    use = UniversalSentenceEncoder()
+    old_scores = [
+        use._sim_score(
+            result.original_result.attacked_text,
+            result.perturbed_result.attacked_text,
+        ).item()
+        for result in results
+        if isinstance(result, SuccessfulAttackResult)
+    ]
+    encoded.clear()
+
+    use_metric = USEMetric(batch_size=2)
+    metrics = use_metric.calculate(results)
+
+    assert use_metric.use_scores == pytest.approx(old_scores)
+    assert metrics["avg_attack_use_score"] == round(
+        sum(old_scores) / len(old_scores), 2
+    )
+    # Each distinct text is encoded once, in batches of `batch_size`.
+    encoded_texts = sum(encoded, [])
+    assert [len(batch) for batch in encoded] == [2, 2, 1]
+    assert len(encoded_texts) == len(set(encoded_texts)) == 5
+    assert encoded_texts.count(original_text.text) == 1
+
+    # Summaries of the results give the same scores.
+    summary_metric = USEMetric()
+    assert summary_metric.calculate(list(summarize_results(results))) == metrics
+    assert summary_metric.use_scores == use_metric.use_scores
+
+    assert np.isnan(USEMetric().calculate(results[2:4])["avg_attack_use_score"])
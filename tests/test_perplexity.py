@@ -0,0 +1,99 @@
+import math
+
+import pytest
+import torch
+import transformers
+
+from textattack.metrics.quality_metrics import Perplexity
+from textattack.metrics.quality_metrics import perplexity as perplexity_module
+import textattack.shared.utils
+
+TEXTS = ["a good movie", "the plot was bad and not fun", "great acting", "so", "a"]
+VOCAB_SIZE = 30
+
+
+class CharTokenizer:
+    """Encodes each character of a text as a token."""
+
+    pad_token_id = 0
+
+    def encode(self, text, add_special_tokens=True):
+        return [1 + ord(c) % (VOCAB_SIZE - 1) for c in text]
+
+
+def tiny_model(model_name):
+    torch.manual_seed(0)
+    if model_name == "gpt2":
+        config = transformers.GPT2Config(
+            vocab_size=VOCAB_SIZE, n_positions=64, n_embd=16, n_layer=1, n_head=2
+        )
+        model = transformers.GPT2LMHeadModel(config)
+    else:
+        config = transformers.BertConfig(
+            vocab_size=VOCAB_SIZE,
+            hidden_size=16,
+            num_hidden_layers=1,
+            num_attention_heads=2,
+            intermediate_size=32,
+            max_position_embeddings=64,
+        )
+        model = transformers.BertForMaskedLM(config)
+    return model.to(textattack.shared.utils.device).eval()
+
+
+@pytest.fixture(params=["gpt2", "tiny-mlm"])
+def perplexity(request, monkeypatch):
+    monkeypatch.setitem(
+        perplexity_module._PPL_MODEL_CACHE,
+        request.param,
+        (tiny_model(request.param), CharTokenizer()),
+    )
+    return Perplexity(model_name=request.param, batch_size=2)
+
+
+def unpadded_ppl(perplexity, text):
+    """Returns the perplexity of ``text`` computed without any padding."""
+    input_ids = torch.tensor([perplexity.ppl_tokenizer.encode(text)])
+    labels = input_ids
+    with torch.no_grad():
+        logits = perplexity.ppl_model(input_ids.to(textattack.shared.utils.device))[0]
+    logits = logits.cpu()
+    if perplexity.is_causal:
+        logits = logits[:, :-1]
+        labels = labels[:, 1:]
+    return math.exp(
+        torch.nn.functional.cross_entropy(logits.transpose(1, 2), labels).item()
+    )
+
+
+def test_perplexities_matches_each_text_scored_alone(perplexity):
+    scores = perplexity.perplexities(TEXTS)
+
+    assert len(scores) == len(TEXTS)
+    for text, score in zip(TEXTS, scores):
+        if perplexity.is_causal and len(text) == 1:
+            continue
+        assert score == pytest.approx(unpadded_ppl(perplexity, text), rel=1e-5)
+
+
+def test_padding_does_not_change_perplexity(perplexity):
+    short_text, long_text = "good", "a much longer text than the other one"
+    alone = perplexity.perplexities([short_text])
+    padded = perplexity.perplexities([short_text, long_text])
+
+    assert padded[0] == pytest.approx(alone[0], rel=1e-5)
+    # Padding tokens are masked out, whatever their id.
+    perplexity.ppl_tokenizer.pad_token_id = 5
+    assert perplexity.perplexities([short_text, long_text]) == pytest.approx(
+        padded, rel=1e-5
+    )
+
+
+def test_texts_without_tokens_to_predict_are_nan(perplexity):
+    scores = perplexity.perplexities(["", "a", "a good movie"])
+
+    assert math.isnan(scores[0])
+    # The causal model has nothing to predict after a single token.
+    assert math.isnan(scores[1]) == perplexity.is_causal
+    assert not math.isnan(scores[2])
+    assert perplexity.calc_ppl(["", "a good movie"]) == pytest.approx(scores[2])
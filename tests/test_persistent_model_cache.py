@@ -0,0 +1,156 @@
+from collections import OrderedDict
+import pickle
+
+import numpy as np
+import torch
+
+import textattack
+from textattack.constraints.pre_transformation import RepeatModification
+from textattack.goal_functions import UntargetedClassification
+from textattack.models.wrappers import ModelWrapper, PyTorchModelWrapper
+from textattack.search_methods import GreedyWordSwapWIR
+from textattack.shared import AttackedText, PersistentModelCache
+from textattack.shared.persistent_model_cache import model_fingerprint
+from textattack.transformations import WordSwapNeighboringCharacterSwap
+
+DATA = [
+    ("this movie is good and great fun", 1),
+    ("a good film", 1),
+    ("great acting and a good plot overall", 1),
+]
+
+
+class CountingModelWrapper(ModelWrapper):
+    """Scores texts by their characters, and counts the texts it is called
+    on."""
+
+    def __init__(self):
+        self.model = None
+        self.num_texts = 0
+
+    def __call__(self, text_list):
+        self.num_texts += len(text_list)
+        scores = [
+            0.5 + 0.4 * (sum(ord(c) for c in text) % 89) / 89 for text in text_list
+        ]
+        return np.array([[1 - score, score] for score in scores])
+
+
+def texts(*strings):
+    return [AttackedText(string) for string in strings]
+
+
+def test_get_many_returns_stored_outputs_and_none_for_misses(tmp_path):
+    cache = PersistentModelCache(str(tmp_path / "cache" / "model.db"), "model")
+    outputs = torch.tensor([[0.1, 0.9], [0.7, 0.3]])
+    cache.put_many(texts("a good movie", "a bad movie"), outputs)
+
+    cached = cache.get_many(texts("a bad movie", "a new movie", "a good movie"))
+
+    assert torch.equal(cached[0], outputs[1])
+    assert cached[1] is None
+    assert torch.equal(cached[2], outputs[0])
+    assert cache.stats() == {"hits": 2, "misses": 1}
+
+    # Outputs already stored are kept.
+    cache.put_many(texts("a good movie"), [torch.tensor([0.5, 0.5])])
+    assert torch.equal(cache.get_many(texts("a good movie"))[0], outputs[0])
+
+    # Texts are keyed by their columns, not only their words.
+    premise_hypothesis = AttackedText(
+        OrderedDict([("premise", "a good movie"), ("hypothesis", "a bad movie")])
+    )
+    assert cache.get_many([premise_hypothesis]) == [None]
+
+    # Queries are split in chunks of at most `_QUERY_CHUNK_SIZE` keys.
+    many_texts = texts(*[f"movie number {i}" for i in range(1234)])
+    cache.put_many(many_texts, [np.array([i]) for i in range(len(many_texts))])
+    assert [output[0] for output in cache.get_many(many_texts)] == list(
+        range(len(many_texts))
+    )
+
+
+def test_pickled_cache_opens_its_own_connection(tmp_path):
+    cache = PersistentModelCache(str(tmp_path / "model.db"), "model")
+    cache.put_many(texts("a good movie"), [np.array([0.2, 0.8])])
+
+    copy = pickle.loads(pickle.dumps(cache))
+
+    assert copy._connection is None
+    assert copy.connection is not cache.connection
+    assert np.array_equal(copy.get_many(texts("a good movie"))[0], [0.2, 0.8])
+    # Outputs stored through either connection are seen by the other.
+    copy.put_many(texts("a bad movie"), [np.array([0.9, 0.1])])
+    assert np.array_equal(cache.get_many(texts("a bad movie"))[0], [0.9, 0.1])
+    copy.close()
+    cache.close()
+
+
+def test_fingerprints_do_not_share_outputs(tmp_path):
+    path = str(tmp_path / "model.db")
+    cache = PersistentModelCache(path, "model")
+    other_cache = PersistentModelCache(path, "other model")
+    cache.put_many(texts("a good movie"), [np.array([0.2, 0.8])])
+
+    assert other_cache.get_many(texts("a good movie")) == [None]
+
+    # The fingerprint of a goal function also depends on its type.
+    goal_function = UntargetedClassification(CountingModelWrapper())
+    goal_function.enable_persistent_cache(path, "model")
+    assert goal_function.persistent_cache.fingerprint != "model"
+    assert goal_function.persistent_cache.get_many(texts("a good movie")) == [None]
+
+
+def test_model_fingerprint_depends_on_weights():
+    torch.manual_seed(0)
+    model = torch.nn.Linear(4, 2)
+    same_model = torch.nn.Linear(4, 2)
+    same_model.load_state_dict(model.state_dict())
+    other_model = torch.nn.Linear(4, 2)
+
+    fingerprint = model_fingerprint(PyTorchModelWrapper(model, None))
+    assert fingerprint == model_fingerprint(PyTorchModelWrapper(same_model, None))
+    assert fingerprint != model_fingerprint(PyTorchModelWrapper(other_model, None))
+
+
+def attack_dataset(model_wrapper, model_cache_path):
+    attack = textattack.Attack(
+        UntargetedClassification(model_wrapper),
+        [RepeatModification()],
+        WordSwapNeighboringCharacterSwap(random_one=False),
+        GreedyWordSwapWIR("delete"),
+    )
+    attack_args = textattack.AttackArgs(
+        num_examples=len(DATA),
+        model_cache_path=model_cache_path,
+        disable_stdout=True,
+        silent=True,
+    )
+    attacker = textattack.Attacker(
+        attack, textattack.datasets.Dataset(DATA), attack_args
+    )
+    return attacker.attack_dataset(), attack.goal_function.persistent_cache
+
+
+def test_second_attack_reads_model_outputs_from_cache(tmp_path):
+    model_cache_path = str(tmp_path / "model.db")
+    model_wrapper = CountingModelWrapper()
+    results, cache = attack_dataset(model_wrapper, model_cache_path)
+    num_texts = model_wrapper.num_texts
+    assert num_texts > 0
+    assert cache.stats()["misses"] == num_texts
+
+    cached_results, cache = attack_dataset(model_wrapper, model_cache_path)
+
+    # The model is not called again, and the results are unchanged.
+    assert model_wrapper.num_texts == num_texts
+    assert cache.stats() == {"hits": num_texts, "misses": 0}
+    assert [result.perturbed_text() for result in cached_results] == [
+        result.perturbed_text() for result in results
+    ]
+    assert [result.num_queries for result in cached_results] == [
+        result.num_queries for result in results
+    ]
+    assert [result.perturbed_result.output for result in cached_results] == [
+        result.perturbed_result.output for result in results
+    ]
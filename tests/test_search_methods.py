@@ -0,0 +1,370 @@
+import numpy as np
+import pytest
+
+import textattack
+from textattack.constraints.overlap import MaxWordsPerturbed
+from textattack.constraints.pre_transformation import RepeatModification
+from textattack.goal_functions import UntargetedClassification
+from textattack.models.wrappers import ModelWrapper
+from textattack.search_methods import (
+    AlzantotGeneticAlgorithm,
+    BeamSearch,
+    ParticleSwarmOptimization,
+    PopulationMember,
+)
+from textattack.shared import AttackedText
+from textattack.transformations import WordSwapNeighboringCharacterSwap
+
+TEXT = "a good movie with great acting and a fun plot"
+
+
+class ToyModelWrapper(ModelWrapper):
+    """Scores texts by their characters, so that each character swap changes
+    the score."""
+
+    def __init__(self):
+        self.model = None
+
+    def __call__(self, text_list):
+        scores = [
+            0.2 + 0.6 * (sum(ord(c) * (i + 1) for i, c in enumerate(text)) % 101) / 100
+            for text in text_list
+        ]
+        return np.array([[score, 1 - score] for score in scores])
+
+
+def make_search(search_method, transformation=None, constraints=()):
+    """Returns ``search_method`` set up by an attack on the toy model, and the
+    initial result of ``TEXT``."""
+    goal_function = UntargetedClassification(ToyModelWrapper())
+    if transformation is None:
+        transformation = WordSwapNeighboringCharacterSwap(random_one=False)
+    textattack.Attack(
+        goal_function,
+        [RepeatModification(), *constraints],
+        transformation,
+        search_method,
+    )
+    initial_result, _ = goal_function.init_attack_example(AttackedText(TEXT), 1)
+    search_method._search_over = False
+    return search_method, initial_result
+
+
+def count_queries(search_method):
+    """Returns a list that records the number of texts of each call to
+    ``search_method.get_goal_results``."""
+    num_texts = []
+    get_goal_results = search_method.get_goal_results
+
+    def counting_get_goal_results(attacked_text_list, **kwargs):
+        num_texts.append(len(attacked_text_list))
+        return get_goal_results(attacked_text_list, **kwargs)
+
+    search_method.get_goal_results = counting_get_goal_results
+    return num_texts
+
+
+def genetic_population(search_method, initial_result, size):
+    """Returns population members that have 0, 1, ..., ``size - 1`` words
+    perturbed by ``search_method``."""
+    members = [
+        PopulationMember(
+            initial_result.attacked_text,
+            initial_result,
+            attributes={
+                "num_candidate_transformations": np.ones(
+                    initial_result.attacked_text.num_words
+                )
+            },
+        )
+    ]
+    for i in range(1, size):
+        members.append(search_method._perturb(members[-1], initial_result, index=2 * i))
+    return members
+
+
+def check_result(goal_function, pop_member):
+    """Checks that the result of ``pop_member`` is the result of its text."""
+    result, _ = goal_function.get_result(pop_member.attacked_text)
+    assert pop_member.result.attacked_text == pop_member.attacked_text
+    assert pop_member.score == result.score
+
+
+def test_genetic_perturb_many_matches_perturb():
+    indices = [1, 3, 5, 7]
+    batched_search, initial_result = make_search(AlzantotGeneticAlgorithm())
+    members = genetic_population(batched_search, initial_result, len(indices))
+    num_queries = batched_search.goal_function.num_queries
+    batched = batched_search._perturb_many(members, initial_result, indices=indices)
+    num_batched_queries = batched_search.goal_function.num_queries - num_queries
+
+    search, initial_result = make_search(AlzantotGeneticAlgorithm())
+    members = genetic_population(search, initial_result, len(indices))
+    num_queries = search.goal_function.num_queries
+    sequential = [
+        search._perturb(member, initial_result, index=idx)
+        for member, idx in zip(members, indices)
+    ]
+
+    assert [member.attacked_text.text for member in batched] == [
+        member.attacked_text.text for member in sequential
+    ]
+    assert [member.score for member in batched] == [
+        member.score for member in sequential
+    ]
+    assert num_batched_queries == search.goal_function.num_queries - num_queries
+
+
+def test_genetic_perturb_many_perturbs_every_member():
+    np.random.seed(0)
+    search, initial_result = make_search(AlzantotGeneticAlgorithm())
+    goal_function = search.goal_function
+    members = genetic_population(search, initial_result, 6)
+    num_queries = goal_function.num_queries
+    num_texts = count_queries(search)
+
+    perturbed = search._perturb_many(members, initial_result)
+
+    # Members still being perturbed are scored together, in one call per round.
+    assert 0 < len(num_texts) < len(members)
+    assert sum(num_texts) == goal_function.num_queries - num_queries
+    assert len(perturbed) == len(members)
+    num_perturbed = 0
+    for member, perturbed_member in zip(members, perturbed):
+        if perturbed_member is member:
+            continue
+        num_perturbed += 1
+        # A single word is swapped, for a transformation that improves the score.
+        words_diff = member.attacked_text.all_words_diff(perturbed_member.attacked_text)
+        assert len(words_diff) == 1
+        assert perturbed_member.score > member.score
+        check_result(goal_function, perturbed_member)
+    assert num_perturbed > 0
+
+
+def test_genetic_crossover_many_mixes_parents():
+    np.random.seed(0)
+    search, initial_result = make_search(AlzantotGeneticAlgorithm())
+    goal_function = search.goal_function
+    members = genetic_population(search, initial_result, 4)
+    parent_pairs = [
+        (members[i], members[j]) for i, j in [(0, 1), (1, 2), (2, 3), (3, 1)]
+    ]
+    num_queries = goal_function.num_queries
+    num_texts = count_queries(search)
+
+    children = search._crossover_many(parent_pairs, initial_result.attacked_text)
+
+    new_children = [
+        child
+        for (parent1, parent2), child in zip(parent_pairs, children)
+        if child is not parent1 and child is not parent2
+    ]
+    # All new children are scored in one call.
+    assert num_texts == [len(new_children)]
+    assert goal_function.num_queries - num_queries == len(new_children)
+    assert len(children) == len(parent_pairs)
+    for (parent1, parent2), child in zip(parent_pairs, children):
+        for i, word in enumerate(child.words):
+            assert word in (parent1.words[i], parent2.words[i])
+    for child in new_children:
+        check_result(goal_function, child)
+
+
+def test_genetic_crossover_many_stops_at_query_budget():
+    np.random.seed(0)
+    search, initial_result = make_search(AlzantotGeneticAlgorithm())
+    goal_function = search.goal_function
+    members = genetic_population(search, initial_result, 4)
+    parent_pairs = [(members[3], members[i]) for i in range(3)] * 2
+    goal_function.query_budget = goal_function.num_queries + 2
+
+    children = search._crossover_many(parent_pairs, initial_result.attacked_text)
+
+    assert search._search_over
+    assert goal_function.num_queries == goal_function.query_budget
+    # Children are kept up to the first one that could not be scored.
+    assert len(children) < len(parent_pairs)
+    new_children = [
+        child for child in children if all(child is not member for member in members)
+    ]
+    assert len(new_children) == 2
+    goal_function.query_budget = float("inf")
+    for child in new_children:
+        check_result(goal_function, child)
+
+
+def pso_results(search, initial_result, size):
+    """Returns the results of ``size`` distinct neighbors of ``TEXT``."""
+    best_neighbors, _ = search._get_best_neighbors(initial_result, initial_result)
+    results = {result.attacked_text.text: result for result in best_neighbors}
+    return list(results.values())[:size]
+
+
+@pytest.mark.parametrize("budget_left", [None, 0, 40])
+def test_pso_get_best_neighbors_many_matches_sequential(budget_left):
+    outputs = []
+    for batched in (True, False):
+        search, initial_result = make_search(ParticleSwarmOptimization(pop_size=4))
+        goal_function = search.goal_function
+        current_results = pso_results(search, initial_result, 4)
+        if budget_left is not None:
+            goal_function.query_budget = goal_function.num_queries + budget_left
+        num_queries = goal_function.num_queries
+        if batched:
+            best_neighbors_and_probs = search._get_best_neighbors_many(
+                current_results, initial_result
+            )
+        else:
+            best_neighbors_and_probs = [
+                search._get_best_neighbors(result, initial_result)
+                for result in current_results
+            ]
+        outputs.append(
+            (
+                [
+                    (
+                        [result.attacked_text.text for result in best_neighbors],
+                        list(probs),
+                    )
+                    for best_neighbors, probs in best_neighbors_and_probs
+                ],
+                goal_function.num_queries - num_queries,
+                search._search_over,
+            )
+        )
+
+    assert outputs[0] == outputs[1]
+
+
+def test_pso_perturb_many_moves_every_member_to_a_best_neighbor():
+    np.random.seed(0)
+    search, initial_result = make_search(ParticleSwarmOptimization(pop_size=4))
+    goal_function = search.goal_function
+    members = [
+        PopulationMember(result.attacked_text, result)
+        for result in pso_results(search, initial_result, 4)
+    ]
+    texts = [member.attacked_text for member in members]
+    num_queries = goal_function.num_queries
+    num_texts = count_queries(search)
+
+    perturbed = search._perturb_many(members, initial_result)
+
+    assert len(num_texts) == 1
+    assert goal_function.num_queries - num_queries == num_texts[0]
+    assert any(perturbed)
+    for text, member, was_perturbed in zip(texts, members, perturbed):
+        if not was_perturbed:
+            assert member.attacked_text == text
+            continue
+        assert len(text.all_words_diff(member.attacked_text)) == 1
+        check_result(goal_function, member)
+
+
+class RecordingCharacterSwap(WordSwapNeighboringCharacterSwap):
+    """Records the texts of each batched call. Transformations of texts are
+    only cached by the attack if ``deterministic``."""
+
+    def __init__(self, deterministic=True):
+        super().__init__(random_one=False)
+        self._deterministic = deterministic
+        self.calls = []
+
+    @property
+    def deterministic(self):
+        return self._deterministic
+
+    def _get_transformations_many(self, current_texts, indices_to_modify_list):
+        self.calls.append([text.text for text in current_texts])
+        return super()._get_transformations_many(current_texts, indices_to_modify_list)
+
+
+@pytest.mark.parametrize("deterministic", [True, False])
+def test_get_transformations_batched_matches_get_transformations(deterministic):
+    outputs = []
+    for batched in (True, False):
+        transformation = RecordingCharacterSwap(deterministic=deterministic)
+        search, initial_result = make_search(
+            BeamSearch(),
+            transformation=transformation,
+            constraints=[MaxWordsPerturbed(max_num_words=1)],
+        )
+        original_text = initial_result.attacked_text
+        neighbors = search.get_transformations(original_text, original_text)
+        # A beam with repeated texts, and texts that the constraints compare
+        # against the original text.
+        beam = [original_text, neighbors[0], neighbors[3], original_text, neighbors[0]]
+        if batched:
+            transformed_texts = search.get_transformations_batched(
+                beam, original_text=original_text, flatten=False
+            )
+        else:
+            transformed_texts = [
+                search.get_transformations(text, original_text=original_text)
+                for text in beam
+            ]
+        outputs.append([[text.text for text in texts] for texts in transformed_texts])
+        for texts in transformed_texts:
+            for text in texts:
+                assert text.attack_attrs["last_transformation"] is transformation
+
+    assert outputs[0] == outputs[1]
+    # Texts two swaps away from the original are filtered by the constraint.
+    assert outputs[0][0] and not outputs[0][1]
+
+
+def test_get_transformations_batched_transforms_each_uncached_text_once():
+    transformation = RecordingCharacterSwap()
+    search, initial_result = make_search(BeamSearch(), transformation=transformation)
+    original_text = initial_result.attacked_text
+    neighbors = search.get_transformations(original_text, original_text)
+    transformation.calls.clear()
+
+    beam = [neighbors[0], neighbors[1], neighbors[0]]
+    transformed_texts = search.get_transformations_batched(
+        beam, original_text=original_text, flatten=False
+    )
+    assert transformation.calls == [[neighbors[0].text, neighbors[1].text]]
+    assert [text.text for text in transformed_texts[0]] == [
+        text.text for text in transformed_texts[2]
+    ]
+
+    # Cached texts are not transformed again.
+    flat_transformed_texts = search.get_transformations_batched(
+        [neighbors[2], original_text] + beam, original_text=original_text
+    )
+    assert transformation.calls[1:] == [[neighbors[2].text]]
+    assert [text.text for text in flat_transformed_texts] == [
+        text.text
+        for text in search.get_transformations(neighbors[2], original_text)
+        + search.get_transformations(original_text, original_text)
+        + [text for texts in transformed_texts for text in texts]
+    ]
+    assert len(transformation.calls) == 2
+
+
+@pytest.mark.parametrize("beam_width", [1, 3])
+def test_beam_search_matches_transforming_each_text(beam_width):
+    outputs = []
+    for batched in (True, False):
+        search, initial_result = make_search(BeamSearch(beam_width=beam_width))
+        search.goal_function.query_budget = 150
+        if not batched:
+
+            def get_transformations_batched(texts, original_text=None):
+                return [
+                    transformed_text
+                    for text in texts
+                    for transformed_text in search.get_transformations(
+                        text, original_text=original_text
+                    )
+                ]
+
+            search.get_transformations_batched = get_transformations_batched
+        result = search.perform_search(initial_result)[0]
+        outputs.append(
+            (result.attacked_text.text, result.score, search.goal_function.num_queries)
+        )
+
+    assert outputs[0] == outputs[1]
@@ -57,3 +57,72 @@ def test_word_swap_change_name():
     for entity in augmented_text.get_spans("ner"):
         entity_augmented.append(entity.tag)
     assert entity_original == entity_augmented
+
+
+def test_transform_many_marks_nested_transformations():
+    from textattack.shared import AttackedText
+    from textattack.transformations import Transformation
+
+    class NestedTransformation(Transformation):
+        """Returns the transformations of each index in a separate list."""
+
+        def _get_transformations(self, current_text, indices_to_modify):
+            return [
+                [current_text.replace_word_at_index(i, word) for word in ["a", "b"]]
+                for i in sorted(indices_to_modify)
+            ]
+
+    transformation = NestedTransformation()
+    texts = [AttackedText("a good movie"), AttackedText("a great film")]
+
+    transformed_texts = transformation.transform_many(texts)
+    called_texts = [transformation(text) for text in texts]
+
+    assert [
+        [[t.text for t in index_texts] for index_texts in text_transformations]
+        for text_transformations in transformed_texts
+    ] == [
+        [[t.text for t in index_texts] for index_texts in text_transformations]
+        for text_transformations in called_texts
+    ]
+    for text_transformations in transformed_texts:
+        for index_texts in text_transformations:
+            for text in index_texts:
+                assert text.attack_attrs["last_transformation"] is transformation
+
+
+def test_word_merge_transform_many(capsys):
+    from textattack.constraints.pre_transformation import StopwordModification
+    from textattack.shared import AttackedText
+    from textattack.transformations.word_merges.word_merge import WordMerge
+
+    class ConcatenatingWordMerge(WordMerge):
+        def _get_new_words(self, current_text, index):
+            return [current_text.words[index] + current_text.words[index + 1]]
+
+    transformation = ConcatenatingWordMerge()
+    texts = [AttackedText("a good movie"), AttackedText("the plot is fun")]
+    constraints = [StopwordModification(stopwords={"a", "is"})]
+
+    transformed_texts = transformation.transform_many(
+        texts, pre_transformation_constraints=constraints, indices_to_modify=[0, 1]
+    )
+
+    assert [
+        [t.text for t in text_transformations]
+        for text_transformations in transformed_texts
+    ] == [
+        [t.text for t in transformation(text, constraints, indices_to_modify=[0, 1])]
+        for text in texts
+    ]
+    assert [
+        [t.text for t in text_transformations]
+        for text_transformations in transformed_texts
+    ] == [
+        ["agood movie", "a goodmovie "],
+        ["theplot is fun", "the plotis fun"],
+    ]
+    for text_transformations in transformed_texts:
+        for text in text_transformations:
+            assert text.attack_attrs["last_transformation"] is transformation
+    assert capsys.readouterr().out == ""
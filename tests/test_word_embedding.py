@@ -1,4 +1,5 @@
 import os
+import pickle
 
 import numpy as np
 import pytest
@@ -49,3 +50,83 @@ bye-bye -1 1
     assert word_embedding.index2word(3) == "bye-bye"
     # remove test file
     os.remove(path)
+
+
+def test_embedding_save_load(tmp_path):
+    embedding_matrix = np.array([[1.0, 0.0], [1.0, 1.0], [-1.0, 0.0]])
+    word2index = {"hi": 0, "hello": 1, "bye": 2}
+    index2word = {i: w for w, i in word2index.items()}
+    nn_matrix = np.array([[0, 1, 2], [1, 0, 2], [2, 0, 1]])
+    word_embedding = WordEmbedding(embedding_matrix, word2index, index2word, nn_matrix)
+    mse_dist = word_embedding.get_mse_dist("bye", "hi")
+
+    word_embedding.save(str(tmp_path))
+    loaded = WordEmbedding.load(str(tmp_path))
+    assert pytest.approx(loaded["hello"][1]) == 1
+    assert loaded["ciao"] is None
+    assert loaded[10**9] is None
+    assert loaded.word2index("bye") == 2
+    assert loaded.index2word(1) == "hello"
+    with pytest.raises(KeyError):
+        loaded.word2index("ciao")
+    assert list(loaded.nearest_neighbours(0, 2)) == [1, 2]
+    # distances computed before saving are stored in the precomputed tables
+    assert loaded._precomputed_mse_dist.get(0, 2) == pytest.approx(mse_dist)
+    assert pytest.approx(loaded.get_mse_dist(2, 0)) == 4
+    assert pytest.approx(loaded.get_cos_sim(0, 1)) == 1 / np.sqrt(2)
+
+    unpickled = pickle.loads(pickle.dumps(loaded))
+    assert isinstance(unpickled.embedding_matrix, np.memmap)
+    assert unpickled.word2index("hi") == 0
+
+
+def test_embedding_neighbour_index():
+    from textattack.shared import IVFNeighbourIndex
+
+    embedding_matrix = np.array([[0.0, 0.0], [1.0, 0.0], [3.0, 0.0], [0.0, 2.5]])
+    word2index = {"a": 0, "b": 1, "c": 2, "d": 3}
+    index2word = {i: w for w, i in word2index.items()}
+    word_embedding = WordEmbedding(embedding_matrix, word2index, index2word)
+    assert word_embedding.nearest_neighbours(0, 2) == [1, 3]
+    assert word_embedding.nearest_neighbours_many([2, "d"], 1) == [[1], [0]]
+
+    nn_matrix = word_embedding.build_nn_matrix(topn=3)
+    assert nn_matrix.tolist() == [[0, 1, 3, 2], [1, 0, 2, 3], [2, 1, 0, 3], [3, 0, 1, 2]]
+    assert list(word_embedding.nearest_neighbours(1, 2)) == [0, 2]
+
+    # probing every list makes the approximate index exact
+    ivf = IVFNeighbourIndex(embedding_matrix, num_lists=2, num_probes=2)
+    assert ivf.query([0, 1], 2).tolist() == [[1, 3], [0, 2]]
+
+
+def test_embedding_gensim_neighbours():
+    gensim = pytest.importorskip("gensim")
+    rng = np.random.default_rng(0)
+    words = [f"word{i}" for i in range(50)]
+    keyed_vectors = gensim.models.KeyedVectors(8)
+    keyed_vectors.add_vectors(words, rng.normal(size=(50, 8)).astype(np.float32))
+    word_embedding = GensimWordEmbedding(keyed_vectors)
+
+    # Neighbours are the words with the highest cosine similarity, as with `similar_by_word`.
+    expected = [
+        [
+            keyed_vectors.key_to_index[w]
+            for w, _ in keyed_vectors.similar_by_word(word, 5)
+        ]
+        for word in words
+    ]
+    assert [word_embedding.nearest_neighbours(i, 5) for i in range(50)] == expected
+    assert word_embedding.nearest_neighbours_many([3, "word7", 3], 5) == [
+        expected[3],
+        expected[7],
+        expected[3],
+    ]
+    assert (3, 5) in word_embedding._nn_cache
+
+    unpickled = pickle.loads(pickle.dumps(word_embedding))
+    assert unpickled.neighbour_index is None
+    assert unpickled.nearest_neighbours(3, 5) == expected[3]
+
+    nn_matrix = word_embedding.build_nn_matrix(topn=5)
+    assert nn_matrix[:, 1:].tolist() == expected
+    assert list(word_embedding.nearest_neighbours(3, 2)) == expected[3][:2]
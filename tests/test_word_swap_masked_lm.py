@@ -0,0 +1,288 @@
+import itertools
+
+import pytest
+import torch
+import transformers
+
+from textattack.shared import AttackedText, utils
+from textattack.transformations import WordSwapMaskedLM
+
+VOCAB = (
+    ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    + ["the", "a", "film", "movie", "was", "is", "fun", "bore", "to", "good", "bad"]
+    + ["un", "re", "##believ", "##ab", "##able", "##ly", "##s", "##ing", "##ed"]
+    + [",", ".", "!", "?", ";", ":", "-", "(", ")", "'"]
+)
+TEXT = "the film was unbelievably fun , unable to bore"
+
+
+@pytest.fixture
+def masked_lm(tmp_path):
+    """A tiny random masked language model, and a tokenizer that splits
+    words like "unbelievably" into several sub-words."""
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(VOCAB) + "\n")
+    tokenizer = transformers.BertTokenizerFast(vocab_file=str(vocab_file))
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=len(VOCAB),
+        hidden_size=16,
+        num_hidden_layers=1,
+        num_attention_heads=2,
+        intermediate_size=32,
+        max_position_embeddings=64,
+    )
+    return transformers.BertForMaskedLM(config), tokenizer
+
+
+def old_bert_attack_transformations(transformation, current_text, indices_to_modify):
+    """Transformations of ``current_text`` by BERT-Attack before it was
+    vectorized: every combination of the top-K sub-words of a word is scored
+    with a cross-entropy loss, in the order of ``itertools.product``, and the
+    combinations are sorted by perplexity."""
+    tokenizer = transformation._lm_tokenizer
+    model_type = transformation._language_model.config.model_type
+    inputs = transformation._encode_text(current_text.text)
+    with torch.no_grad():
+        masked_lm_logits = transformation._language_model(**inputs)[0][0].cpu()
+    id_preds = torch.topk(masked_lm_logits, transformation.max_candidates).indices
+
+    transformed_texts = []
+    for index in indices_to_modify:
+        masked_text = current_text.replace_word_at_index(index, tokenizer.mask_token)
+        current_ids = transformation._encode_text(masked_text.text)["input_ids"]
+        masked_index = current_ids[0].tolist().index(tokenizer.mask_token_id)
+        word_tokens = tokenizer.encode(
+            current_text.words[index], add_special_tokens=False
+        )
+        target_ids_pos = list(
+            range(
+                masked_index,
+                min(masked_index + len(word_tokens), transformation.max_length),
+            )
+        )
+        if len(target_ids_pos) == 1:
+            replacement_words = []
+            for id in id_preds[target_ids_pos[0]].tolist():
+                token = tokenizer.convert_ids_to_tokens(id)
+                if utils.is_one_word(token) and not utils.check_if_subword(
+                    token, model_type, index == 0
+                ):
+                    replacement_words.append(token)
+        else:
+            combination_results = []
+            logits = masked_lm_logits[target_ids_pos]
+            for bpe_tokens in itertools.product(*id_preds[target_ids_pos].tolist()):
+                loss = torch.nn.functional.cross_entropy(
+                    logits, torch.tensor(bpe_tokens), reduction="none"
+                )
+                perplexity = torch.exp(torch.mean(loss, dim=0)).item()
+                word = "".join(tokenizer.convert_ids_to_tokens(bpe_tokens)).replace(
+                    "##", ""
+                )
+                if utils.is_one_word(word):
+                    combination_results.append((word, perplexity))
+            combination_results = sorted(combination_results, key=lambda x: x[1])
+            replacement_words = [
+                word for word, _ in combination_results[: transformation.max_candidates]
+            ]
+        for word in replacement_words:
+            word = word.strip("Ġ")
+            if word != current_text.words[index]:
+                transformed_texts.append(
+                    current_text.replace_word_at_index(index, word)
+                )
+    return transformed_texts
+
+
+def old_bae_top_words(
+    mask_token_logits, starting, tokenizer, model_type, max_candidates, min_confidence
+):
+    """Candidate words of BAE for one masked position before they were picked
+    with a single ``topk``: the whole vocabulary is ranked, and walked one id
+    at a time."""
+    mask_token_probs = torch.softmax(mask_token_logits, dim=0)
+    ranked_indices = torch.argsort(mask_token_probs, descending=True)
+    top_words = []
+    for _id in ranked_indices:
+        _id = _id.item()
+        word = tokenizer.convert_ids_to_tokens(_id)
+        if utils.check_if_subword(word, model_type, starting):
+            word = utils.strip_BPE_artifacts(word, model_type)
+        if (
+            mask_token_probs[_id] >= min_confidence
+            and utils.is_one_word(word)
+            and not utils.check_if_punctuations(word)
+        ):
+            top_words.append(word)
+
+        if len(top_words) >= max_candidates or mask_token_probs[_id] < min_confidence:
+            break
+    return top_words
+
+
+@pytest.mark.parametrize("max_candidates", [1, 5, len(VOCAB)])
+@pytest.mark.parametrize("min_confidence", [0.0, 0.02, 0.1])
+def test_masked_lm_top_words_matches_old_loop(
+    masked_lm, max_candidates, min_confidence
+):
+    _, tokenizer = masked_lm
+    torch.manual_seed(0)
+    mask_token_logits = 2 * torch.randn(8, len(VOCAB))
+    # The most probable tokens of some positions are punctuation and sub-words.
+    mask_token_logits[0, tokenizer.convert_tokens_to_ids([",", "!", "##ing"])] = (
+        torch.tensor([8.0, 7.5, 7.0])
+    )
+    mask_token_logits[1, tokenizer.convert_tokens_to_ids(["##able", "##s"])] = (
+        torch.tensor([8.0, 7.5])
+    )
+    starting = [False, True] * 4
+
+    top_words = utils.masked_lm_top_words(
+        mask_token_logits,
+        starting,
+        tokenizer,
+        "bert",
+        max_candidates,
+        min_confidence,
+    )
+
+    assert top_words == [
+        old_bae_top_words(logits, s, tokenizer, "bert", max_candidates, min_confidence)
+        for logits, s in zip(mask_token_logits, starting)
+    ]
+    if min_confidence > 0 and max_candidates > 1:
+        # Some positions are cut off by `min_confidence` before `max_candidates`.
+        assert any(len(words) < max_candidates for words in top_words)
+    assert (
+        utils.masked_lm_top_words(
+            mask_token_logits[:0], [], tokenizer, "bert", max_candidates, min_confidence
+        )
+        == []
+    )
+
+
+def test_bae_matches_old_loop(masked_lm):
+    model, tokenizer = masked_lm
+    transformation = WordSwapMaskedLM(
+        method="bae",
+        masked_language_model=model,
+        tokenizer=tokenizer,
+        max_length=12,
+        max_candidates=5,
+        min_confidence=0.01,
+        batch_size=4,
+    )
+    current_text = AttackedText(TEXT)
+    indices_to_modify = list(range(current_text.num_words))
+
+    replacement_words = transformation._bae_replacement_words(
+        current_text, indices_to_modify
+    )
+
+    old_replacement_words = []
+    for index in indices_to_modify:
+        masked_text = current_text.replace_word_at_index(index, tokenizer.mask_token)
+        inputs = transformation._encode_text(masked_text.text)
+        ids = inputs["input_ids"][0].tolist()
+        if tokenizer.mask_token_id not in ids:
+            # The mask token was truncated.
+            old_replacement_words.append([])
+            continue
+        masked_index = ids.index(tokenizer.mask_token_id)
+        with torch.no_grad():
+            logits = model(**inputs)[0][0, masked_index]
+        old_replacement_words.append(
+            old_bae_top_words(logits, masked_index == 1, tokenizer, "bert", 5, 0.01)
+        )
+    assert replacement_words == old_replacement_words
+    assert [] in replacement_words
+    assert any(replacement_words)
+
+
+@pytest.mark.parametrize("max_candidates", [3, 8, 12])
+def test_bert_attack_matches_old_combination_loop(masked_lm, max_candidates):
+    model, tokenizer = masked_lm
+    transformation = WordSwapMaskedLM(
+        method="bert-attack",
+        masked_language_model=model,
+        tokenizer=tokenizer,
+        max_length=32,
+        max_candidates=max_candidates,
+    )
+    current_text = AttackedText(TEXT)
+    indices_to_modify = list(range(current_text.num_words))
+    # "unbelievably" and "unable" are split into several sub-words.
+    assert len(tokenizer.tokenize("unbelievably")) == 4
+    assert len(tokenizer.tokenize("unable")) == 2
+
+    transformed_texts = transformation._get_transformations(
+        current_text, indices_to_modify
+    )
+    old_transformed_texts = old_bert_attack_transformations(
+        transformation, current_text, indices_to_modify
+    )
+
+    assert [text.text for text in transformed_texts] == [
+        text.text for text in old_transformed_texts
+    ]
+
+
+def test_top_combinations_matches_full_ranking():
+    torch.manual_seed(0)
+    num_words, num_tokens, num_preds = 3, 4, 5
+    # Rounded log-probabilities, so that some combinations tie.
+    log_probs = torch.round(torch.randn(num_words, num_tokens, num_preds), decimals=1)
+
+    products = list(itertools.product(range(num_preds), repeat=num_tokens))
+    for num_combinations in [1, 7, 40, num_preds**num_tokens]:
+        combinations = WordSwapMaskedLM._top_combinations(log_probs, num_combinations)
+        assert combinations.shape == (num_words, num_combinations, num_tokens)
+        for w in range(num_words):
+            # Sum in the same order as `_top_combinations`, for exact ties.
+            log_probs_sums = []
+            for combination in products:
+                log_probs_sum = torch.zeros(())
+                for t, k in enumerate(combination):
+                    log_probs_sum = log_probs_sum + log_probs[w, t, k]
+                log_probs_sums.append(log_probs_sum.item())
+            ranking = sorted(range(len(products)), key=lambda c: -log_probs_sums[c])
+            assert combinations[w].tolist() == [
+                list(products[c]) for c in ranking[:num_combinations]
+            ]
+
+
+def test_bert_attack_ranks_more_combinations_until_enough_are_words(masked_lm):
+    model, tokenizer = masked_lm
+    transformation = WordSwapMaskedLM(
+        method="bert-attack",
+        masked_language_model=model,
+        tokenizer=tokenizer,
+        max_candidates=3,
+    )
+    current_text = AttackedText("the film was unable to bore")
+    # The most likely sub-words are punctuation, so the best combinations are not words.
+    id_preds = torch.tensor(
+        [
+            tokenizer.convert_tokens_to_ids([",", ".", "un"]),
+            tokenizer.convert_tokens_to_ids(["!", "?", "##able"]),
+        ]
+    )
+    top_log_probs = torch.tensor([[-0.1, -0.2, -3.0], [-0.1, -0.2, -3.0]])
+
+    replacement_words = transformation._bert_attack_replacement_words(
+        current_text, [3], [[4, 5]], [4, 5], id_preds, top_log_probs
+    )
+
+    combinations = sorted(
+        itertools.product(range(3), repeat=2),
+        key=lambda c: -(top_log_probs[0, c[0]] + top_log_probs[1, c[1]]).item(),
+    )
+    words = [
+        tokenizer.convert_ids_to_tokens([id_preds[0, i], id_preds[1, j]])
+        for i, j in combinations
+    ]
+    words = ["".join(word).replace("##", "") for word in words]
+    expected_words = [word for word in words if utils.is_one_word(word)][:3]
+    assert words.index(expected_words[-1]) >= 6
+    assert replacement_words == [expected_words]
@@ -21,19 +21,8 @@ from textattack.goal_function_results import GoalFunctionResultStatus
 from textattack.goal_functions import GoalFunction
 from textattack.models.wrappers import ModelWrapper
 from textattack.search_methods import SearchMethod
-from textattack.shared import AttackedText, utils
+from textattack.shared import AttackProfile, AttackedText, utils
 from textattack.transformations import CompositeTransformation, Transformation
-from contextlib import contextmanager
-from timeit import default_timer
-
-
-@contextmanager
-def elapsed_timer():
-    start = default_timer()
-    elapser = lambda: default_timer() - start
-    yield lambda: elapser()
-    end = default_timer()
-    elapser = lambda: end - start
 
 
 class Attack:
@@ -157,6 +146,9 @@ class Attack:
 
         self.constraint_cache_size = constraint_cache_size
         self.constraints_cache = lru.LRU(constraint_cache_size)
+        # Set when the constraints are shared with other attacks running at the
+        # same time, so that their caches are not cleared after each example.
+        self._shared_constraints = False
 
         # Give search method access to functions for getting transformations and evaluating them
         self.search_method.get_transformations = self.get_transformations
@@ -166,25 +158,47 @@ class Attack:
         # The search method only needs access to the first argument. The second is only used
         # by the attack class when checking whether to skip the sample
         self.search_method.get_goal_results = self.get_goal_func_results
+        self.search_method.get_goal_results_async = self.get_goal_func_results_async
 
         # Give search method access to get indices which need to be ordered / searched
         self.search_method.get_indices_to_order = self.get_indices_to_order
 
         self.search_method.filter_transformations = self.filter_transformations
 
-        self.timers = {
-            "constraints": {C.__class__.__name__: 0 for C in self.constraints},
-            "transformation": 0,
-            "search_method": 0,
-            "goal_function": 0,
-        }
+        self.profile = AttackProfile([C.__class__.__name__ for C in self.constraints])
+
+    @property
+    def timers(self):
+        """Seconds spent in each stage of the attack.
+
+        See :class:`~textattack.shared.AttackProfile`.
+        """
+        return self.profile.timers
 
     def get_goal_func_results(self, attacked_text_list, check_skip=False, **kwargs):
-        with elapsed_timer() as elapsed:
+        with self.profile.timer("goal_function"):
             results = self.goal_function.get_results(attacked_text_list, check_skip, **kwargs)
-            self.timers["goal_function"] += elapsed()
         return results
 
+    def get_goal_func_results_async(self, attacked_text_list, check_skip=False):
+        """Like ``get_goal_func_results``, but returns a function that waits
+        for the results instead of the results, so that the caller can do
+        other work while the model runs.
+
+        See :meth:`~textattack.goal_functions.GoalFunction.get_results_async`.
+        """
+        with self.profile.timer("goal_function"):
+            wait_for_results, search_over = self.goal_function.get_results_async(
+                attacked_text_list, check_skip
+            )
+
+        def timed_wait_for_results():
+            with self.profile.timer("goal_function"):
+                results = wait_for_results()
+            return results
+
+        return timed_wait_for_results, search_over
+
     def clear_cache(self, recursive=True):
         self.constraints_cache.clear()
         if self.use_transformation_cache:
@@ -293,13 +307,13 @@ class Attack:
         Returns:
             A filtered list of transformations where each transformation matches the constraints
         """
-        with elapsed_timer() as elapsed:
+        with self.profile.timer("transformation"):
             transformed_texts = self.transformation(
                 current_text,
                 pre_transformation_constraints=self.pre_transformation_constraints,
                 **kwargs,
             )
-            self.timers["transformation"] += elapsed()
+        self.profile.count("transformations", n=len(transformed_texts))
 
         return transformed_texts
 
@@ -325,7 +339,9 @@ class Attack:
                     cache_key
                 ]
                 transformed_texts = list(self.transformation_cache[cache_key])
+                self.profile.count("caches", "transformation", "hits")
             else:
+                self.profile.count("caches", "transformation", "misses")
                 transformed_texts = self._get_transformations_uncached(
                     current_text, original_text, **kwargs
                 )
@@ -340,43 +356,85 @@ class Attack:
             transformed_texts, current_text, original_text
         )
 
-    def get_transformations_batched(self, texts, original_text=None, indices_to_modify=None, **kwargs):
-        if indices_to_modify is None:
-            indices_to_modify = []
+    def get_transformations_batched(
+        self, current_texts, original_text=None, flatten=True, **kwargs
+    ):
+        """Applies ``self.transformation`` to each of ``current_texts``, then
+        filters the possible transformations through the applicable
+        constraints.
+
+        Texts whose transformations are not in the transformation cache are
+        transformed together through a single batched call to
+        ``self.transformation``, so that transformations backed by a model
+        (e.g. :class:`~textattack.transformations.WordSwapMaskedLM`) can run
+        one forward pass for all of them.
+
+        Args:
+            current_texts: The list of ``AttackedText`` on which to perform the transformations.
+            original_text: The original ``AttackedText`` from which the attack started.
+            flatten: If ``True``, concatenate the transformations of all texts. Otherwise, return a separate list for each text.
+        Returns:
+            The filtered transformations of each text in ``current_texts``, concatenated in the order of ``current_texts``.
+        """
         if not self.transformation:
             raise RuntimeError(
-                "Cannot call `get_transformations` without a transformation."
-            )
-        transformed_texts = []
-        if self.use_transformation_cache:
-            texts_to_get = []
-            for current_text in texts:
-                cache_key = tuple([current_text] + sorted(kwargs.items()))
-                if utils.hashable(cache_key) and cache_key in self.transformation_cache:
-                    # promote transformed_text to the top of the LRU cache
-                    self.transformation_cache[cache_key] = self.transformation_cache[
-                        cache_key
-                    ]
-                    transformed_texts.append(list(self.transformation_cache[cache_key]))
-                else:
-                    texts_to_get.append(current_text)
-            transformed_texts = self._get_transformations_uncached(
-                texts_to_get, original_text, indices_to_modify=indices_to_modify, **kwargs
+                "Cannot call `get_transformations_batched` without a transformation."
             )
-            for current_text, transformed_text in zip(texts_to_get, transformed_texts):
-                cache_key = tuple([current_text] + sorted(kwargs.items()))
-                self.transformation_cache[cache_key] = tuple(transformed_text)
-                if utils.hashable(cache_key):
-                    self.transformation_cache[cache_key] = tuple(transformed_texts)
-        else:
-            transformed_texts = self._get_transformations_uncached(
-                texts, original_text, indices_to_modify=indices_to_modify, **kwargs
+        transformed_texts = [None] * len(current_texts)
+        # Texts we need to transform, their cache keys (or ``None`` if they can't be cached),
+        # and their positions in ``current_texts``. The same text can appear more than once,
+        # e.g. in a beam, but is only transformed once.
+        texts_to_transform = []
+        cache_keys = []
+        positions = []
+        cache_key_to_index = {}
+        for i, current_text in enumerate(current_texts):
+            cache_key = tuple([current_text] + sorted(kwargs.items()))
+            if not (self.use_transformation_cache and utils.hashable(cache_key)):
+                cache_key = None
+            elif cache_key in self.transformation_cache:
+                # promote transformed_text to the top of the LRU cache
+                self.transformation_cache[cache_key] = self.transformation_cache[
+                    cache_key
+                ]
+                transformed_texts[i] = list(self.transformation_cache[cache_key])
+                self.profile.count("caches", "transformation", "hits")
+                continue
+            elif cache_key in cache_key_to_index:
+                positions[cache_key_to_index[cache_key]].append(i)
+                self.profile.count("caches", "transformation", "hits")
+                continue
+            else:
+                cache_key_to_index[cache_key] = len(texts_to_transform)
+                self.profile.count("caches", "transformation", "misses")
+            texts_to_transform.append(current_text)
+            cache_keys.append(cache_key)
+            positions.append([i])
+
+        if texts_to_transform:
+            with self.profile.timer("transformation"):
+                new_transformed_texts = self.transformation.transform_many(
+                    texts_to_transform,
+                    pre_transformation_constraints=self.pre_transformation_constraints,
+                    **kwargs,
+                )
+            self.profile.count(
+                "transformations", n=sum(len(texts) for texts in new_transformed_texts)
             )
-        filtered_texts = []
-        for transformed_texts, current_text in zip(transformed_texts, texts):
-            filtered_texts.extend(self.filter_transformations(
-                transformed_texts, current_text, original_text
-            ))
+            for cache_key, text_positions, texts in zip(
+                cache_keys, positions, new_transformed_texts
+            ):
+                if cache_key is not None:
+                    self.transformation_cache[cache_key] = tuple(texts)
+                for i in text_positions:
+                    transformed_texts[i] = list(texts)
+
+        filtered_texts = [
+            self.filter_transformations(texts, current_text, original_text)
+            for current_text, texts in zip(current_texts, transformed_texts)
+        ]
+        if flatten:
+            return [t for texts in filtered_texts for t in texts]
         return filtered_texts
 
     def _filter_transformations_uncached(
@@ -392,9 +450,11 @@ class Attack:
         """
         filtered_texts = transformed_texts[:]
         for C in self.constraints:
-            with elapsed_timer() as elapsed:
-                if len(filtered_texts) == 0:
-                    break
+            if len(filtered_texts) == 0:
+                break
+            name = C.__class__.__name__
+            self.profile.count("constraints", name, "candidates", n=len(filtered_texts))
+            with self.profile.timer("constraints", name):
                 if C.compare_against_original:
                     if not original_text:
                         raise ValueError(
@@ -404,7 +464,7 @@ class Attack:
                     filtered_texts = C.call_many(filtered_texts, original_text)
                 else:
                     filtered_texts = C.call_many(filtered_texts, current_text)
-                self.timers["constraints"][C.__class__.__name__] += elapsed()
+            self.profile.count("constraints", name, "passed", n=len(filtered_texts))
         # Default to false for all original transformations.
         for original_transformed_text in transformed_texts:
             self.constraints_cache[(current_text, original_transformed_text)] = False
@@ -442,6 +502,13 @@ class Attack:
                 ] = self.constraints_cache[(current_text, transformed_text)]
                 if self.constraints_cache[(current_text, transformed_text)]:
                     filtered_texts.append(transformed_text)
+        self.profile.count(
+            "caches",
+            "constraint",
+            "hits",
+            n=len(transformed_texts) - len(uncached_texts),
+        )
+        self.profile.count("caches", "constraint", "misses", n=len(uncached_texts))
         filtered_texts += self._filter_transformations_uncached(
             uncached_texts, current_text, original_text=original_text
         )
@@ -461,15 +528,20 @@ class Attack:
                 or ``MaximizedAttackResult``.
         """
         num_queries = 0
-        with elapsed_timer() as elapsed:
+        with self.profile.timer("search_method"):
             results, queries = self.search_method(initial_result)
-            self.timers["search_method"] += elapsed()
         results = results if isinstance(results, list) else [results]
         limit = self.attack_args.max_ptb_result_limit
         if limit and len(results) > limit:
             results = results[:limit]
         num_queries += queries
-        self.clear_cache()
+        if self._shared_constraints:
+            # The other attacks sharing the constraints may still be attacking
+            # their examples.
+            self.clear_cache(recursive=False)
+            self.goal_function.clear_cache()
+        else:
+            self.clear_cache()
         final_results = []
         for result in results:
             if result.goal_status == GoalFunctionResultStatus.SUCCEEDED:
@@ -517,14 +589,27 @@ class Attack:
         assert isinstance(
             ground_truth_output, (int, str)
         ), "`ground_truth_output` must either be `str` or `int`."
-        goal_function_result, _ = self.goal_function.init_attack_example(
-            example, ground_truth_output
-        )
+        profile_state = self.profile.start_example(self._model_cache_stats())
+        with self.profile.timer("goal_function"):
+            goal_function_result, _ = self.goal_function.init_attack_example(
+                example, ground_truth_output
+            )
         if goal_function_result.goal_status == GoalFunctionResultStatus.SKIPPED:
-            return [SkippedAttackResult(goal_function_result)], 0
+            result, num_queries = [SkippedAttackResult(goal_function_result)], 0
         else:
             result, num_queries = self._attack(goal_function_result)
-            return result, num_queries
+        self.profile.end_example(
+            profile_state, num_queries, self._model_cache_stats()
+        )
+        return result, num_queries
+
+    def _model_cache_stats(self):
+        """Returns the running hit and miss counts of the model caches of the
+        goal function, for ``self.profile``."""
+        stats = {"model": self.goal_function.cache_stats()}
+        if self.goal_function.persistent_cache is not None:
+            stats["persistent_model"] = self.goal_function.persistent_cache.stats()
+        return stats
 
     def __repr__(self):
         """Prints attack parameters in a human-readable string.
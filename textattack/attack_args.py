@@ -155,6 +155,25 @@ class AttackArgs:
             If set, checkpoint will be saved after attacking every `N` examples. If :obj:`None` is passed, no checkpoints will be saved.
         checkpoint_dir (:obj:`str`, `optional`, defaults to :obj:`"checkpoints"`):
             The directory to save checkpoint files.
+        model_cache_path (:obj:`str`, `optional`, defaults to :obj:`None`):
+            If set, victim model outputs are also stored in an SQLite database at this path. Unlike the in-memory model cache,
+            it persists across examples, runs, resumed checkpoints, different recipes and worker processes.
+        model_cache_fingerprint (:obj:`str`, `optional`, defaults to :obj:`None`):
+            String identifying the victim model in the persistent model cache. If not set, it is computed by hashing the model's weights.
+        async_model_calls (:obj:`bool`, `optional`, defaults to :obj:`False`):
+            If :obj:`True`, run the victim model on a worker thread, so that it works while the search method prepares more
+            candidates and while the next example to attack is loaded. See :meth:`~textattack.goal_functions.GoalFunction.enable_async_model_calls`.
+        max_pending_model_calls (:obj:`int`, `optional`, defaults to :obj:`2`):
+            Maximum number of model calls waiting for the worker thread when :obj:`async_model_calls=True`.
+        deterministic_model_calls (:obj:`bool`, `optional`, defaults to :obj:`True`):
+            If :obj:`True`, model calls on the worker thread are batched exactly as without it, so that results do not change.
+            If :obj:`False`, waiting model calls are merged into shared batches, which can change model outputs slightly.
+        num_concurrent_examples (:obj:`int`, `optional`, defaults to :obj:`1`):
+            Number of examples to attack at the same time when not running in parallel mode. Their searches take turns, and the
+            model calls they make in the meantime are merged into shared batches (see :class:`~textattack.shared.CoalescingScheduler`).
+            This fills model batches better when each search step queries few texts. Results are still logged in order, but
+            randomized search methods draw their random numbers in a different order than when attacking one example at a time.
+            Times in the profile of the attack (see :obj:`enable_profiling`) include the time an example waits for the others.
         random_seed (:obj:`int`, `optional`, defaults to :obj:`765`):
             Random seed for reproducibility.
         parallel (:obj:`False`, `optional`, defaults to :obj:`False`):
@@ -162,6 +181,9 @@ class AttackArgs:
         num_workers_per_device (:obj:`int`, `optional`, defaults to :obj:`1`):
             Number of worker processes to run per device in parallel mode (i.e. :obj:`parallel=True`). For example, if you are using GPUs and :obj:`num_workers_per_device=2`,
             then 2 processes will be running in each GPU.
+        num_cpu_workers (:obj:`int`, `optional`, defaults to :obj:`None`):
+            Number of worker processes to run in parallel mode (i.e. :obj:`parallel=True`) when no GPU is available.
+            The worklist is then sharded across this many CPU processes. If :obj:`None`, one worker per available CPU core is used.
         log_to_txt (:obj:`str`, `optional`, defaults to :obj:`None`):
             If set, save attack logs as a `.txt` file to the directory specified by this argument.
             If the last part of the provided path ends with `.txt` extension, it is assumed to the desired path of the log file.
@@ -183,8 +205,21 @@ class AttackArgs:
             Disable displaying individual attack results to stdout.
         silent (:obj:`bool`, `optional`, defaults to :obj:`False`):
             Disable all logging (except for errors). This is stronger than :obj:`disable_stdout`.
+        stream_results (:obj:`bool`, `optional`, defaults to :obj:`False`):
+            Once a result has been logged, only keep a compact :class:`~textattack.attack_results.AttackResultSummary` of it
+            instead of the whole result, so that memory stays flat however many examples are attacked. The summary metrics
+            are computed on these, and :meth:`~textattack.Attacker.attack_dataset` returns them instead of the results.
         enable_advance_metrics (:obj:`bool`, `optional`, defaults to :obj:`False`):
             Enable calculation and display of optional advance post-hoc metrics like perplexity, grammar errors, etc.
+        enable_profiling (:obj:`bool`, `optional`, defaults to :obj:`False`):
+            Add a profile of the attack to the summary: the time spent in the search method, goal function, transformation
+            and each constraint, the number of queries and transformations per example, the share of candidates filtered by
+            each constraint, and the hit rates of the transformation, constraint and model caches. The JSON summary also gets
+            these for each example. See :class:`~textattack.shared.AttackProfile`.
+        profile_output (:obj:`str`, `optional`, defaults to :obj:`None`):
+            If set, save a profile of the attack to this path, and enable :obj:`enable_profiling`. If the path ends with
+            `.json`, it is a Chrome trace of the stages of each example, which can be opened with `chrome://tracing` or Perfetto.
+            Otherwise, it is a :mod:`cProfile` profile of the main process, which can be read with :mod:`pstats`.
     """
 
     num_examples: int = 10
@@ -195,9 +230,16 @@ class AttackArgs:
     query_budget: int = None
     checkpoint_interval: int = None
     checkpoint_dir: str = "checkpoints"
+    model_cache_path: str = None
+    model_cache_fingerprint: str = None
+    async_model_calls: bool = False
+    max_pending_model_calls: int = 2
+    deterministic_model_calls: bool = True
+    num_concurrent_examples: int = 1
     random_seed: int = 765  # equivalent to sum((ord(c) for c in "TEXTATTACK"))
     parallel: bool = False
     num_workers_per_device: int = 1
+    num_cpu_workers: int = None
     log_to_txt: str = None
     log_to_csv: str = None
     log_summary_to_json: str = None
@@ -206,7 +248,10 @@ class AttackArgs:
     log_to_wandb: dict = None
     disable_stdout: bool = False
     silent: bool = False
+    stream_results: bool = False
     enable_advance_metrics: bool = False
+    enable_profiling: bool = False
+    profile_output: str = None
     max_ptb_result_limit: int = None
 
     def __post_init__(self):
@@ -233,6 +278,20 @@ class AttackArgs:
             self.num_workers_per_device > 0
         ), "`num_workers_per_device` must be greater than 0."
 
+        if self.num_cpu_workers is not None:
+            assert self.num_cpu_workers > 0, "`num_cpu_workers` must be greater than 0."
+
+        assert (
+            self.max_pending_model_calls > 0
+        ), "`max_pending_model_calls` must be greater than 0."
+
+        assert (
+            self.num_concurrent_examples > 0
+        ), "`num_concurrent_examples` must be greater than 0."
+
+        if self.profile_output:
+            self.enable_profiling = True
+
     @classmethod
     def _add_parser_args(cls, parser):
         """Add listed args to command line parser."""
@@ -292,6 +351,45 @@ class AttackArgs:
             default=default_obj.checkpoint_interval,
             help="If set, checkpoint will be saved after attacking every N examples. If not set, no checkpoints will be saved.",
         )
+        parser.add_argument(
+            "--model-cache-path",
+            required=False,
+            type=str,
+            default=default_obj.model_cache_path,
+            help="If set, also store victim model outputs in an SQLite database at this path, shared across runs and worker processes.",
+        )
+        parser.add_argument(
+            "--model-cache-fingerprint",
+            required=False,
+            type=str,
+            default=default_obj.model_cache_fingerprint,
+            help="String identifying the victim model in the persistent model cache. Defaults to a hash of the model's weights.",
+        )
+        parser.add_argument(
+            "--async-model-calls",
+            action="store_true",
+            default=default_obj.async_model_calls,
+            help="Run the victim model on a worker thread, overlapping it with candidate generation and loading the next example.",
+        )
+        parser.add_argument(
+            "--max-pending-model-calls",
+            type=int,
+            default=default_obj.max_pending_model_calls,
+            help="Maximum number of model calls waiting for the worker thread with `--async-model-calls`.",
+        )
+        parser.add_argument(
+            "--no-deterministic-model-calls",
+            action="store_false",
+            dest="deterministic_model_calls",
+            default=default_obj.deterministic_model_calls,
+            help="With `--async-model-calls`, merge waiting model calls into shared batches. This can change model outputs slightly.",
+        )
+        parser.add_argument(
+            "--num-concurrent-examples",
+            type=int,
+            default=default_obj.num_concurrent_examples,
+            help="Number of examples to attack at the same time, merging their model calls into shared batches.",
+        )
         parser.add_argument(
             "--random-seed",
             default=default_obj.random_seed,
@@ -302,7 +400,7 @@ class AttackArgs:
             "--parallel",
             action="store_true",
             default=default_obj.parallel,
-            help="Run attack using multiple GPUs.",
+            help="Run attack using multiple GPUs, or multiple CPU processes if no GPU is available.",
         )
         parser.add_argument(
             "--num-workers-per-device",
@@ -310,6 +408,12 @@ class AttackArgs:
             type=int,
             help="Number of worker processes to run per device.",
         )
+        parser.add_argument(
+            "--num-cpu-workers",
+            default=default_obj.num_cpu_workers,
+            type=int,
+            help="Number of worker processes to run with `--parallel` when no GPU is available. Defaults to the number of CPU cores.",
+        )
         parser.add_argument(
             "--log-to-txt",
             nargs="?",
@@ -376,12 +480,30 @@ class AttackArgs:
             default=default_obj.silent,
             help="Disable all logging",
         )
+        parser.add_argument(
+            "--stream-results",
+            action="store_true",
+            default=default_obj.stream_results,
+            help="Only keep compact summaries of the attack results once they are logged, so that memory does not grow with the number of examples.",
+        )
         parser.add_argument(
             "--enable-advance-metrics",
             action="store_true",
             default=default_obj.enable_advance_metrics,
             help="Enable calculation and display of optional advance post-hoc metrics like perplexity, USE distance, etc.",
         )
+        parser.add_argument(
+            "--enable-profiling",
+            action="store_true",
+            default=default_obj.enable_profiling,
+            help="Add the time spent in each stage of the attack, and cache hit rates, to the summary.",
+        )
+        parser.add_argument(
+            "--profile-output",
+            type=str,
+            default=default_obj.profile_output,
+            help="Path to save a profile of the attack to: a Chrome trace if it ends with `.json`, or else a cProfile (pstats) file.",
+        )
 
         return parser
 
@@ -392,7 +514,9 @@ class AttackArgs:
         ), f"Expect args to be of type `{type(cls)}`, but got type `{type(args)}`."
 
         # Create logger
-        attack_log_manager = textattack.loggers.AttackLogManager()
+        attack_log_manager = textattack.loggers.AttackLogManager(
+            streaming=args.stream_results
+        )
 
         # Get current time for file naming
         timestamp = time.strftime("%Y-%m-%d-%H-%M")
@@ -490,6 +614,8 @@ class _CommandLineAttackArgs:
             If `True`, attack in parallel.
         model_batch_size (:obj:`int`, `optional`, defaults to :obj:`32`):
             The batch size for making queries to the victim model.
+        model_batch_by_length (:obj:`bool`, `optional`, defaults to :obj:`False`):
+            If `True`, group queries of similar length into the same batch before calling the victim model.
         model_cache_size (:obj:`int`, `optional`, defaults to :obj:`2**18`):
             The maximum number of items to keep in the model results cache at once.
         constraint-cache-size (:obj:`int`, `optional`, defaults to :obj:`2**18`):
@@ -505,6 +631,7 @@ class _CommandLineAttackArgs:
     interactive: bool = False
     parallel: bool = False
     model_batch_size: int = 32
+    model_batch_by_length: bool = False
     model_cache_size: int = 2**18
     constraint_cache_size: int = 2**18
 
@@ -579,6 +706,12 @@ class _CommandLineAttackArgs:
             default=default_obj.model_batch_size,
             help="The batch size for making calls to the model.",
         )
+        parser.add_argument(
+            "--model-batch-by-length",
+            action="store_true",
+            default=default_obj.model_batch_by_length,
+            help="Group queries of similar length into the same batch to reduce padding.",
+        )
         parser.add_argument(
             "--model-cache-size",
             type=int,
@@ -655,6 +788,7 @@ class _CommandLineAttackArgs:
             goal_function.query_budget = args.query_budget
         goal_function.model_cache_size = args.model_cache_size
         goal_function.batch_size = args.model_batch_size
+        goal_function.batch_by_length = args.model_batch_by_length
         return goal_function
 
     @classmethod
@@ -706,6 +840,7 @@ class _CommandLineAttackArgs:
             if args.query_budget:
                 recipe.goal_function.query_budget = args.query_budget
             recipe.goal_function.model_cache_size = args.model_cache_size
+            recipe.goal_function.batch_by_length = args.model_batch_by_length
             recipe.constraint_cache_size = args.constraint_cache_size
             return recipe
         elif args.attack_from_file:
@@ -10,3 +10,9 @@ from .maximized_attack_result import MaximizedAttackResult
 from .failed_attack_result import FailedAttackResult
 from .skipped_attack_result import SkippedAttackResult
 from .successful_attack_result import SuccessfulAttackResult
+from .attack_result_summary import (
+    AttackResultSummarizer,
+    AttackResultSummary,
+    successful_text_pairs,
+    summarize_results,
+)
@@ -0,0 +1,146 @@
+"""
+AttackResultSummary Class
+============================
+
+"""
+
+from .attack_result import AttackResult
+from .failed_attack_result import FailedAttackResult
+from .skipped_attack_result import SkippedAttackResult
+
+
+class AttackResultSummary:
+    """A compact record of an :class:`~textattack.attack_results.AttackResult`,
+    holding what the attack metrics need and nothing else.
+
+    Unlike the result, it does not keep the attacked texts and goal function
+    results alive, so it can be kept for every example of a large dataset.
+
+    Args:
+        result (:class:`~textattack.attack_results.AttackResult`): The result to summarize.
+        same_example (:obj:`bool`, `optional`, defaults to :obj:`False`): Whether ``result`` is another result of the
+            example of the result summarized before it, e.g. when a search method returns several perturbations.
+    """
+
+    __slots__ = (
+        "result_type",
+        "original_text",
+        "perturbed_text",
+        "original_score",
+        "perturbed_score",
+        "original_output",
+        "perturbed_output",
+        "ground_truth_output",
+        "num_queries",
+        "num_words",
+        "num_words_changed",
+        "same_example",
+    )
+
+    def __init__(self, result, same_example=False):
+        original_result = result.original_result
+        perturbed_result = result.perturbed_result
+        self.result_type = type(result)
+        self.original_text = original_result.attacked_text.text
+        self.perturbed_text = perturbed_result.attacked_text.text
+        self.original_score = original_result.score
+        self.perturbed_score = perturbed_result.score
+        self.original_output = original_result.output
+        self.perturbed_output = perturbed_result.output
+        self.ground_truth_output = original_result.ground_truth_output
+        self.num_queries = result.num_queries
+        self.num_words = original_result.attacked_text.num_words
+        if self.failed or self.skipped:
+            self.num_words_changed = 0
+        else:
+            self.num_words_changed = len(
+                original_result.attacked_text.all_words_diff(
+                    perturbed_result.attacked_text
+                )
+            )
+        self.same_example = same_example
+
+    @property
+    def failed(self):
+        return issubclass(self.result_type, FailedAttackResult)
+
+    @property
+    def skipped(self):
+        return issubclass(self.result_type, SkippedAttackResult)
+
+    @property
+    def succeeded(self):
+        """Whether the attack found a perturbation, i.e. the result is neither
+        failed nor skipped."""
+        return not (self.failed or self.skipped)
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.result_type.__name__}>"
+
+
+class AttackResultSummarizer:
+    """Summarizes results one at a time, as they are logged.
+
+    Calling it on an :class:`~textattack.attack_results.AttackResult` returns
+    its :class:`AttackResultSummary`, marked as a result of the same example
+    if it shares its original goal function result with the result before
+    it. Summaries are returned as is.
+    """
+
+    def __init__(self):
+        self._prev_original_result = None
+
+    def __call__(self, result):
+        if not isinstance(result, AttackResult):
+            self._prev_original_result = None
+            return result
+        same_example = self._prev_original_result is result.original_result
+        self._prev_original_result = result.original_result
+        return AttackResultSummary(result, same_example=same_example)
+
+    def __getstate__(self):
+        # The next result logged after a checkpoint is from another example.
+        return {"_prev_original_result": None}
+
+    def __setstate__(self, state):
+        self.__dict__ = state
+
+
+def summarize_results(results):
+    """Yields an :class:`AttackResultSummary` of each of ``results``, which
+    can be :class:`~textattack.attack_results.AttackResult` objects,
+    summaries, or a mix of both.
+
+    Results that share their original goal function result with the result
+    before them are marked as results of the same example.
+    """
+    summarizer = AttackResultSummarizer()
+    for result in results:
+        yield summarizer(result)
+
+
+def successful_text_pairs(results):
+    """Yields the original and perturbed text of each of ``results`` whose
+    attack found a perturbation.
+
+    Results can be :class:`~textattack.attack_results.AttackResult` objects,
+    summaries, or any object with the ``original_result.attacked_text`` and
+    ``perturbed_result.attacked_text`` of one (e.g. the results of an
+    :class:`~textattack.augmentation.Augmenter`), which are all counted.
+    """
+    for result in summarize_results(results):
+        if isinstance(result, AttackResultSummary):
+            if result.succeeded:
+                yield result.original_text, result.perturbed_text
+        else:
+            yield (
+                result.original_result.attacked_text.text,
+                result.perturbed_result.attacked_text.text,
+            )
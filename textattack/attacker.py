@@ -3,7 +3,10 @@ Attacker Class
 ==============
 """
 
+import cProfile
 import collections
+import copy
+import functools
 import logging
 import multiprocessing as mp
 import os
@@ -104,6 +107,156 @@ class Attacker:
         assert (len(worklist) + len(candidates)) == (end - start)
         return worklist, candidates
 
+    def _show_live_metrics(self, pbar):
+        """Shows the success rate, perturbed words and queries of the results
+        so far next to the progress bar."""
+        metrics = self.attack_log_manager.live_metrics()
+        pbar.set_postfix_str(
+            f"success rate: {metrics['attack_success_rate']}%, "
+            f"perturbed words: {metrics['avg_word_perturbed_perc']}%, "
+            f"avg queries: {metrics['avg_num_queries']}",
+            refresh=False,
+        )
+
+    def _create_journal(self):
+        """Returns the :class:`~textattack.shared.AttackJournal` that
+        checkpoints save results to, or :obj:`None` if checkpoints are
+        disabled."""
+        if not self.attack_args.checkpoint_interval:
+            return None
+        journal = getattr(self._checkpoint, "journal", None)
+        if journal is None:
+            journal = textattack.shared.AttackJournal.create(
+                self.attack_args.checkpoint_dir
+            )
+            # Results recovered from a checkpoint saved without a journal.
+            for results in self.attack_log_manager.batched_results:
+                journal.append(results)
+        return journal
+
+    def _get_example(self, idx):
+        """Returns the ``AttackedText`` and ground truth output of example
+        ``idx`` of the dataset."""
+        example, ground_truth_output = self.dataset[idx]
+        example = textattack.shared.AttackedText(example)
+        if self.dataset.label_names is not None:
+            example.attack_attrs["label_names"] = self.dataset.label_names
+        return example, ground_truth_output
+
+    def _attack_examples(self, worklist, in_flight):
+        """Attacks the examples in ``worklist``, removing them from it as they
+        are attacked.
+
+        Yields the results and number of queries of each example, in the
+        order of ``worklist``. Examples added to ``worklist`` in the meantime
+        are attacked too.
+
+        Args:
+            worklist (:obj:`collections.deque`): Indices of the examples to attack.
+            in_flight (:obj:`collections.deque`): Filled with the indices of the examples taken from ``worklist``
+                whose results have not been yielded yet.
+        """
+        if self.attack_args.num_concurrent_examples > 1:
+            yield from self._attack_examples_concurrently(worklist, in_flight)
+            return
+
+        while worklist:
+            idx = worklist.popleft()
+            try:
+                example, ground_truth_output = self._get_example(idx)
+            except IndexError:
+                continue
+            if worklist and self.attack.goal_function.model_executor is not None:
+                # Let the model work on the next example while this one is attacked.
+                try:
+                    next_example, _ = self._get_example(worklist[0])
+                    self.attack.goal_function.prefetch([next_example])
+                except IndexError:
+                    pass
+            yield self.attack.attack(example, ground_truth_output)
+
+    def _concurrent_attack(self, scheduler):
+        """Returns a copy of ``self.attack`` that can attack an example at the
+        same time as other copies, sending its model calls to
+        ``scheduler``.
+
+        The copies share the transformation and constraints of
+        ``self.attack``, so they leave the caches of the constraints to be
+        cleared once all the examples are attacked.
+        """
+        attack = Attack(
+            self.attack.goal_function.copy_for_scheduler(scheduler),
+            self.attack.pre_transformation_constraints + self.attack.constraints,
+            self.attack.transformation,
+            copy.copy(self.attack.search_method),
+            transformation_cache_size=self.attack.transformation_cache_size,
+            constraint_cache_size=self.attack.constraint_cache_size,
+        )
+        attack.attack_args = self.attack_args
+        attack._shared_constraints = True
+        attack.profile.trace = self.attack.profile.trace
+        attack.profile.record_examples = self.attack.profile.record_examples
+        return attack
+
+    @staticmethod
+    def _attack_and_profile(attack, example, ground_truth_output):
+        """Attacks ``example`` with ``attack``, and returns its results along
+        with the record of the example in ``attack.profile``."""
+        results = attack.attack(example, ground_truth_output)
+        return results, _pop_profile_record(attack)
+
+    def _attack_examples_concurrently(self, worklist, in_flight):
+        """Like ``_attack_examples``, but attacks up to
+        ``num_concurrent_examples`` examples at once with a
+        :class:`~textattack.shared.CoalescingScheduler`, which merges their
+        model calls into shared batches."""
+        scheduler = textattack.shared.CoalescingScheduler(
+            self.attack.goal_function._call_model_uncached
+        )
+        free_attacks = [
+            self._concurrent_attack(scheduler)
+            for _ in range(self.attack_args.num_concurrent_examples)
+        ]
+        # [task, attack running it] for each example in `in_flight`
+        running = collections.deque()
+        while worklist or running:
+            while worklist and free_attacks:
+                idx = worklist.popleft()
+                try:
+                    example, ground_truth_output = self._get_example(idx)
+                except IndexError:
+                    continue
+                attack = free_attacks.pop()
+                task = scheduler.start(
+                    functools.partial(
+                        self._attack_and_profile, attack, example, ground_truth_output
+                    )
+                )
+                running.append([task, attack])
+                in_flight.append(idx)
+            if not running:
+                continue
+
+            scheduler.step()
+            for entry in running:
+                task, attack = entry
+                if scheduler.done(task) and attack is not None:
+                    free_attacks.append(attack)
+                    entry[1] = None
+            # Results are yielded in order, so finished examples wait for the ones started before them.
+            while running and scheduler.done(running[0][0]):
+                task, _ = running.popleft()
+                in_flight.popleft()
+                results, profile_record = scheduler.wait(task)
+                self.attack.profile.add_example(profile_record)
+                yield results
+
+        self.attack.clear_cache()
+        if scheduler.num_model_calls:
+            logger.info(
+                f"Merged {scheduler.num_requests} model calls of concurrent examples into {scheduler.num_model_calls}."
+            )
+
     def _attack(self):
         """Internal method that carries out attack.
 
@@ -157,23 +310,14 @@ class Attacker:
             num_skipped = 0
             num_successes = 0
 
+        journal = self._create_journal()
         sample_exhaustion_warned = False
         num_queries = 0
-        while worklist:
-            idx = worklist.popleft()
-            try:
-                example, ground_truth_output = self.dataset[idx]
-            except IndexError:
-                continue
-            example = textattack.shared.AttackedText(example)
-            if self.dataset.label_names is not None:
-                example.attack_attrs["label_names"] = self.dataset.label_names
-            try:
-                results, _num_queries = self.attack.attack(example, ground_truth_output)
-                num_queries += _num_queries
-                results = results if isinstance(results, list) else [results]
-            except Exception as e:
-                raise e
+        # Examples taken from the worklist whose results have not been logged yet.
+        in_flight = collections.deque()
+        for results, _num_queries in self._attack_examples(worklist, in_flight):
+            num_queries += _num_queries
+            results = results if isinstance(results, list) else [results]
             result_type = results[0]
             if (
                 isinstance(result_type, SkippedAttackResult) and self.attack_args.attack_n
@@ -192,6 +336,8 @@ class Attacker:
                 pbar.update(1)
             for result in results:
                 self.attack_log_manager.log_result(result)
+            if journal is not None:
+                journal.append(results)
 
             if not self.attack_args.disable_stdout and not self.attack_args.silent:
                 print("\n")
@@ -206,6 +352,7 @@ class Attacker:
             pbar.set_description(
                 f"[Succeeded / Failed / Skipped / Total] {num_successes} / {num_failures} / {num_skipped} / {num_results}"
             )
+            self._show_live_metrics(pbar)
 
             if (
                 self.attack_args.checkpoint_interval
@@ -216,8 +363,9 @@ class Attacker:
                 new_checkpoint = textattack.shared.AttackCheckpoint(
                     self.attack_args,
                     self.attack_log_manager,
-                    worklist,
+                    collections.deque(list(in_flight) + list(worklist)),
                     worklist_candidates,
+                    journal=journal,
                 )
                 new_checkpoint.save()
                 self.attack_log_manager.flush()
@@ -232,13 +380,22 @@ class Attacker:
             self.attack_log_manager.enable_advance_metrics = True
 
         elapsed_time = time.monotonic_ns() - t
-        self.attack_log_manager.log_summary(num_queries, elapsed_time)
+        model_cache_stats = None
+        if self.attack.goal_function.persistent_cache is not None:
+            model_cache_stats = self.attack.goal_function.persistent_cache.stats()
+        self.attack_log_manager.log_summary(
+            num_queries,
+            elapsed_time,
+            model_cache_stats=model_cache_stats,
+            profile=self.attack.profile if self.attack_args.enable_profiling else None,
+        )
         self.attack_log_manager.flush()
         self.attack.goal_function.clear_cache()
         print()
 
     def _attack_parallel(self):
         pytorch_multiprocessing_workaround()
+        t = time.monotonic_ns()
 
         if self._checkpoint:
             num_remaining_attacks = self._checkpoint.num_remaining_attacks
@@ -283,10 +440,20 @@ class Attacker:
                     f"Tried to access element at {i} in dataset of size {len(self.dataset)}."
                 )
 
-        # We reserve the first GPU for coordinating workers.
         num_gpus = torch.cuda.device_count()
-        num_workers = self.attack_args.num_workers_per_device * num_gpus
-        logger.info(f"Running {num_workers} worker(s) on {num_gpus} GPU(s).")
+        if num_gpus > 0:
+            num_workers = self.attack_args.num_workers_per_device * num_gpus
+            num_threads_per_worker = None
+            logger.info(f"Running {num_workers} worker(s) on {num_gpus} GPU(s).")
+        else:
+            # No GPU available, so we shard the worklist across CPU processes instead.
+            num_cpus = os.cpu_count() or 1
+            num_workers = self.attack_args.num_cpu_workers or num_cpus
+            # Split the intra-op thread pool between workers so that they do not oversubscribe the cores.
+            num_threads_per_worker = max(1, num_cpus // num_workers)
+            logger.info(
+                f"Running {num_workers} worker(s) on CPU with {num_threads_per_worker} thread(s) each."
+            )
 
         # Lock for synchronization
         lock = mp.Lock()
@@ -307,6 +474,7 @@ class Attacker:
                 lock,
                 in_queue,
                 out_queue,
+                num_threads_per_worker,
             ),
         )
 
@@ -325,11 +493,26 @@ class Attacker:
         logger.info(f"Worklist size: {len(worklist)}")
         logger.info(f"Worklist candidate size: {len(worklist_candidates)}")
 
+        # Workers finish examples out of order. To keep logged results, checkpoints and the
+        # choice of replacement samples identical to `_attack`, we hold finished results back
+        # until every example submitted before them has also finished.
+        submitted = collections.deque(worklist)
+        finished = {}
+
+        journal = self._create_journal()
         sample_exhaustion_warned = False
+        num_queries = 0
+        model_cache_stats = None
+        if self.attack.goal_function.persistent_cache is not None:
+            model_cache_stats = {"hits": 0, "misses": 0}
         pbar = tqdm.tqdm(total=num_remaining_attacks, smoothing=0, dynamic_ncols=True)
         while worklist:
-            idx, result = out_queue.get(block=True)
-            worklist.remove(idx)
+            idx, result, worker_cache_stats, profile_record = out_queue.get(block=True)
+            if worker_cache_stats is not None:
+                for key in model_cache_stats:
+                    model_cache_stats[key] += worker_cache_stats[key]
+            if profile_record is not None:
+                self.attack.profile.add_example(profile_record)
 
             if isinstance(result, tuple) and isinstance(result[0], Exception):
                 logger.error(
@@ -344,54 +527,75 @@ class Attacker:
                 worker_pool.terminate()
                 worker_pool.join()
                 return
-            elif (
-                isinstance(result, SkippedAttackResult) and self.attack_args.attack_n
-            ) or (
-                not isinstance(result, SuccessfulAttackResult)
-                and self.attack_args.num_successful_examples
-            ):
-                if worklist_candidates:
-                    next_sample = worklist_candidates.popleft()
-                    example, ground_truth_output = self.dataset[next_sample]
-                    example = textattack.shared.AttackedText(example)
-                    if self.dataset.label_names is not None:
-                        example.attack_attrs["label_names"] = self.dataset.label_names
-                    worklist.append(next_sample)
-                    in_queue.put((next_sample, example, ground_truth_output))
-                else:
-                    if not sample_exhaustion_warned:
-                        logger.warn("Ran out of samples to attack!")
-                        sample_exhaustion_warned = True
-            else:
-                pbar.update()
 
-            self.attack_log_manager.log_result(result)
-            num_results += 1
-
-            if isinstance(result, SkippedAttackResult):
-                num_skipped += 1
-            if isinstance(result, (SuccessfulAttackResult, MaximizedAttackResult)):
-                num_successes += 1
-            if isinstance(result, FailedAttackResult):
-                num_failures += 1
-            pbar.set_description(
-                f"[Succeeded / Failed / Skipped / Total] {num_successes} / {num_failures} / {num_skipped} / {num_results}"
-            )
+            finished[idx] = result
+            while submitted and submitted[0] in finished:
+                idx = submitted.popleft()
+                results, _num_queries = finished.pop(idx)
+                worklist.remove(idx)
+                num_queries += _num_queries
+                results = results if isinstance(results, list) else [results]
 
-            if (
-                self.attack_args.checkpoint_interval
-                and len(self.attack_log_manager.results)
-                % self.attack_args.checkpoint_interval
-                == 0
-            ):
-                new_checkpoint = textattack.shared.AttackCheckpoint(
-                    self.attack_args,
-                    self.attack_log_manager,
-                    worklist,
-                    worklist_candidates,
+                result_type = results[0]
+                if (
+                    isinstance(result_type, SkippedAttackResult)
+                    and self.attack_args.attack_n
+                ) or (
+                    not isinstance(result_type, SuccessfulAttackResult)
+                    and self.attack_args.num_successful_examples
+                ):
+                    if worklist_candidates:
+                        next_sample = worklist_candidates.popleft()
+                        example, ground_truth_output = self.dataset[next_sample]
+                        example = textattack.shared.AttackedText(example)
+                        if self.dataset.label_names is not None:
+                            example.attack_attrs[
+                                "label_names"
+                            ] = self.dataset.label_names
+                        worklist.append(next_sample)
+                        submitted.append(next_sample)
+                        in_queue.put((next_sample, example, ground_truth_output))
+                    else:
+                        if not sample_exhaustion_warned:
+                            logger.warn("Ran out of samples to attack!")
+                            sample_exhaustion_warned = True
+                else:
+                    pbar.update()
+
+                for result in results:
+                    self.attack_log_manager.log_result(result)
+                if journal is not None:
+                    journal.append(results)
+                num_results += 1
+
+                if isinstance(result_type, SkippedAttackResult):
+                    num_skipped += 1
+                if isinstance(
+                    result_type, (SuccessfulAttackResult, MaximizedAttackResult)
+                ):
+                    num_successes += 1
+                if isinstance(result_type, FailedAttackResult):
+                    num_failures += 1
+                pbar.set_description(
+                    f"[Succeeded / Failed / Skipped / Total] {num_successes} / {num_failures} / {num_skipped} / {num_results}"
                 )
-                new_checkpoint.save()
-                self.attack_log_manager.flush()
+                self._show_live_metrics(pbar)
+
+                if (
+                    self.attack_args.checkpoint_interval
+                    and len(self.attack_log_manager.results)
+                    % self.attack_args.checkpoint_interval
+                    == 0
+                ):
+                    new_checkpoint = textattack.shared.AttackCheckpoint(
+                        self.attack_args,
+                        self.attack_log_manager,
+                        worklist,
+                        worklist_candidates,
+                        journal=journal,
+                    )
+                    new_checkpoint.save()
+                    self.attack_log_manager.flush()
 
         # Send sentinel values to worker processes
         for _ in range(num_workers):
@@ -408,7 +612,13 @@ class Attacker:
         if self.attack_args.enable_advance_metrics:
             self.attack_log_manager.enable_advance_metrics = True
 
-        self.attack_log_manager.log_summary()
+        elapsed_time = time.monotonic_ns() - t
+        self.attack_log_manager.log_summary(
+            num_queries,
+            elapsed_time,
+            model_cache_stats=model_cache_stats,
+            profile=self.attack.profile if self.attack_args.enable_profiling else None,
+        )
         self.attack_log_manager.flush()
         print()
 
@@ -424,6 +634,18 @@ class Attacker:
         if self.attack_args.query_budget:
             self.attack.goal_function.query_budget = self.attack_args.query_budget
 
+        if self.attack_args.model_cache_path:
+            self.attack.goal_function.enable_persistent_cache(
+                self.attack_args.model_cache_path,
+                self.attack_args.model_cache_fingerprint,
+            )
+
+        if self.attack_args.async_model_calls:
+            self.attack.goal_function.enable_async_model_calls(
+                max_pending=self.attack_args.max_pending_model_calls,
+                deterministic=self.attack_args.deterministic_model_calls,
+            )
+
         if not self.attack_log_manager:
             self.attack_log_manager = AttackArgs.create_loggers_from_args(
                 self.attack_args
@@ -441,14 +663,33 @@ class Attacker:
             if self.attack_args.num_examples == -1
             else self.attack_args.num_examples
         )
-        if self.attack_args.parallel:
-            if torch.cuda.device_count() == 0:
-                raise Exception(
-                    "Found no GPU on your system. To run attacks in parallel, GPU is required."
+        profile_output = self.attack_args.profile_output
+        export_chrome_trace = profile_output is not None and profile_output.lower().endswith(".json")
+        self.attack.profile.trace = export_chrome_trace
+        # Keep a record of each example only if it is reported.
+        self.attack.profile.record_examples = self.attack_args.enable_profiling
+        profiler = None
+        if profile_output is not None and not export_chrome_trace:
+            if self.attack_args.parallel:
+                logger.warning(
+                    "Only the main process is profiled for `profile_output`, not the worker processes attacking the examples."
                 )
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        if self.attack_args.parallel:
             self._attack_parallel()
         else:
             self._attack()
+        self.attack.goal_function.shutdown_model_executor()
+
+        if export_chrome_trace:
+            self.attack.profile.export_chrome_trace(profile_output)
+            logger.info(f"Saved Chrome trace of the attack to {profile_output}.")
+        elif profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_output)
+            logger.info(f"Saved profile of the attack to {profile_output}.")
 
         if self.attack_args.silent:
             logger.setLevel(logging.INFO)
@@ -533,7 +774,8 @@ def pytorch_multiprocessing_workaround():
         pass
 
 
-def set_env_variables(gpu_id):
+def _set_worker_env_variables():
+    """Setup shared by worker processes on GPU and on CPU."""
     # Disable tensorflow logs, except in the case of an error.
     if "TF_CPP_MIN_LOG_LEVEL" not in os.environ:
         os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
@@ -541,6 +783,10 @@ def set_env_variables(gpu_id):
     # Set sharing strategy to file_system to avoid file descriptor leaks
     torch.multiprocessing.set_sharing_strategy("file_system")
 
+
+def set_env_variables(gpu_id):
+    _set_worker_env_variables()
+
     # Only use one GPU, if we have one.
     # For Tensorflow
     # TODO: Using USE with `--parallel` raises similar issue as https://github.com/tensorflow/tensorflow/issues/38518#
@@ -565,20 +811,49 @@ def set_env_variables(gpu_id):
         pass
 
 
+def set_cpu_env_variables(num_threads=None):
+    _set_worker_env_variables()
+
+    # Limit intra-op parallelism so that workers sharing the host do not oversubscribe it.
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+
+def _pop_profile_record(attack):
+    """Removes the record of the example just attacked by ``attack`` from its
+    profile and returns it. If the profile does not keep records, returns its
+    totals instead, so that they are still added to the profile of the
+    attacker."""
+    if not attack.profile.record_examples:
+        return attack.profile.pop_totals()
+    return attack.profile.examples.pop()
+
+
 def attack_from_queue(
-    attack, attack_args, num_gpus, first_to_start, lock, in_queue, out_queue
+    attack,
+    attack_args,
+    num_gpus,
+    first_to_start,
+    lock,
+    in_queue,
+    out_queue,
+    num_threads_per_worker=None,
 ):
     assert isinstance(
         attack, Attack
     ), f"`attack` must be of type `Attack`, but got type `{type(attack)}`."
 
-    gpu_id = (torch.multiprocessing.current_process()._identity[0] - 1) % num_gpus
-    set_env_variables(gpu_id)
+    if num_gpus > 0:
+        gpu_id = (torch.multiprocessing.current_process()._identity[0] - 1) % num_gpus
+        set_env_variables(gpu_id)
+    else:
+        set_cpu_env_variables(num_threads_per_worker)
     textattack.shared.utils.set_seed(attack_args.random_seed)
     if torch.multiprocessing.current_process()._identity[0] > 1:
         logging.disable()
 
-    attack.cuda_()
+    if num_gpus > 0:
+        attack.cuda_()
 
     # Simple non-synchronized check to see if it's the first process to reach this point.
     # This let us avoid waiting for lock.
@@ -599,9 +874,14 @@ def attack_from_queue(
                 break
             else:
                 result = attack.attack(example, ground_truth_output)
-                out_queue.put((i, result))
+                # Report persistent cache hits and misses since the last example.
+                cache_stats = None
+                if attack.goal_function.persistent_cache is not None:
+                    cache_stats = attack.goal_function.persistent_cache.stats()
+                    attack.goal_function.persistent_cache.reset_stats()
+                out_queue.put((i, result, cache_stats, _pop_profile_record(attack)))
         except Exception as e:
             if isinstance(e, queue.Empty):
                 continue
             else:
-                out_queue.put((i, (e, traceback.format_exc())))
+                out_queue.put((i, (e, traceback.format_exc()), None, None))
@@ -6,19 +6,162 @@ BenchmarkRecipeCommand class
 """
 
 from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser
+import collections
+from dataclasses import dataclass
+import json
+import platform
+import time
 
+import numpy as np
+import torch
+
+import textattack
+from textattack import Attacker, AttackArgs, DatasetArgs, ModelArgs
+from textattack.attack_args import ATTACK_RECIPE_NAMES
 from textattack.commands import TextAttackCommand
 
+logger = textattack.shared.utils.logger
+
+RANDOM_MODELS = {
+    "lstm": "LSTMForClassification",
+    "cnn": "WordCNNForClassification",
+}
+
+
+@dataclass
+class BenchmarkRecipeArgs(ModelArgs, DatasetArgs):
+    recipe: str = None
+    random_model: str = None
+    num_labels: int = 2
+    num_examples: int = 20
+    num_examples_offset: int = 0
+    query_budget: int = None
+    model_batch_size: int = 32
+    random_seed: int = 765
+    output: str = None
+
+
+def _peak_rss_mb():
+    """Returns the peak resident set size of this process in MiB, or
+    :obj:`None` if it is not available on this platform."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # `ru_maxrss` is in bytes on macOS, and in kilobytes on other platforms.
+    if platform.system() == "Darwin":
+        return round(peak_rss / 2**20, 2)
+    return round(peak_rss / 2**10, 2)
+
 
 class BenchmarkRecipeCommand(TextAttackCommand):
     """The TextAttack benchmark recipe module:
 
     A command line parser to benchmark a recipe from user
     specifications.
+
+    Runs the recipe against a model on a fixed slice of a dataset, and
+    prints its throughput, per-example latency, peak memory and the time
+    spent in each stage of the attack as JSON, so that runs on different
+    versions or machines can be compared.
     """
 
+    def _create_model(self, args):
+        if args.random_model:
+            model_class = RANDOM_MODELS[args.random_model]
+            logger.info(f"Using randomly initialized {model_class}.")
+            model = getattr(textattack.models.helpers, model_class)(
+                num_labels=args.num_labels
+            )
+            model.eval()
+            model.to(textattack.shared.utils.device)
+            return textattack.models.wrappers.PyTorchModelWrapper(
+                model, model.tokenizer
+            )
+        return ModelArgs._create_model_from_args(args)
+
     def run(self, args):
-        raise NotImplementedError("Cannot benchmark recipes yet - stay tuned!!")
+        args = BenchmarkRecipeArgs(**vars(args))
+        if bool(args.random_model) == bool(
+            args.model or args.model_from_file or args.model_from_huggingface
+        ):
+            raise ValueError(
+                "Must supply exactly one of `--random-model`, `--model`, `--model-from-file` and `--model-from-huggingface`."
+            )
+        textattack.shared.utils.set_seed(args.random_seed)
+
+        setup_start = time.perf_counter()
+        model_wrapper = self._create_model(args)
+        dataset = DatasetArgs._create_dataset_from_args(args)
+        recipe_class_name = ATTACK_RECIPE_NAMES[args.recipe].split(".")[-1]
+        attack = getattr(textattack.attack_recipes, recipe_class_name).build(
+            model_wrapper
+        )
+        if args.query_budget:
+            attack.goal_function.query_budget = args.query_budget
+        attack.goal_function.batch_size = args.model_batch_size
+        setup_time = time.perf_counter() - setup_start
+
+        attack_args = AttackArgs(
+            num_examples=args.num_examples,
+            num_examples_offset=args.num_examples_offset,
+            random_seed=args.random_seed,
+            disable_stdout=True,
+            silent=True,
+            # Keeps the record of each example, for the latencies.
+            enable_profiling=True,
+        )
+        attacker = Attacker(attack, dataset, attack_args)
+        attack_start = time.perf_counter()
+        results = attacker.attack_dataset()
+        attack_time = time.perf_counter() - attack_start
+
+        profile = attack.profile
+        latencies = [example["time"] for example in profile.examples]
+        num_examples = profile.counters["examples"]
+        num_queries = profile.counters["queries"]
+        result_types = collections.Counter(
+            type(result).__name__.replace("AttackResult", "").lower()
+            for result in results
+        )
+        report = {
+            "recipe": args.recipe,
+            "model": args.random_model
+            or args.model
+            or args.model_from_file
+            or args.model_from_huggingface,
+            "num_examples": num_examples,
+            "num_examples_offset": args.num_examples_offset,
+            "random_seed": args.random_seed,
+            "device": str(textattack.shared.utils.device),
+            "torch_version": torch.__version__,
+            "python_version": platform.python_version(),
+            "setup_time": round(setup_time, 4),
+            "attack_time": round(attack_time, 4),
+            "examples_per_sec": round(num_examples / attack_time, 4),
+            "queries_per_sec": round(num_queries / attack_time, 4),
+            "num_queries": num_queries,
+            "latency": {
+                "mean": round(float(np.mean(latencies)), 4),
+                "p50": round(float(np.percentile(latencies, 50)), 4),
+                "p95": round(float(np.percentile(latencies, 95)), 4),
+                "max": round(float(np.max(latencies)), 4),
+            }
+            if latencies
+            else None,
+            "peak_rss_mb": _peak_rss_mb(),
+            "results": dict(result_types),
+            "timers": attack.timers,
+            "counters": profile.counters,
+        }
+
+        report_json = json.dumps(report, indent=4)
+        print(report_json)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(report_json + "\n")
+            logger.info(f"Saved benchmark to {args.output}.")
 
     @staticmethod
     def register_subcommand(main_parser: ArgumentParser):
@@ -27,4 +170,62 @@ class BenchmarkRecipeCommand(TextAttackCommand):
             help="benchmark a recipe",
             formatter_class=ArgumentDefaultsHelpFormatter,
         )
+        parser.add_argument(
+            "--recipe",
+            "-r",
+            type=str,
+            required=True,
+            choices=ATTACK_RECIPE_NAMES.keys(),
+            help="The recipe to benchmark.",
+        )
+        parser = ModelArgs._add_parser_args(parser)
+        parser.add_argument(
+            "--random-model",
+            type=str,
+            required=False,
+            default=None,
+            choices=RANDOM_MODELS.keys(),
+            help="Benchmark against a randomly initialized TextAttack LSTM or CNN instead of a trained model.",
+        )
+        parser.add_argument(
+            "--num-labels",
+            type=int,
+            default=2,
+            help="Number of labels of the model created by `--random-model`.",
+        )
+        parser = DatasetArgs._add_parser_args(parser)
+        parser.add_argument(
+            "--num-examples",
+            "-n",
+            type=int,
+            default=20,
+            help="The number of examples to attack.",
+        )
+        parser.add_argument(
+            "--num-examples-offset",
+            "-o",
+            type=int,
+            default=0,
+            help="The offset to start at in the dataset.",
+        )
+        parser.add_argument(
+            "--query-budget",
+            "-q",
+            type=int,
+            default=None,
+            help="The maximum number of model queries allowed per example attacked.",
+        )
+        parser.add_argument(
+            "--model-batch-size",
+            type=int,
+            default=32,
+            help="The batch size for making calls to the model.",
+        )
+        parser.add_argument("--random-seed", default=765, type=int)
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="Path of a JSON file to also save the benchmark to.",
+        )
         parser.set_defaults(func=BenchmarkRecipeCommand())
@@ -7,6 +7,7 @@ GPT2 Language Models:
 
 import os
 
+import lru
 import torch
 
 from textattack.shared import utils
@@ -35,8 +36,29 @@ class GPT2(LanguageModelConstraint):
         self.model = transformers.GPT2LMHeadModel.from_pretrained(model_name)
         self.model.to(utils.device)
         self.tokenizer = transformers.GPT2Tokenizer.from_pretrained(model_name)
+        # Next-token logits for each prefix. Each entry holds a vocabulary-sized vector, so keep it small.
+        self._prefix_cache = lru.LRU(2**8)
         super().__init__(**kwargs)
 
+    def clear_cache(self):
+        self._prefix_cache.clear()
+
+    def _next_word_logits(self, prefix):
+        """Returns the logits predicted by GPT-2 for the token following
+        ``prefix``."""
+        if prefix in self._prefix_cache:
+            return self._prefix_cache[prefix]
+
+        token_ids = self.tokenizer.encode(prefix)
+        tokens_tensor = torch.tensor([token_ids])
+        tokens_tensor = tokens_tensor.to(utils.device)
+
+        with torch.no_grad():
+            outputs = self.model(tokens_tensor)
+        next_word_logits = outputs[0][0, -1]
+        self._prefix_cache[prefix] = next_word_logits
+        return next_word_logits
+
     def get_log_probs_at_index(self, text_list, word_index):
         """Gets the probability of the word at index `word_index` according to
         GPT-2.
@@ -52,18 +74,25 @@ class GPT2(LanguageModelConstraint):
             # log-probability 0.0.
             return torch.zeros(len(text_list), dtype=torch.float)
 
-        token_ids = self.tokenizer.encode(prefix)
-        tokens_tensor = torch.tensor([token_ids])
-        tokens_tensor = tokens_tensor.to(utils.device)
-
-        with torch.no_grad():
-            outputs = self.model(tokens_tensor)
-        predictions = outputs[0]
+        next_word_logits = self._next_word_logits(prefix)
 
-        probs = []
+        # Only the first token of each word is scored, so each distinct word is encoded once.
+        next_word_ids = {}
         for attacked_text in text_list:
-            next_word_ids = self.tokenizer.encode(attacked_text.words[word_index])
-            next_word_prob = predictions[0, -1, next_word_ids[0]]
-            probs.append(next_word_prob)
-
-        return probs
+            word = attacked_text.words[word_index]
+            if word not in next_word_ids:
+                next_word_ids[word] = self.tokenizer.encode(word)[0]
+        next_word_ids = torch.tensor(
+            [next_word_ids[attacked_text.words[word_index]] for attacked_text in text_list],
+            device=next_word_logits.device,
+        )
+        return next_word_logits[next_word_ids].cpu()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_prefix_cache"] = self._prefix_cache.get_size()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__ = state
+        self._prefix_cache = lru.LRU(state["_prefix_cache"])
@@ -5,6 +5,7 @@ Language Models Constraint
 """
 
 from abc import ABC, abstractmethod
+import collections
 
 from textattack.constraints import Constraint
 
@@ -32,25 +33,44 @@ class LanguageModelConstraint(Constraint, ABC):
         `word_index` according to a language model."""
         raise NotImplementedError()
 
-    def _check_constraint(self, transformed_text, reference_text):
-        try:
-            indices = transformed_text.attack_attrs["newly_modified_indices"]
-        except KeyError:
-            raise KeyError(
-                "Cannot apply language model constraint without `newly_modified_indices`"
-            )
-
-        for i in indices:
-            probs = self.get_log_probs_at_index((reference_text, transformed_text), i)
-            if len(probs) != 2:
+    def _check_constraint_many(self, transformed_texts, reference_text):
+        """Filters ``transformed_texts`` with one call to
+        ``get_log_probs_at_index`` per modified index.
+
+        Texts are compared against the prefix of ``reference_text``, so
+        all texts modified at the same index can be scored together.
+        """
+        texts_at_index = collections.defaultdict(list)
+        for transformed_text in transformed_texts:
+            try:
+                indices = transformed_text.attack_attrs["newly_modified_indices"]
+            except KeyError:
+                raise KeyError(
+                    "Cannot apply language model constraint without `newly_modified_indices`"
+                )
+            for i in indices:
+                texts_at_index[i].append(transformed_text)
+
+        failed_texts = set()
+        for i, texts in texts_at_index.items():
+            probs = self.get_log_probs_at_index([reference_text] + texts, i)
+            if len(probs) != len(texts) + 1:
                 raise ValueError(
-                    f"Error: get_log_probs_at_index returned {len(probs)} values for 2 inputs"
+                    f"Error: get_log_probs_at_index returned {len(probs)} values for {len(texts) + 1} inputs"
                 )
-            ref_prob, transformed_prob = probs
-            if transformed_prob <= ref_prob - self.max_log_prob_diff:
-                return False
+            ref_prob = probs[0]
+            for transformed_text, transformed_prob in zip(texts, probs[1:]):
+                if transformed_prob <= ref_prob - self.max_log_prob_diff:
+                    failed_texts.add(id(transformed_text))
+
+        return [
+            transformed_text
+            for transformed_text in transformed_texts
+            if id(transformed_text) not in failed_texts
+        ]
 
-        return True
+    def _check_constraint(self, transformed_text, reference_text):
+        return bool(self._check_constraint_many([transformed_text], reference_text))
 
     def extra_repr_keys(self):
         return ["max_log_prob_diff"] + super().extra_repr_keys()
@@ -78,42 +78,82 @@ class PartOfSpeech(Constraint):
             self.allow_verb_noun_swap and set([pos_a, pos_b]) <= set(["NOUN", "VERB"])
         )
 
-    def _get_pos(self, before_ctx, word, after_ctx):
-        context_words = before_ctx + [word] + after_ctx
-        context_key = " ".join(context_words)
-        if context_key in self._pos_tag_cache:
-            word_list, pos_list = self._pos_tag_cache[context_key]
-        else:
-            if self.tagger_type == "nltk":
-                word_list, pos_list = zip(
-                    *nltk.pos_tag(
-                        context_words, tagset=self.tagset, lang=self.language_nltk
-                    )
-                )
+    def _tag_contexts(self, contexts):
+        """Tags each list of words in ``contexts`` with a single batched call to
+        the POS tagger.
+
+        Returns a list of ``(word_list, pos_list)`` tuples, one per context.
+        """
+        if self.tagger_type == "nltk":
+            tagged_contexts = nltk.pos_tag_sents(
+                contexts, tagset=self.tagset, lang=self.language_nltk
+            )
+            return [tuple(zip(*tagged)) for tagged in tagged_contexts]
 
-            if self.tagger_type == "flair":
-                context_key_sentence = Sentence(
-                    context_key,
+        if self.tagger_type == "flair":
+            sentences = [
+                Sentence(
+                    " ".join(context_words),
                     use_tokenizer=textattack.shared.utils.TextAttackFlairTokenizer(),
                 )
-                self._flair_pos_tagger.predict(context_key_sentence)
-                word_list, pos_list = textattack.shared.utils.zip_flair_result(
-                    context_key_sentence
-                )
-
-            if self.tagger_type == "stanza":
-                word_list, pos_list = textattack.shared.utils.zip_stanza_result(
-                    self._stanza_pos_tagger(context_key), tagset=self.tagset
-                )
+                for context_words in contexts
+            ]
+            self._flair_pos_tagger.predict(sentences)
+            return [
+                textattack.shared.utils.zip_flair_result(sentence)
+                for sentence in sentences
+            ]
 
-            self._pos_tag_cache[context_key] = (word_list, pos_list)
+        if self.tagger_type == "stanza":
+            # With `tokenize_pretokenized=True`, each list of words is tagged as its own sentence.
+            doc = self._stanza_pos_tagger(
+                [" ".join(context_words).split() for context_words in contexts]
+            )
+            return [
+                textattack.shared.utils.zip_stanza_result(sentence, tagset=self.tagset)
+                for sentence in doc.sentences
+            ]
 
+    def _get_tags(self, contexts):
+        """Returns the ``(word_list, pos_list)`` tags of each list of words in
+        ``contexts``, tagging all contexts missing from the cache in one
+        batch."""
+        context_keys = [" ".join(context_words) for context_words in contexts]
+        tags = {}
+        uncached_contexts = []
+        for context_key, context_words in zip(context_keys, contexts):
+            if context_key in tags:
+                continue
+            if context_key in self._pos_tag_cache:
+                tags[context_key] = self._pos_tag_cache[context_key]
+            else:
+                tags[context_key] = None
+                uncached_contexts.append(context_words)
+        if uncached_contexts:
+            for context_words, (word_list, pos_list) in zip(
+                uncached_contexts, self._tag_contexts(uncached_contexts)
+            ):
+                context_key = " ".join(context_words)
+                tags[context_key] = (word_list, pos_list)
+                self._pos_tag_cache[context_key] = (word_list, pos_list)
+        return [tags[context_key] for context_key in context_keys]
+
+    @staticmethod
+    def _pos_of_word(tags, word):
+        word_list, pos_list = tags
         # idx of `word` in `context_words`
         assert word in word_list, "POS list not matched with original word list."
         word_idx = word_list.index(word)
         return pos_list[word_idx]
 
-    def _check_constraint(self, transformed_text, reference_text):
+    def _get_pos(self, before_ctx, word, after_ctx):
+        context_words = before_ctx + [word] + after_ctx
+        return self._pos_of_word(self._get_tags([context_words])[0], word)
+
+    def _get_windows(self, transformed_text, reference_text):
+        """Returns ``(reference_context, transformed_context, reference_word,
+        transformed_word)`` for each newly modified word of
+        ``transformed_text``."""
         try:
             indices = transformed_text.attack_attrs["newly_modified_indices"]
         except KeyError:
@@ -121,6 +161,7 @@ class PartOfSpeech(Constraint):
                 "Cannot apply part-of-speech constraint without `newly_modified_indices`"
             )
 
+        windows = []
         for i in indices:
             reference_word = reference_text.words[i]
             transformed_word = transformed_text.words[i]
@@ -128,13 +169,50 @@ class PartOfSpeech(Constraint):
             after_ctx = reference_text.words[
                 i + 1 : min(i + 4, len(reference_text.words))
             ]
-            ref_pos = self._get_pos(before_ctx, reference_word, after_ctx)
-            replace_pos = self._get_pos(before_ctx, transformed_word, after_ctx)
+            windows.append(
+                (
+                    before_ctx + [reference_word] + after_ctx,
+                    before_ctx + [transformed_word] + after_ctx,
+                    reference_word,
+                    transformed_word,
+                )
+            )
+        return windows
+
+    def _check_windows(self, windows, tags):
+        for (_, _, reference_word, transformed_word), (ref_tags, replace_tags) in zip(
+            windows, tags
+        ):
+            ref_pos = self._pos_of_word(ref_tags, reference_word)
+            replace_pos = self._pos_of_word(replace_tags, transformed_word)
             if not self._can_replace_pos(ref_pos, replace_pos):
                 return False
-
         return True
 
+    def _check_constraint(self, transformed_text, reference_text):
+        windows = self._get_windows(transformed_text, reference_text)
+        contexts = [ctx for window in windows for ctx in window[:2]]
+        tags = self._get_tags(contexts)
+        return self._check_windows(windows, list(zip(tags[::2], tags[1::2])))
+
+    def _check_constraint_many(self, transformed_texts, reference_text):
+        """Tags the unique context windows of all ``transformed_texts`` in one
+        batch, then checks each text against the tags."""
+        all_windows = [
+            self._get_windows(transformed_text, reference_text)
+            for transformed_text in transformed_texts
+        ]
+        contexts = [
+            ctx for windows in all_windows for window in windows for ctx in window[:2]
+        ]
+        tags = iter(self._get_tags(contexts))
+        filtered_texts = []
+        for transformed_text, windows in zip(transformed_texts, all_windows):
+            window_tags = [(next(tags), next(tags)) for _ in windows]
+            if self._check_windows(windows, window_tags):
+                filtered_texts.append(transformed_text)
+        return filtered_texts
+
     def check_compatibility(self, transformation):
         return transformation_consists_of_word_swaps(transformation)
 
@@ -6,6 +6,7 @@ Sentence Encoder Class
 from abc import ABC
 import math
 
+import lru
 import numpy as np
 import torch
 
@@ -26,6 +27,8 @@ class SentenceEncoder(Constraint, ABC):
         window_size (int): The number of words to use in the similarity
             comparison. `None` indicates no windowing (encoding is based on the
             full input).
+        embedding_cache_size (int): The maximum number of sentence embeddings to keep
+            cached, keyed by text. Defaults to ``2**14``.
     """
 
     def __init__(
@@ -35,12 +38,14 @@ class SentenceEncoder(Constraint, ABC):
         compare_against_original=True,
         window_size=None,
         skip_text_shorter_than_window=False,
+        embedding_cache_size=2**14,
     ):
         super().__init__(compare_against_original)
         self.metric = metric
         self.threshold = threshold
         self.window_size = window_size
         self.skip_text_shorter_than_window = skip_text_shorter_than_window
+        self._embedding_cache = lru.LRU(embedding_cache_size)
 
         if not self.window_size:
             self.window_size = float("inf")
@@ -65,6 +70,39 @@ class SentenceEncoder(Constraint, ABC):
         """
         raise NotImplementedError()
 
+    def clear_cache(self):
+        self._embedding_cache.clear()
+
+    def encode_cached(self, sentences):
+        """Encodes a list of sentences, reusing the cached embedding of each
+        sentence that was encoded before.
+
+        The sentences that are not cached are encoded with a single call
+        to ``encode``, each of them once.
+
+        Args:
+            sentences (list[str]): The sentences to encode.
+        Returns:
+            A 2-D tensor with the embedding of each of ``sentences``.
+        """
+        embeddings_of = {}
+        missing = []
+        for sentence in dict.fromkeys(sentences):
+            if sentence in self._embedding_cache:
+                embeddings_of[sentence] = self._embedding_cache[sentence]
+            else:
+                missing.append(sentence)
+        if missing:
+            embeddings = self.encode(missing)
+            if not isinstance(embeddings, torch.Tensor):
+                embeddings = torch.tensor(embeddings)
+            for sentence, embedding in zip(missing, embeddings):
+                # Copy rows so that each entry does not keep the whole batch alive.
+                embedding = embedding.clone()
+                embeddings_of[sentence] = embedding
+                self._embedding_cache[sentence] = embedding
+        return torch.stack([embeddings_of[sentence] for sentence in sentences])
+
     def _sim_score(self, starting_text, transformed_text):
         """Returns the metric similarity between the embedding of the starting
         text and the transformed text.
@@ -76,41 +114,15 @@ class SentenceEncoder(Constraint, ABC):
         Returns:
             The similarity between the starting and transformed text using the metric.
         """
-        try:
-            modified_index = next(
-                iter(transformed_text.attack_attrs["newly_modified_indices"])
-            )
-        except KeyError:
-            raise KeyError(
-                "Cannot apply sentence encoder constraint without `newly_modified_indices`"
-            )
-        starting_text_window = starting_text.text_window_around_index(
-            modified_index, self.window_size
-        )
-
-        transformed_text_window = transformed_text.text_window_around_index(
-            modified_index, self.window_size
-        )
-
-        starting_embedding, transformed_embedding = self.model.encode(
-            [starting_text_window, transformed_text_window]
-        )
-
-        if not isinstance(starting_embedding, torch.Tensor):
-            starting_embedding = torch.tensor(starting_embedding)
-
-        if not isinstance(transformed_embedding, torch.Tensor):
-            transformed_embedding = torch.tensor(transformed_embedding)
-
-        starting_embedding = torch.unsqueeze(starting_embedding, dim=0)
-        transformed_embedding = torch.unsqueeze(transformed_embedding, dim=0)
-
-        return self.sim_metric(starting_embedding, transformed_embedding)
+        return self._score_list(starting_text, [transformed_text])
 
     def _score_list(self, starting_text, transformed_texts):
         """Returns the metric similarity between the embedding of the starting
         text and a list of transformed texts.
 
+        The window of the starting text around each modified index is only
+        encoded once, however many transformed texts were modified there.
+
         Args:
             starting_text: The ``AttackedText``to use as a starting point.
             transformed_texts: A list of transformed ``AttackedText``
@@ -127,7 +139,8 @@ class SentenceEncoder(Constraint, ABC):
             return torch.tensor([])
 
         if self.window_size:
-            starting_text_windows = []
+            starting_text_windows = {}
+            window_of_text = []
             transformed_text_windows = []
             for transformed_text in transformed_texts:
                 # @TODO make this work when multiple indices have been modified
@@ -139,27 +152,33 @@ class SentenceEncoder(Constraint, ABC):
                     raise KeyError(
                         "Cannot apply sentence encoder constraint without `newly_modified_indices`"
                     )
-                starting_text_windows.append(
-                    starting_text.text_window_around_index(
+                if modified_index not in starting_text_windows:
+                    starting_text_windows[
+                        modified_index
+                    ] = starting_text.text_window_around_index(
                         modified_index, self.window_size
                     )
-                )
+                window_of_text.append(starting_text_windows[modified_index])
                 transformed_text_windows.append(
                     transformed_text.text_window_around_index(
                         modified_index, self.window_size
                     )
                 )
-            embeddings = self.encode(starting_text_windows + transformed_text_windows)
-            if not isinstance(embeddings, torch.Tensor):
-                embeddings = torch.tensor(embeddings)
-            starting_embeddings = embeddings[: len(transformed_texts)]
-            transformed_embeddings = embeddings[len(transformed_texts) :]
+            unique_starting_windows = list(dict.fromkeys(window_of_text))
+            embeddings = self.encode_cached(
+                unique_starting_windows + transformed_text_windows
+            )
+            starting_window_rows = {
+                window: i for i, window in enumerate(unique_starting_windows)
+            }
+            starting_embeddings = embeddings[
+                [starting_window_rows[window] for window in window_of_text]
+            ]
+            transformed_embeddings = embeddings[len(unique_starting_windows) :]
         else:
             starting_raw_text = starting_text.text
             transformed_raw_texts = [t.text for t in transformed_texts]
-            embeddings = self.encode([starting_raw_text] + transformed_raw_texts)
-            if not isinstance(embeddings, torch.Tensor):
-                embeddings = torch.tensor(embeddings)
+            embeddings = self.encode_cached([starting_raw_text] + transformed_raw_texts)
 
             starting_embedding = embeddings[0]
 
@@ -210,6 +229,15 @@ class SentenceEncoder(Constraint, ABC):
             "skip_text_shorter_than_window",
         ] + super().extra_repr_keys()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_embedding_cache"] = self._embedding_cache.get_size()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__ = state
+        self._embedding_cache = lru.LRU(state["_embedding_cache"])
+
 
 def get_angular_sim(emb1, emb2):
     """Returns the _angular_ similarity between a batch of vector and a batch
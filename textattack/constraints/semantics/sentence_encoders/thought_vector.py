@@ -3,8 +3,6 @@ Thought Vector Class
 ---------------------
 """
 
-import functools
-
 import torch
 
 from textattack.shared import AbstractWordEmbedding, WordEmbedding, utils
@@ -29,10 +27,6 @@ class ThoughtVector(SentenceEncoder):
         self.word_embedding = embedding
         super().__init__(**kwargs)
 
-    def clear_cache(self):
-        self._get_thought_vector.cache_clear()
-
-    @functools.lru_cache(maxsize=2**10)
     def _get_thought_vector(self, text):
         """Sums the embeddings of all the words in ``text`` into a "thought
         vector"."""
@@ -36,10 +36,10 @@ class UniversalSentenceEncoder(SentenceEncoder):
         return encoding.numpy()
 
     def __getstate__(self):
-        state = self.__dict__.copy()
+        state = super().__getstate__()
         state["model"] = None
         return state
 
     def __setstate__(self, state):
-        self.__dict__ = state
+        super().__setstate__(state)
         self.model = None
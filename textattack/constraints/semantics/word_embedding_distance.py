@@ -3,6 +3,8 @@ Word Embedding Distance
 --------------------------
 """
 
+import numpy as np
+
 from textattack.constraints import Constraint
 from textattack.shared import AbstractWordEmbedding, WordEmbedding
 from textattack.shared.validators import transformation_consists_of_word_swaps
@@ -56,6 +58,89 @@ class WordEmbeddingDistance(Constraint):
         """Returns the MSE distance of words with IDs a and b."""
         return self.embedding.get_mse_dist(a, b)
 
+    def get_cos_sim_many(self, a, b):
+        """Returns the cosine similarities of each pair of words with IDs in
+        ``a`` and ``b``."""
+        return self.embedding.get_cos_sim_many(a, b)
+
+    def get_mse_dist_many(self, a, b):
+        """Returns the MSE distances of each pair of words with IDs in ``a``
+        and ``b``."""
+        return self.embedding.get_mse_dist_many(a, b)
+
+    def _check_constraint_many(self, transformed_texts, reference_text):
+        """Filters ``transformed_texts``, computing the distances of all
+        swapped words at once."""
+        failed = np.zeros(len(transformed_texts), dtype=bool)
+        # For each pair of swapped words, the position of its text in `transformed_texts`
+        pair_texts = []
+        ref_ids = []
+        transformed_ids = []
+        word_ids = {}
+
+        def word2index(word):
+            if word not in word_ids:
+                try:
+                    word_ids[word] = self.embedding.word2index(word)
+                except KeyError:
+                    # This error is thrown if the word has no corresponding ID.
+                    word_ids[word] = None
+            return word_ids[word]
+
+        for t, transformed_text in enumerate(transformed_texts):
+            try:
+                indices = transformed_text.attack_attrs["newly_modified_indices"]
+            except KeyError:
+                raise KeyError(
+                    "Cannot apply part-of-speech constraint without `newly_modified_indices`"
+                )
+
+            # FIXME The index i is sometimes larger than the number of tokens - 1
+            if any(
+                i >= len(reference_text.words) or i >= len(transformed_text.words)
+                for i in indices
+            ):
+                failed[t] = True
+                continue
+
+            for i in indices:
+                ref_word = reference_text.words[i]
+                transformed_word = transformed_text.words[i]
+
+                if not self.cased:
+                    # If embedding vocabulary is all lowercase, lowercase words.
+                    ref_word = ref_word.lower()
+                    transformed_word = transformed_word.lower()
+
+                ref_id = word2index(ref_word)
+                transformed_id = word2index(transformed_word)
+                if ref_id is None or transformed_id is None:
+                    if self.include_unknown_words:
+                        continue
+                    failed[t] = True
+                    break
+
+                pair_texts.append(t)
+                ref_ids.append(ref_id)
+                transformed_ids.append(transformed_id)
+
+        if pair_texts:
+            pair_texts = np.array(pair_texts)
+            # Check cosine distance.
+            if self.min_cos_sim:
+                cos_sims = self.get_cos_sim_many(ref_ids, transformed_ids)
+                failed[pair_texts[cos_sims < self.min_cos_sim]] = True
+            # Check MSE distance.
+            if self.max_mse_dist:
+                mse_dists = self.get_mse_dist_many(ref_ids, transformed_ids)
+                failed[pair_texts[mse_dists > self.max_mse_dist]] = True
+
+        return [
+            transformed_text
+            for transformed_text, text_failed in zip(transformed_texts, failed)
+            if not text_failed
+        ]
+
     def _check_constraint(self, transformed_text, reference_text):
         """Returns true if (``transformed_text`` and ``reference_text``) are
         closer than ``self.min_cos_sim`` or ``self.max_mse_dist``."""
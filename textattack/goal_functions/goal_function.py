@@ -6,6 +6,7 @@ GoalFunction Class
 
 
 from abc import ABC, abstractmethod
+import copy
 
 import lru
 import numpy as np
@@ -15,6 +16,11 @@ from textattack.goal_function_results.goal_function_result import (
     GoalFunctionResultStatus,
 )
 from textattack.shared import validators
+from textattack.shared.async_model_executor import AsyncModelExecutor
+from textattack.shared.persistent_model_cache import (
+    PersistentModelCache,
+    model_fingerprint,
+)
 from textattack.shared.utils import ReprMixin
 
 
@@ -29,8 +35,14 @@ class GoalFunction(ReprMixin, ABC):
             Whether the goal function is maximizable, as opposed to a boolean result of success or failure.
         query_budget (:obj:`float`, `optional`, defaults to :obj:`float("in")`):
             The maximum number of model queries allowed.
+        model_batch_size (:obj:`int`, `optional`, defaults to :obj:`32`):
+            The batch size for making queries to the victim model.
         model_cache_size (:obj:`int`, `optional`, defaults to :obj:`2**20`):
             The maximum number of items to keep in the model results cache at once.
+        batch_by_length (:obj:`bool`, `optional`, defaults to :obj:`False`):
+            If :obj:`True`, sort inputs by length before splitting them into batches of ``model_batch_size``, so that
+            inputs of similar length share a batch. This reduces padding for models that pad to the longest input in
+            the batch. Outputs are returned in the original order.
     """
 
     def __init__(
@@ -41,6 +53,7 @@ class GoalFunction(ReprMixin, ABC):
         query_budget=float("inf"),
         model_batch_size=32,
         model_cache_size=2**20,
+        batch_by_length=False,
     ):
         validators.validate_model_goal_function_compatibility(
             self.__class__, model_wrapper.model.__class__
@@ -50,15 +63,107 @@ class GoalFunction(ReprMixin, ABC):
         self.use_cache = use_cache
         self.query_budget = query_budget
         self.batch_size = model_batch_size
+        self.batch_by_length = batch_by_length
         if self.use_cache:
             self._call_model_cache = lru.LRU(model_cache_size)
         else:
             self._call_model_cache = None
+        self.persistent_cache = None
+        self.model_executor = None
+        self.num_cache_hits = 0
+        self.num_cache_misses = 0
 
     def clear_cache(self):
         if self.use_cache:
             self._call_model_cache.clear()
 
+    def cache_stats(self):
+        """Returns the number of hits and misses of the in-memory model cache
+        so far."""
+        return {"hits": self.num_cache_hits, "misses": self.num_cache_misses}
+
+    def enable_persistent_cache(self, path, fingerprint=None):
+        """Stores model outputs in a :class:`~textattack.shared.PersistentModelCache` at ``path``, in addition to the
+        in-memory cache. Unlike the in-memory cache, it is not cleared between examples and can be shared across runs and
+        worker processes.
+
+        Args:
+            path (:obj:`str`): Path of the SQLite database file.
+            fingerprint (:obj:`str`, `optional`): String identifying the victim model. If not set, it is computed from the
+                model's weights.
+        """
+        if fingerprint is None:
+            fingerprint = model_fingerprint(self.model)
+        # Cached outputs are post-processed, so they also depend on the type of goal function.
+        fingerprint = f"{self.__class__.__name__}:{fingerprint}"
+        self.persistent_cache = PersistentModelCache(path, fingerprint)
+
+    def enable_async_model_calls(self, max_pending=2, deterministic=True):
+        """Runs the victim model on a worker thread through an :class:`~textattack.shared.AsyncModelExecutor`, so that
+        the model works on queries submitted with ``get_results_async`` (or ``prefetch``) while the caller does other
+        work.
+
+        Args:
+            max_pending (:obj:`int`, `optional`, defaults to :obj:`2`): Maximum number of model calls waiting to run.
+            deterministic (:obj:`bool`, `optional`, defaults to :obj:`True`): If :obj:`True`, each call is batched
+                exactly as it would be without the worker thread, so outputs do not change. Otherwise, waiting calls are
+                merged into shared batches.
+        """
+        self.model_executor = AsyncModelExecutor(
+            self._call_model_uncached,
+            max_pending=max_pending,
+            deterministic=deterministic,
+        )
+        # Outputs of prefetched texts that have not been queried yet. At most one per pending model call is kept.
+        self._prefetched = lru.LRU(max_pending)
+
+    def shutdown_model_executor(self):
+        """Stops the worker thread of asynchronous model calls, if any.
+
+        It is started again by the next model call.
+        """
+        if self.model_executor is not None:
+            self.model_executor.shutdown()
+            self._prefetched.clear()
+
+    def copy_for_scheduler(self, scheduler):
+        """Returns a copy of this goal function that sends its model calls to
+        ``scheduler``, so that it can attack another example at the same time.
+
+        The copy shares the model and the persistent cache, but has its own
+        in-memory cache and state for the example being attacked.
+
+        Args:
+            scheduler (:class:`~textattack.shared.CoalescingScheduler`): Scheduler that runs the model calls.
+        """
+        goal_function = copy.copy(self)
+        if self.use_cache:
+            goal_function._call_model_cache = lru.LRU(self._call_model_cache.get_size())
+        goal_function.model_executor = scheduler
+        goal_function._prefetched = lru.LRU(1)
+        return goal_function
+
+    def prefetch(self, attacked_text_list):
+        """Starts computing the model outputs of ``attacked_text_list`` on the
+        worker thread, so that they are ready when they are queried (e.g. by
+        ``init_attack_example`` for the next example to attack).
+
+        Prefetched outputs only count as queries once they are queried. Does
+        nothing unless asynchronous model calls are enabled.
+        """
+        if self.model_executor is None:
+            return
+        texts = [
+            text
+            for text in dict.fromkeys(attacked_text_list)
+            if text not in self._prefetched
+            and not (self.use_cache and text in self._call_model_cache)
+        ]
+        if texts:
+            future = self.model_executor.submit(texts)
+            for i, text in enumerate(texts):
+                self._prefetched[text] = (future, i)
+
     def init_attack_example(self, attacked_text, ground_truth_output):
         """Called before attacking ``attacked_text`` to 'reset' the goal
         function and set properties for this example."""
@@ -88,30 +193,52 @@ class GoalFunction(ReprMixin, ABC):
         Additionally returns whether the search is over due to the query
         budget.
         """
-        results = []
+        wait_for_results, search_over = self.get_results_async(
+            attacked_text_list, check_skip=check_skip
+        )
+        return wait_for_results(), search_over
+
+    def get_results_async(self, attacked_text_list, check_skip=False):
+        """Like ``get_results``, but does not wait for the model if
+        asynchronous model calls are enabled.
+
+        The queries are counted right away, so whether the search is over
+        due to the query budget is known before the model is done.
+
+        Returns:
+            A function that waits for the model and returns the results, and whether the search is over due to the
+            query budget.
+        """
         if self.query_budget < float("inf"):
             queries_left = self.query_budget - self.num_queries
             attacked_text_list = attacked_text_list[:queries_left]
         self.num_queries += len(attacked_text_list)
-        model_outputs = self._call_model(attacked_text_list)
-        for attacked_text, raw_output in zip(attacked_text_list, model_outputs):
-            displayed_output = self._get_displayed_output(raw_output)
-            goal_status = self._get_goal_status(
-                raw_output, attacked_text, check_skip=check_skip
-            )
-            goal_function_score = self._get_score(raw_output, attacked_text)
-            results.append(
-                self._goal_function_result_type()(
-                    attacked_text,
-                    raw_output,
-                    displayed_output,
-                    goal_status,
-                    goal_function_score,
-                    self.num_queries,
-                    self.ground_truth_output,
+        num_queries = self.num_queries
+        wait_for_outputs = self._call_model_async(attacked_text_list)
+
+        def wait_for_results():
+            results = []
+            model_outputs = wait_for_outputs()
+            for attacked_text, raw_output in zip(attacked_text_list, model_outputs):
+                displayed_output = self._get_displayed_output(raw_output)
+                goal_status = self._get_goal_status(
+                    raw_output, attacked_text, check_skip=check_skip
+                )
+                goal_function_score = self._get_score(raw_output, attacked_text)
+                results.append(
+                    self._goal_function_result_type()(
+                        attacked_text,
+                        raw_output,
+                        displayed_output,
+                        goal_status,
+                        goal_function_score,
+                        num_queries,
+                        self.ground_truth_output,
+                    )
                 )
-            )
-        return results, self.num_queries == self.query_budget
+            return results
+
+        return wait_for_results, self.num_queries == self.query_budget
 
     def _get_goal_status(self, model_output, attacked_text, check_skip=False):
         should_skip = check_skip and self._should_skip(model_output, attacked_text)
@@ -158,6 +285,10 @@ class GoalFunction(ReprMixin, ABC):
             return []
 
         inputs = [at.tokenizer_input for at in attacked_text_list]
+        if self.batch_by_length:
+            # Character length is a cheap proxy for the number of tokens.
+            order = np.argsort([len(at.text) for at in attacked_text_list], kind="stable")
+            inputs = [inputs[i] for i in order]
         outputs = []
         i = 0
         while i < len(inputs):
@@ -188,36 +319,122 @@ class GoalFunction(ReprMixin, ABC):
             outputs
         ), f"Got {len(outputs)} outputs for {len(inputs)} inputs"
 
+        if self.batch_by_length:
+            # Restore the order of `attacked_text_list`.
+            inverse_order = np.argsort(order)
+            if isinstance(outputs, torch.Tensor):
+                outputs = outputs[torch.from_numpy(inverse_order)]
+            else:
+                outputs = [outputs[i] for i in inverse_order]
+
         return self._process_model_outputs(attacked_text_list, outputs)
 
+    def _call_model_uncached_async(self, attacked_text_list):
+        """Queries the model for a list of ``AttackedText`` objects on the
+        worker thread if asynchronous model calls are enabled, using
+        prefetched outputs where possible.
+
+        Returns:
+            A function that waits for the outputs and returns them.
+        """
+        if self.model_executor is None or not len(attacked_text_list):
+            outputs = self._call_model_uncached(attacked_text_list)
+            return lambda: outputs
+
+        prefetched = {}
+        texts_to_query = []
+        for text in attacked_text_list:
+            if text in self._prefetched:
+                prefetched[text] = self._prefetched[text]
+                del self._prefetched[text]
+            elif text not in prefetched:
+                texts_to_query.append(text)
+        if not prefetched:
+            return self.model_executor.submit(attacked_text_list).result
+        future = self.model_executor.submit(texts_to_query) if texts_to_query else None
+
+        def wait_for_outputs():
+            outputs = future.result() if future is not None else []
+            output_of_text = dict(zip(texts_to_query, outputs))
+            for text, (prefetch_future, i) in prefetched.items():
+                output_of_text[text] = prefetch_future.result()[i]
+            return [output_of_text[text] for text in attacked_text_list]
+
+        return wait_for_outputs
+
+    def _call_model_persistent_async(self, attacked_text_list):
+        """Gets predictions for a list of ``AttackedText`` objects from the
+        persistent cache if it is enabled, and queries the model for the rest.
+
+        Returns:
+            A function that waits for the predictions and returns them.
+        """
+        if self.persistent_cache is None or not len(attacked_text_list):
+            return self._call_model_uncached_async(attacked_text_list)
+        outputs = self.persistent_cache.get_many(attacked_text_list)
+        missing_indices = [i for i, output in enumerate(outputs) if output is None]
+        missing_texts = [attacked_text_list[i] for i in missing_indices]
+        wait_for_missing_outputs = self._call_model_uncached_async(missing_texts)
+
+        def wait_for_outputs():
+            if missing_indices:
+                missing_outputs = wait_for_missing_outputs()
+                self.persistent_cache.put_many(missing_texts, missing_outputs)
+                for i, output in zip(missing_indices, missing_outputs):
+                    outputs[i] = output
+            return outputs
+
+        return wait_for_outputs
+
+    def _call_model_persistent(self, attacked_text_list):
+        """Gets predictions for a list of ``AttackedText`` objects from the
+        persistent cache if it is enabled, and queries the model for the rest."""
+        return self._call_model_persistent_async(attacked_text_list)()
+
+    def _call_model_async(self, attacked_text_list):
+        """Gets predictions for a list of ``AttackedText`` objects like
+        ``_call_model``, without waiting for the model.
+
+        Returns:
+            A function that waits for the predictions and returns them.
+        """
+        if not self.use_cache:
+            return self._call_model_persistent_async(attacked_text_list)
+
+        cached_outputs = {}
+        uncached_list = []
+        for text in attacked_text_list:
+            if text in self._call_model_cache:
+                # Re-write value in cache. This moves the key to the top of the
+                # LRU cache and prevents the unlikely event that the text
+                # is overwritten when we store the inputs from `uncached_list`.
+                self._call_model_cache[text] = self._call_model_cache[text]
+                cached_outputs[text] = self._call_model_cache[text]
+            elif text not in cached_outputs:
+                # Texts repeated in the list (e.g. children of a population
+                # scored together) are only sent to the model once.
+                cached_outputs[text] = None
+                uncached_list.append(text)
+        self.num_cache_hits += len(attacked_text_list) - len(uncached_list)
+        self.num_cache_misses += len(uncached_list)
+        wait_for_uncached_outputs = self._call_model_persistent_async(uncached_list)
+
+        def wait_for_outputs():
+            outputs = wait_for_uncached_outputs()
+            for text, output in zip(uncached_list, outputs):
+                self._call_model_cache[text] = output
+                cached_outputs[text] = output
+            return [cached_outputs[text] for text in attacked_text_list]
+
+        return wait_for_outputs
+
     def _call_model(self, attacked_text_list):
         """Gets predictions for a list of ``AttackedText`` objects.
 
         Gets prediction from cache if possible. If prediction is not in
         the cache, queries model and stores prediction in cache.
         """
-        if not self.use_cache:
-            return self._call_model_uncached(attacked_text_list)
-        else:
-            uncached_list = []
-            for text in attacked_text_list:
-                if text in self._call_model_cache:
-                    # Re-write value in cache. This moves the key to the top of the
-                    # LRU cache and prevents the unlikely event that the text
-                    # is overwritten when we store the inputs from `uncached_list`.
-                    self._call_model_cache[text] = self._call_model_cache[text]
-                else:
-                    uncached_list.append(text)
-            uncached_list = [
-                text
-                for text in attacked_text_list
-                if text not in self._call_model_cache
-            ]
-            outputs = self._call_model_uncached(uncached_list)
-            for text, output in zip(uncached_list, outputs):
-                self._call_model_cache[text] = output
-            all_outputs = [self._call_model_cache[text] for text in attacked_text_list]
-            return all_outputs
+        return self._call_model_async(attacked_text_list)()
 
     def extra_repr_keys(self):
         attrs = []
@@ -231,9 +448,13 @@ class GoalFunction(ReprMixin, ABC):
         state = self.__dict__.copy()
         if self.use_cache:
             state["_call_model_cache"] = self._call_model_cache.get_size()
+        if self.model_executor is not None:
+            state["_prefetched"] = self._prefetched.get_size()
         return state
 
     def __setstate__(self, state):
         self.__dict__ = state
         if self.use_cache:
             self._call_model_cache = lru.LRU(state["_call_model_cache"])
+        if self.model_executor is not None:
+            self._prefetched = lru.LRU(state["_prefetched"])
@@ -3,6 +3,9 @@ Managing Attack Logs.
 ========================
 """
 
+import numpy as np
+
+from textattack.attack_results import AttackResultSummarizer, AttackResultSummary
 from textattack.metrics.attack_metrics import (
     AttackQueries,
     AttackSuccessRate,
@@ -20,12 +23,43 @@ from . import (
 
 
 class AttackLogManager:
-    """Logs the results of an attack to all attached loggers."""
+    """Logs the results of an attack to all attached loggers.
+
+    Args:
+        streaming (:obj:`bool`, `optional`, defaults to :obj:`False`): If :obj:`True`, each result is reduced to an
+            :class:`~textattack.attack_results.AttackResultSummary` once it has been logged, and only the summaries are
+            kept in ``results``, so that memory does not grow with the size of the dataset.
+
+    The success rate, perturbed words and query metrics are updated as each result is logged, so that
+    :meth:`live_metrics` and the summary do not need to go through all the results again.
+    """
 
-    def __init__(self):
+    def __init__(self, streaming=False):
         self.loggers = []
         self.results = []
         self.enable_advance_metrics = False
+        self.streaming = streaming
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        """Creates the running metrics and adds the results already in
+        ``results`` to them."""
+        self._summarize = AttackResultSummarizer()
+        self.attack_success_rate = AttackSuccessRate()
+        self.words_perturbed = WordsPerturbed()
+        self.attack_queries = AttackQueries()
+        for result in self.results:
+            self._update_metrics(self._summarize(result))
+
+    def _update_metrics(self, summary):
+        self.attack_success_rate.update(summary)
+        self.words_perturbed.update(summary)
+        self.attack_queries.update(summary)
+
+    def reset_results(self):
+        """Forgets the results logged so far."""
+        self.results = []
+        self._reset_metrics()
 
     @property
     def batched_results(self):
@@ -33,17 +67,38 @@ class AttackLogManager:
         batched_results = []
         current_batch = []
         for result in self.results:
-            current_text = result.original_result.attacked_text.text
-            if prev_text is None or prev_text == current_text:
+            if isinstance(result, AttackResultSummary):
+                same_example = result.same_example
+            else:
+                current_text = result.original_result.attacked_text.text
+                same_example = prev_text is None or prev_text == current_text
+                prev_text = current_text
+            if same_example or not current_batch:
                 current_batch.append(result)
             else:
                 batched_results.append(current_batch)
                 current_batch = [result]
-            prev_text = result.original_result.attacked_text.text
         if len(current_batch) > 0:
             batched_results.append(current_batch)
         return batched_results
 
+    def retain_result(self, result):
+        """Adds ``result`` to ``results`` and to the running metrics without
+        logging it. In streaming mode, only its
+        :class:`~textattack.attack_results.AttackResultSummary` is kept."""
+        summary = self._summarize(result)
+        self._update_metrics(summary)
+        self.results.append(summary if self.streaming else result)
+
+    def live_metrics(self):
+        """Returns the success rate, perturbed words and query metrics of the
+        results logged so far, as a flat dictionary of numbers."""
+        metrics = self.attack_success_rate.snapshot()
+        metrics.update(self.words_perturbed.snapshot())
+        del metrics["num_words_changed_until_success"]
+        metrics.update(self.attack_queries.snapshot())
+        return metrics
+
     def enable_stdout(self):
         self.loggers.append(FileLogger(stdout=True))
 
@@ -67,7 +122,11 @@ class AttackLogManager:
 
     def log_result(self, result):
         """Logs an ``AttackResult`` on each of `self.loggers`."""
-        self.results.append(result)
+        self.retain_result(result)
+        if self.loggers:
+            live_metrics = self.live_metrics()
+            for logger in self.loggers:
+                logger.log_live_metrics(live_metrics)
         for logger in self.loggers:
             logger.log_attack_result(result)
 
@@ -78,6 +137,17 @@ class AttackLogManager:
             self.log_result(result)
         self.log_summary()
 
+    def __getstate__(self):
+        return self.__dict__.copy()
+
+    def __setstate__(self, state):
+        # Log managers saved in checkpoints before streaming mode and running
+        # metrics were added.
+        state.setdefault("streaming", False)
+        self.__dict__ = state
+        if "attack_success_rate" not in state:
+            self._reset_metrics()
+
     def log_summary_rows(self, rows, title, window_id):
         for logger in self.loggers:
             logger.log_summary_rows(rows, title, window_id)
@@ -98,14 +168,16 @@ class AttackLogManager:
         ]
         self.log_summary_rows(attack_detail_rows, "Attack Details", "attack_details")
 
-    def log_summary(self,  num_queries, elapsed_time):
+    def log_summary(
+        self, num_queries, elapsed_time, model_cache_stats=None, profile=None
+    ):
         total_attacks = len(self.results)
         if total_attacks == 0:
             return
-        # Default metrics - calculated on every attack
-        attack_success_stats = AttackSuccessRate().calculate(self.results)
-        words_perturbed_stats = WordsPerturbed().calculate(self.results)
-        attack_query_stats = AttackQueries().calculate(self.results)
+        # Default metrics - updated as each result is logged
+        attack_success_stats = self.attack_success_rate.snapshot()
+        words_perturbed_stats = self.words_perturbed.snapshot()
+        attack_query_stats = self.attack_queries.snapshot()
 
         # @TODO generate this table based on user input - each column in specific class
         # Example to demonstrate:
@@ -165,16 +237,33 @@ class AttackLogManager:
             summary_table_rows.append(
                 ["Average Attack USE Score:", use_stats["avg_attack_use_score"]]
             )
+        if model_cache_stats is not None:
+            summary_table_rows.append(
+                ["Persistent model cache hits:", model_cache_stats["hits"]]
+            )
+            summary_table_rows.append(
+                ["Persistent model cache misses:", model_cache_stats["misses"]]
+            )
         summary_table_rows.append(["Time Taken(minutes)", round(elapsed_time / (6 * 10**10), 2)])
         summary_table_rows.append(["Time Taken(seconds)", round(elapsed_time / 1e9, 2)])
         self.log_summary_rows(
             summary_table_rows, "Attack Results", "attack_results_summary"
         )
+        if profile is not None:
+            self.log_summary_rows(
+                profile.summary_rows(), "Attack Profile", "attack_profile_summary"
+            )
+            for logger in self.loggers:
+                logger.log_attack_profile(profile)
         # Show histogram of words changed.
         numbins = max(words_perturbed_stats["max_words_changed"], 10)
+        num_words_changed_until_success = np.zeros(numbins)
+        num_words_changed_until_success[
+            : words_perturbed_stats["max_words_changed"]
+        ] = words_perturbed_stats["num_words_changed_until_success"]
         for logger in self.loggers:
             logger.log_hist(
-                words_perturbed_stats["num_words_changed_until_success"][:numbins],
+                num_words_changed_until_success,
                 numbins=numbins,
                 title="Num Words Perturbed",
                 window_id="num_words_perturbed",
@@ -4,8 +4,7 @@ Attack Logs to CSV
 """
 
 import csv
-
-import pandas as pd
+import os
 
 from textattack.shared import AttackedText, logger
 
@@ -13,13 +12,35 @@ from .logger import Logger
 
 
 class CSVLogger(Logger):
-    """Logs attack results to a CSV."""
+    """Logs attack results to a CSV.
+
+    Rows are buffered in memory and appended to the file on ``flush()``,
+    or whenever ``buffer_size`` rows are pending, so the cost of logging
+    does not grow with the number of results already written.
+    """
 
-    def __init__(self, filename="results.csv", color_method="file"):
+    COLUMNS = [
+        "result_index",
+        "original_text",
+        "perturbed_text",
+        "original_score",
+        "perturbed_score",
+        "original_output",
+        "perturbed_output",
+        "ground_truth_output",
+        "num_queries",
+        "result_type",
+    ]
+
+    def __init__(self, filename="results.csv", color_method="file", buffer_size=1000):
         logger.info(f"Logging to CSV at path {filename}")
         self.filename = filename
         self.color_method = color_method
-        self.df = pd.DataFrame()
+        self.buffer_size = buffer_size
+        self._rows = []
+        # Size of the part of the file written so far. Flushes resume from here, which
+        # also drops rows written after a checkpoint when the attack is resumed from it.
+        self._file_offset = 0
         self._flushed = True
         self.prev_result = None
         self.num_results = 1
@@ -33,23 +54,41 @@ class CSVLogger(Logger):
         original_text = original_text.replace("\n", AttackedText.SPLIT_TOKEN)
         perturbed_text = perturbed_text.replace("\n", AttackedText.SPLIT_TOKEN)
         result_type = result.__class__.__name__.replace("AttackResult", "")
-        row = {
-            "result_index": self.num_results,
-            "original_text": original_text,
-            "perturbed_text": perturbed_text,
-            "original_score": result.original_result.score,
-            "perturbed_score": result.perturbed_result.score,
-            "original_output": result.original_result.output,
-            "perturbed_output": result.perturbed_result.output,
-            "ground_truth_output": result.original_result.ground_truth_output,
-            "num_queries": result.num_queries,
-            "result_type": result_type,
-        }
-        self.df = pd.concat([self.df, pd.DataFrame([row])], ignore_index=True)
+        row = [
+            self.num_results,
+            original_text,
+            perturbed_text,
+            result.original_result.score,
+            result.perturbed_result.score,
+            result.original_result.output,
+            result.perturbed_result.output,
+            result.original_result.ground_truth_output,
+            result.num_queries,
+            result_type,
+        ]
+        self._rows.append(row)
         self._flushed = False
+        if len(self._rows) >= self.buffer_size:
+            self._write_rows()
+
+    def _write_rows(self):
+        if self._file_offset and os.path.exists(self.filename):
+            f = open(self.filename, "r+", newline="", encoding="utf-8")
+        else:
+            self._file_offset = 0
+            f = open(self.filename, "w", newline="", encoding="utf-8")
+        with f:
+            f.seek(self._file_offset)
+            f.truncate()
+            writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC, lineterminator="\n")
+            if not self._file_offset:
+                writer.writerow(self.COLUMNS)
+            writer.writerows(self._rows)
+            self._file_offset = f.tell()
+        self._rows = []
 
     def flush(self):
-        self.df.to_csv(self.filename, quoting=csv.QUOTE_NONNUMERIC, index=False)
+        self._write_rows()
         self._flushed = True
 
     def close(self):
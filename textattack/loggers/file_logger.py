@@ -64,7 +64,7 @@ class FileLogger(Logger):
         if self.stdout:
             table_rows = [[title, ""]] + rows
             table = terminaltables.AsciiTable(table_rows)
-            self.fout.write(table.table)
+            self.fout.write(table.table + "\n")
         else:
             if self.summary_file_type == "txt":
                 for row in rows:
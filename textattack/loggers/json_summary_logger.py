@@ -35,6 +35,10 @@ class JsonSummaryLogger(Logger):
 
         self._flushed = False
 
+    def log_attack_profile(self, profile):
+        self.json_dictionary["Attack Profile Per Example"] = profile.example_records()
+        self._flushed = False
+
     def flush(self):
         with open(self.filename, "w") as f:
             json.dump(self.json_dictionary, f, indent=4)
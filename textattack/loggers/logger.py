@@ -16,12 +16,18 @@ class Logger(ABC):
     def log_attack_result(self, result, examples_completed=None):
         pass
 
+    def log_live_metrics(self, metrics):
+        pass
+
     def log_summary_rows(self, rows, title, window_id):
         pass
 
     def log_hist(self, arr, numbins, title, window_id):
         pass
 
+    def log_attack_profile(self, profile):
+        pass
+
     def log_sep(self):
         pass
 
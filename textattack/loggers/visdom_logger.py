@@ -34,6 +34,7 @@ class VisdomLogger(Logger):
         self.hostname = hostname
         self.windows = {}
         self.sample_rows = []
+        self.live_metrics_rows = []
 
     def __getstate__(self):
         state = {i: self.__dict__[i] for i in self.__dict__ if i != "vis"}
@@ -48,10 +49,19 @@ class VisdomLogger(Logger):
         result_str = result.goal_function_result_str(color_method="html")
         self.sample_rows.append([result_str, text_a, text_b])
 
+    def log_live_metrics(self, metrics):
+        self.live_metrics_rows = [[name, value] for name, value in metrics.items()]
+
     def log_summary_rows(self, rows, title, window_id):
         self.table(rows, title=title, window_id=window_id)
 
     def flush(self):
+        if getattr(self, "live_metrics_rows", None):
+            self.table(
+                self.live_metrics_rows,
+                title="Live Attack Metrics",
+                window_id="live_attack_metrics",
+            )
         self.table(
             self.sample_rows,
             title="Sample-Level Results",
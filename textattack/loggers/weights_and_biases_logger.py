@@ -46,6 +46,10 @@ class WeightsAndBiasesLogger(Logger):
             wandb.run.summary[metric_name] = metric_score
         wandb.log({"attack_params": table})
 
+    def log_live_metrics(self, metrics):
+        # Logged with the next result, rather than as a step of its own.
+        wandb.log({f"live/{name}": value for name, value in metrics.items()}, commit=False)
+
     def _log_result_table(self):
         """Weights & Biases doesn't have a feature to automatically aggregate
         results across timesteps and display the full table.
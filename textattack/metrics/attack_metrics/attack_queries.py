@@ -5,37 +5,56 @@ Metrics on AttackQueries
 
 """
 
-import numpy as np
-
-from textattack.attack_results import SkippedAttackResult
+from textattack.attack_results import AttackResultSummarizer
 from textattack.metrics import Metric
 
 
 class AttackQueries(Metric):
     def __init__(self):
         self.all_metrics = {}
+        self.reset()
+
+    def reset(self):
+        """Forgets the results seen so far."""
+        self.num_attacks = 0
+        self.total_num_queries = 0
+        self._summarize = AttackResultSummarizer()
+
+    def update(self, result):
+        """Adds the number of queries of a result that was not skipped.
+
+        Args:
+            result (``AttackResult`` or ``AttackResultSummary``):
+                Attack result of the next instance in dataset
+        """
+        result = self._summarize(result)
+        if result.skipped:
+            return
+        self.num_attacks += 1
+        self.total_num_queries += result.num_queries
+
+    def snapshot(self):
+        """Returns the metrics of the results seen so far."""
+        self.all_metrics["avg_num_queries"] = self.avg_num_queries()
+        return dict(self.all_metrics)
 
     def calculate(self, results):
         """Calculates all metrics related to number of queries in an attack.
 
         Args:
-            results (``AttackResult`` objects):
+            results (``AttackResult`` or ``AttackResultSummary`` objects):
                 Attack results for each instance in dataset
         """
 
         self.results = results
-        self.num_queries = np.array(
-            [
-                r.num_queries
-                for r in self.results
-                if not isinstance(r, SkippedAttackResult)
-            ]
-        )
-        self.all_metrics["avg_num_queries"] = self.avg_num_queries()
-
-        return self.all_metrics
+        self.reset()
+        for result in self.results:
+            self.update(result)
+        return self.snapshot()
 
     def avg_num_queries(self):
-        avg_num_queries = self.num_queries.mean()
+        if self.num_attacks == 0:
+            return float("nan")
+        avg_num_queries = self.total_num_queries / self.num_attacks
         avg_num_queries = round(avg_num_queries, 2)
         return avg_num_queries
@@ -5,47 +5,47 @@ Metrics on AttackSuccessRate
 
 """
 
-from textattack.attack_results import FailedAttackResult, SkippedAttackResult, SuccessfulAttackResult
+from textattack.attack_results import AttackResultSummarizer, SuccessfulAttackResult
 from textattack.metrics import Metric
 
 
 class AttackSuccessRate(Metric):
     def __init__(self):
+        self.all_metrics = {}
+        self.reset()
+
+    def reset(self):
+        """Forgets the results seen so far."""
+        self.total_attacks = 0
         self.failed_attacks = 0
         self.skipped_attacks = 0
         self.successful_attacks = 0
         self.successful_peturbs = 0
+        self._summarize = AttackResultSummarizer()
 
-        self.all_metrics = {}
-
-    def calculate(self, results):
-        """Calculates all metrics related to number of succesful, failed and
-        skipped results in an attack.
+    def update(self, result):
+        """Counts the next result. Further results of the same example only
+        count as successful perturbations.
 
         Args:
-            results (``AttackResult`` objects):
-                Attack results for each instance in dataset
+            result (``AttackResult`` or ``AttackResultSummary``):
+                Attack result of the next instance in dataset
         """
-        self.results = results
-        self.total_attacks = 0
-        prev_result = None
-
-        for result in self.results:
-            if prev_result is not None and prev_result.original_result == result.original_result:
-                if isinstance(result, SuccessfulAttackResult):
-                    self.successful_peturbs += 1
-                continue
-            prev_result = result
-            self.total_attacks += 1
-            if isinstance(result, FailedAttackResult):
-                self.failed_attacks += 1
-                continue
-            elif isinstance(result, SkippedAttackResult):
-                self.skipped_attacks += 1
-                continue
-            else:
-                self.successful_attacks += 1
+        result = self._summarize(result)
+        if result.same_example:
+            if issubclass(result.result_type, SuccessfulAttackResult):
+                self.successful_peturbs += 1
+            return
+        self.total_attacks += 1
+        if result.failed:
+            self.failed_attacks += 1
+        elif result.skipped:
+            self.skipped_attacks += 1
+        else:
+            self.successful_attacks += 1
 
+    def snapshot(self):
+        """Returns the metrics of the results seen so far."""
         # Calculated numbers
         self.all_metrics["successful_attacks"] = self.successful_attacks
         self.all_metrics["failed_attacks"] = self.failed_attacks
@@ -57,9 +57,25 @@ class AttackSuccessRate(Metric):
         self.all_metrics["attack_accuracy_perc"] = self.attack_accuracy_perc()
         self.all_metrics["attack_success_rate"] = self.attack_success_rate_perc()
 
-        return self.all_metrics
+        return dict(self.all_metrics)
+
+    def calculate(self, results):
+        """Calculates all metrics related to number of succesful, failed and
+        skipped results in an attack.
+
+        Args:
+            results (``AttackResult`` or ``AttackResultSummary`` objects):
+                Attack results for each instance in dataset
+        """
+        self.results = results
+        self.reset()
+        for result in self.results:
+            self.update(result)
+        return self.snapshot()
 
     def original_accuracy_perc(self):
+        if self.total_attacks == 0:
+            return 0
         original_accuracy = (
             (self.total_attacks - self.skipped_attacks) * 100.0 / (self.total_attacks)
         )
@@ -67,6 +83,8 @@ class AttackSuccessRate(Metric):
         return original_accuracy
 
     def attack_accuracy_perc(self):
+        if self.total_attacks == 0:
+            return 0
         accuracy_under_attack = (self.failed_attacks) * 100.0 / (self.total_attacks)
         accuracy_under_attack = round(accuracy_under_attack, 2)
         return accuracy_under_attack
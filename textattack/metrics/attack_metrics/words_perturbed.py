@@ -5,81 +5,99 @@ Metrics on perturbed words
 
 """
 
+import collections
+
 import numpy as np
 
-from textattack.attack_results import FailedAttackResult, SkippedAttackResult
+from textattack.attack_results import AttackResultSummarizer
 from textattack.metrics import Metric
 
 
 class WordsPerturbed(Metric):
     def __init__(self):
-        self.total_attacks = 0
-        self.all_num_words = None
-        self.perturbed_word_percentages = None
-        self.num_words_changed_until_success = 0
         self.all_metrics = {}
+        self.reset()
 
-    def calculate(self, results):
-        """Calculates all metrics related to perturbed words in an attack.
-
-        Args:
-            results (``AttackResult`` objects):
-                Attack results for each instance in dataset
-        """
-
-        self.results = results
-        self.total_attacks = len(self.results)
-        self.all_num_words = np.zeros(len(self.results))
-        self.perturbed_word_percentages = np.zeros(len(self.results))
-        self.num_words_changed_until_success = np.zeros(2**16)
+    def reset(self):
+        """Forgets the results seen so far."""
+        self.total_attacks = 0
+        self.total_num_words = 0
+        self.num_perturbed_attacks = 0
+        self.total_perturbed_word_percentage = 0.0
+        self.num_words_changed_counts = collections.Counter()
         self.max_words_changed = 0
+        self._summarize = AttackResultSummarizer()
 
-        for i, result in enumerate(self.results):
-            self.all_num_words[i] = len(result.original_result.attacked_text.words)
-
-            if isinstance(result, FailedAttackResult) or isinstance(
-                result, SkippedAttackResult
-            ):
-                continue
+    def update(self, result):
+        """Adds the number of words of a result, and how many of them were
+        perturbed if the attack succeeded.
 
-            num_words_changed = len(
-                result.original_result.attacked_text.all_words_diff(
-                    result.perturbed_result.attacked_text
-                )
-            )
-            self.num_words_changed_until_success[num_words_changed - 1] += 1
-            self.max_words_changed = max(
-                self.max_words_changed or num_words_changed, num_words_changed
+        Args:
+            result (``AttackResult`` or ``AttackResultSummary``):
+                Attack result of the next instance in dataset
+        """
+        result = self._summarize(result)
+        self.total_attacks += 1
+        self.total_num_words += result.num_words
+
+        if not result.succeeded:
+            return
+
+        num_words_changed = result.num_words_changed
+        self.num_words_changed_counts[num_words_changed] += 1
+        self.max_words_changed = max(self.max_words_changed, num_words_changed)
+        if result.num_words > 0 and num_words_changed > 0:
+            self.num_perturbed_attacks += 1
+            self.total_perturbed_word_percentage += (
+                num_words_changed * 100.0 / result.num_words
             )
-            if len(result.original_result.attacked_text.words) > 0:
-                perturbed_word_percentage = (
-                    num_words_changed
-                    * 100.0
-                    / len(result.original_result.attacked_text.words)
-                )
-            else:
-                perturbed_word_percentage = 0
 
-            self.perturbed_word_percentages[i] = perturbed_word_percentage
+    def snapshot(self):
+        """Returns the metrics of the results seen so far.
+
+        ``num_words_changed_until_success[i]`` is the number of successful
+        attacks that changed ``i + 1`` words.
+        """
+        num_words_changed_until_success = np.zeros(self.max_words_changed)
+        for num_words_changed, count in self.num_words_changed_counts.items():
+            if num_words_changed > 0:
+                num_words_changed_until_success[num_words_changed - 1] = count
 
         self.all_metrics["avg_word_perturbed"] = self.avg_number_word_perturbed_num()
         self.all_metrics["avg_word_perturbed_perc"] = self.avg_perturbation_perc()
         self.all_metrics["max_words_changed"] = self.max_words_changed
         self.all_metrics[
             "num_words_changed_until_success"
-        ] = self.num_words_changed_until_success
+        ] = num_words_changed_until_success
 
-        return self.all_metrics
+        return dict(self.all_metrics)
+
+    def calculate(self, results):
+        """Calculates all metrics related to perturbed words in an attack.
+
+        Args:
+            results (``AttackResult`` or ``AttackResultSummary`` objects):
+                Attack results for each instance in dataset
+        """
+
+        self.results = results
+        self.reset()
+        for result in self.results:
+            self.update(result)
+        return self.snapshot()
 
     def avg_number_word_perturbed_num(self):
-        average_num_words = self.all_num_words.mean()
+        if self.total_attacks == 0:
+            return float("nan")
+        average_num_words = self.total_num_words / self.total_attacks
         average_num_words = round(average_num_words, 2)
         return average_num_words
 
     def avg_perturbation_perc(self):
-        self.perturbed_word_percentages = self.perturbed_word_percentages[
-            self.perturbed_word_percentages > 0
-        ]
-        average_perc_words_perturbed = self.perturbed_word_percentages.mean()
+        if self.num_perturbed_attacks == 0:
+            return float("nan")
+        average_perc_words_perturbed = (
+            self.total_perturbed_word_percentage / self.num_perturbed_attacks
+        )
         average_perc_words_perturbed = round(average_perc_words_perturbed, 2)
         return average_perc_words_perturbed
@@ -6,44 +6,71 @@ Class for calculating perplexity from AttackResults
 
 """
 
+import numpy as np
 import torch
 
-from textattack.attack_results import FailedAttackResult, SkippedAttackResult
+from textattack.attack_results import successful_text_pairs
 from textattack.metrics import Metric
 import textattack.shared.utils
 
+_PPL_MODEL_CACHE = {}
 
-class Perplexity(Metric):
-    def __init__(self, model_name="gpt2"):
-        self.all_metrics = {}
-        self.original_candidates = []
-        self.successful_candidates = []
 
+def _load_ppl_model(model_name):
+    """Returns the language model and tokenizer ``model_name``, loading them
+    the first time they are used."""
+    if model_name not in _PPL_MODEL_CACHE:
         if model_name == "gpt2":
             from transformers import GPT2LMHeadModel, GPT2Tokenizer
 
-            self.ppl_model = GPT2LMHeadModel.from_pretrained("gpt2")
-            self.ppl_model.to(textattack.shared.utils.device)
-            self.ppl_tokenizer = GPT2Tokenizer.from_pretrained("gpt2")
-            self.ppl_model.eval()
-            self.max_length = self.ppl_model.config.n_positions
+            ppl_model = GPT2LMHeadModel.from_pretrained("gpt2")
+            ppl_tokenizer = GPT2Tokenizer.from_pretrained("gpt2")
         else:
             from transformers import AutoModelForMaskedLM, AutoTokenizer
 
-            self.ppl_model = AutoModelForMaskedLM.from_pretrained(model_name)
-            self.ppl_tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.ppl_model.to(textattack.shared.utils.device)
-            self.ppl_model.eval()
+            ppl_model = AutoModelForMaskedLM.from_pretrained(model_name)
+            ppl_tokenizer = AutoTokenizer.from_pretrained(model_name)
+        ppl_model.to(textattack.shared.utils.device)
+        ppl_model.eval()
+        _PPL_MODEL_CACHE[model_name] = (ppl_model, ppl_tokenizer)
+    return _PPL_MODEL_CACHE[model_name]
+
+
+class Perplexity(Metric):
+    """Perplexity of the original and perturbed texts of successful attacks.
+
+    Each text is scored on its own, in batches of texts of similar lengths.
+    The model is loaded once per ``model_name`` and shared by all instances.
+    After :meth:`calculate`, the perplexity of each text is in
+    ``original_candidates_ppl`` and ``successful_candidates_ppl``.
+
+    Args:
+        model_name (:obj:`str`, `optional`, defaults to :obj:`"gpt2"`): ``"gpt2"``, or the name of a masked language
+            model from the HuggingFace model hub.
+        batch_size (:obj:`int`, `optional`, defaults to :obj:`32`): Number of texts scored in one forward pass.
+    """
+
+    def __init__(self, model_name="gpt2", batch_size=32):
+        self.all_metrics = {}
+        self.original_candidates = []
+        self.successful_candidates = []
+
+        self.ppl_model, self.ppl_tokenizer = _load_ppl_model(model_name)
+        self.is_causal = model_name == "gpt2"
+        if self.is_causal:
+            self.max_length = self.ppl_model.config.n_positions
+        else:
             self.max_length = self.ppl_model.config.max_position_embeddings
 
         self.stride = 512
+        self.batch_size = batch_size
 
     def calculate(self, results):
         """Calculates average Perplexity on all successfull attacks using a
         pre-trained small GPT-2 model.
 
         Args:
-            results (``AttackResult`` objects):
+            results (``AttackResult`` or ``AttackResultSummary`` objects):
                 Attack results for each instance in dataset
 
         Example::
@@ -68,39 +95,99 @@ class Perplexity(Metric):
             >> ppl = textattack.metrics.quality_metrics.Perplexity().calculate(results)
         """
         self.results = results
-        self.original_candidates_ppl = []
-        self.successful_candidates_ppl = []
-
-        for i, result in enumerate(self.results):
-            if isinstance(result, FailedAttackResult):
-                continue
-            elif isinstance(result, SkippedAttackResult):
-                continue
-            else:
-                self.original_candidates.append(
-                    result.original_result.attacked_text.text.lower()
-                )
-                self.successful_candidates.append(
-                    result.perturbed_result.attacked_text.text.lower()
-                )
+        self.original_candidates = []
+        self.successful_candidates = []
 
-        ppl_orig = self.calc_ppl(self.original_candidates)
-        ppl_attack = self.calc_ppl(self.successful_candidates)
+        for original_text, perturbed_text in successful_text_pairs(self.results):
+            self.original_candidates.append(original_text.lower())
+            self.successful_candidates.append(perturbed_text.lower())
 
-        self.all_metrics["avg_original_perplexity"] = round(ppl_orig, 2)
+        self.original_candidates_ppl = self.perplexities(self.original_candidates)
+        self.successful_candidates_ppl = self.perplexities(self.successful_candidates)
 
-        self.all_metrics["avg_attack_perplexity"] = round(ppl_attack, 2)
+        self.all_metrics["avg_original_perplexity"] = round(
+            self._average(self.original_candidates_ppl), 2
+        )
+
+        self.all_metrics["avg_attack_perplexity"] = round(
+            self._average(self.successful_candidates_ppl), 2
+        )
 
         return self.all_metrics
 
+    @staticmethod
+    def _average(perplexities):
+        perplexities = [ppl for ppl in perplexities if not np.isnan(ppl)]
+        if not perplexities:
+            return float("nan")
+        return float(np.mean(perplexities))
+
     def calc_ppl(self, texts):
+        """Returns the average perplexity of ``texts``, each scored on its
+        own."""
+        return self._average(self.perplexities(texts))
+
+    def perplexities(self, texts):
+        """Returns the perplexity of each of ``texts``.
 
+        Texts are sorted by length and scored in batches of
+        ``batch_size``, padded to the longest text of their batch. Texts
+        longer than the model's maximum length are scored on their own with
+        a sliding window.
+        """
+        encodings = [
+            self.ppl_tokenizer.encode(text, add_special_tokens=True) for text in texts
+        ]
+        scores = [float("nan")] * len(texts)
+        batched = []
+        for i, input_ids in enumerate(encodings):
+            if len(input_ids) > self.max_length:
+                scores[i] = self._strided_ppl(input_ids)
+            elif input_ids:
+                batched.append(i)
+        batched.sort(key=lambda i: len(encodings[i]))
+
+        pad_token_id = self.ppl_tokenizer.pad_token_id
+        if pad_token_id is None:
+            pad_token_id = self.ppl_tokenizer.eos_token_id or 0
+        for start in range(0, len(batched), self.batch_size):
+            batch = batched[start : start + self.batch_size]
+            lengths = [len(encodings[i]) for i in batch]
+            input_ids = torch.full((len(batch), max(lengths)), pad_token_id)
+            attention_mask = torch.zeros_like(input_ids)
+            for row, i in enumerate(batch):
+                input_ids[row, : lengths[row]] = torch.tensor(encodings[i])
+                attention_mask[row, : lengths[row]] = 1
+            for i, ppl in zip(batch, self._batch_ppl(input_ids, attention_mask)):
+                scores[i] = ppl
+        return scores
+
+    def _batch_ppl(self, input_ids, attention_mask):
+        """Returns the perplexity of each row of the padded ``input_ids``, or
+        NaN for rows without any token to predict."""
+        input_ids = input_ids.to(textattack.shared.utils.device)
+        attention_mask = attention_mask.to(textattack.shared.utils.device)
+        labels = input_ids.masked_fill(attention_mask == 0, -100)
+        with torch.no_grad():
+            logits = self.ppl_model(input_ids, attention_mask=attention_mask)[0]
+            if self.is_causal:
+                # Each token is predicted from the ones before it.
+                logits = logits[:, :-1]
+                labels = labels[:, 1:]
+            nll = torch.nn.functional.cross_entropy(
+                logits.transpose(1, 2), labels, ignore_index=-100, reduction="none"
+            )
+            # Only the sum and number of tokens of each row leave the device.
+            nll_sums = nll.sum(dim=1).cpu()
+            num_tokens = (labels != -100).sum(dim=1).cpu()
+        ppl = torch.exp(nll_sums / num_tokens.clamp(min=1))
+        return ppl.masked_fill(num_tokens == 0, float("nan")).tolist()
+
+    def _strided_ppl(self, input_ids):
+        """Returns the perplexity of a text longer than ``max_length``."""
+        input_ids = torch.tensor(input_ids).unsqueeze(0)
         with torch.no_grad():
-            text = " ".join(texts)
             eval_loss = []
-            input_ids = torch.tensor(
-                self.ppl_tokenizer.encode(text, add_special_tokens=True)
-            ).unsqueeze(0)
             # Strided perplexity calculation from huggingface.co/transformers/perplexity.html
             for i in range(0, input_ids.size(1), self.stride):
                 begin_loc = max(i + self.stride - self.max_length, 0)
@@ -6,24 +6,40 @@ Class for calculating USE similarity on AttackResults
 
 """
 
-from textattack.attack_results import FailedAttackResult, SkippedAttackResult
+import torch
+
+from textattack.attack_results import successful_text_pairs
 from textattack.constraints.semantics.sentence_encoders import UniversalSentenceEncoder
 from textattack.metrics import Metric
+from textattack.shared import AttackedText
 
 
 class USEMetric(Metric):
-    def __init__(self, **kwargs):
+    """Angular similarity between the Universal Sentence Encoder embeddings
+    of the original and perturbed texts of successful attacks.
+
+    All texts are encoded in batches of ``batch_size``, each distinct text
+    once, so an original text with several perturbations is only encoded
+    once. After :meth:`calculate`, the score of each perturbation is in
+    ``use_scores``.
+
+    Args:
+        batch_size (:obj:`int`, `optional`, defaults to :obj:`256`): Number of texts encoded in one call to the encoder.
+    """
+
+    def __init__(self, batch_size=256, **kwargs):
         self.use_obj = UniversalSentenceEncoder()
-        self.use_obj.model = UniversalSentenceEncoder()
+        self.batch_size = batch_size
         self.original_candidates = []
         self.successful_candidates = []
+        self.use_scores = []
         self.all_metrics = {}
 
     def calculate(self, results):
         """Calculates average USE similarity on all successfull attacks.
 
         Args:
-            results (``AttackResult`` objects):
+            results (``AttackResult`` or ``AttackResultSummary`` objects):
                 Attack results for each instance in dataset
 
         Example::
@@ -49,26 +65,54 @@ class USEMetric(Metric):
         """
 
         self.results = results
+        self.original_candidates = []
+        self.successful_candidates = []
 
-        for i, result in enumerate(self.results):
-            if isinstance(result, FailedAttackResult):
-                continue
-            elif isinstance(result, SkippedAttackResult):
-                continue
-            else:
-                self.original_candidates.append(result.original_result.attacked_text)
-                self.successful_candidates.append(result.perturbed_result.attacked_text)
-
-        use_scores = []
-        for c in range(len(self.original_candidates)):
-            use_scores.append(
-                self.use_obj._sim_score(
-                    self.original_candidates[c], self.successful_candidates[c]
-                ).item()
-            )
+        for original_text, perturbed_text in successful_text_pairs(self.results):
+            self.original_candidates.append(self._text_window(original_text))
+            self.successful_candidates.append(self._text_window(perturbed_text))
+
+        if not self.original_candidates:
+            self.use_scores = []
+            self.all_metrics["avg_attack_use_score"] = float("nan")
+            return self.all_metrics
+
+        texts = list(
+            dict.fromkeys(self.original_candidates + self.successful_candidates)
+        )
+        rows = {text: i for i, text in enumerate(texts)}
+        embeddings = self._encode(texts)
+        original_embeddings = embeddings[[rows[t] for t in self.original_candidates]]
+        successful_embeddings = embeddings[
+            [rows[t] for t in self.successful_candidates]
+        ]
+        self.use_scores = self.use_obj.sim_metric(
+            original_embeddings, successful_embeddings
+        ).tolist()
 
         self.all_metrics["avg_attack_use_score"] = round(
-            sum(use_scores) / len(use_scores), 2
+            sum(self.use_scores) / len(self.use_scores), 2
         )
 
         return self.all_metrics
+
+    @staticmethod
+    def _text_window(text):
+        """Returns ``text`` from its first word to the end of its last word,
+        which is what the encoder compares with its default, unbounded
+        window."""
+        attacked_text = AttackedText(text)
+        if attacked_text.num_words == 0:
+            return text
+        return attacked_text.text_window_around_index(0, float("inf"))
+
+    def _encode(self, texts):
+        """Encodes ``texts`` in batches of ``batch_size``, and returns their
+        embeddings as one 2-D tensor."""
+        embeddings = []
+        for i in range(0, len(texts), self.batch_size):
+            batch_embeddings = self.use_obj.encode(texts[i : i + self.batch_size])
+            if not isinstance(batch_embeddings, torch.Tensor):
+                batch_embeddings = torch.tensor(batch_embeddings)
+            embeddings.append(batch_embeddings)
+        return torch.cat(embeddings, dim=0)
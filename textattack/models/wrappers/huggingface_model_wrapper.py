@@ -40,16 +40,18 @@ class HuggingFaceModelWrapper(PyTorchModelWrapper):
         (Regular PyTorch ``nn.Module`` models typically take inputs as
         positional arguments.)
         """
-        # Default max length is set to be int(1e30), so we force 512 to enable batching.
+        # Default max length is set to be int(1e30), so we cap inputs at 512 tokens.
         max_length = (
             512
             if self.tokenizer.model_max_length == int(1e30)
             else self.tokenizer.model_max_length
         )
+        # Pad to the longest input in the batch rather than to `max_length`, so short
+        # inputs do not pay for a full-length forward pass.
         inputs_dict = self.tokenizer(
             text_input_list,
             add_special_tokens=True,
-            padding="max_length",
+            padding="longest",
             max_length=max_length,
             truncation=True,
             return_tensors="pt",
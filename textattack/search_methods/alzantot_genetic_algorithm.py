@@ -126,9 +126,8 @@ class AlzantotGeneticAlgorithm(GeneticAlgorithm):
                 num_candidate_transformations[i], epsilon
             )
 
-        population = []
-        for _ in range(pop_size):
-            pop_member = PopulationMember(
+        population = [
+            PopulationMember(
                 initial_result.attacked_text,
                 initial_result,
                 attributes={
@@ -137,8 +136,6 @@ class AlzantotGeneticAlgorithm(GeneticAlgorithm):
                     )
                 },
             )
-            # Perturb `pop_member` in-place
-            pop_member = self._perturb(pop_member, initial_result)
-            population.append(pop_member)
-
-        return population
+            for _ in range(pop_size)
+        ]
+        return self._perturb_many(population, initial_result)
@@ -30,12 +30,9 @@ class BeamSearchWithTimeout(BeamSearch):
         search_over = False
         start = time.time()
         while not search_over:
-            potential_next_beam = []
-            for text in beam:
-                transformations = self.get_transformations(
-                    text, original_text=initial_result.attacked_text
-                )
-                potential_next_beam += transformations
+            potential_next_beam = self.get_transformations_batched(
+                beam, original_text=initial_result.attacked_text
+            )
 
             if len(potential_next_beam) == 0:
                 # If we did not find any possible perturbations, give up.
@@ -71,56 +71,97 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
         Returns:
             Perturbed `PopulationMember`
         """
-        num_words = pop_member.attacked_text.num_words
-        # `word_select_prob_weights` is a list of values used for sampling one word to transform
-        word_select_prob_weights = np.copy(
-            self._get_word_select_prob_weights(pop_member)
-        )
-        non_zero_indices = np.count_nonzero(word_select_prob_weights)
-        if non_zero_indices == 0:
-            return pop_member
-        iterations = 0
-        while iterations < non_zero_indices:
-            if index:
-                idx = index
-            else:
-                w_select_probs = word_select_prob_weights / np.sum(
-                    word_select_prob_weights
-                )
-                idx = np.random.choice(num_words, 1, p=w_select_probs)[0]
+        return self._perturb_many([pop_member], original_result, indices=[index])[0]
 
-            transformed_texts = self.get_transformations(
-                pop_member.attacked_text,
-                original_text=original_result.attacked_text,
-                indices_to_modify=[idx],
-            )
-
-            if not len(transformed_texts):
-                iterations += 1
-                continue
+    def _perturb_many(self, pop_members, original_result, indices=None):
+        """Perturb each of `pop_members` like `_perturb`, querying the model
+        for all of them at once.
 
-            new_results, self._search_over = self.get_goal_results(transformed_texts)
+        In each round, a word is picked for every member that has not been
+        perturbed yet, and the transformations of all picked words are
+        scored with a single call to ``get_goal_results``. A member is
+        replaced by its best transformation if it improves its score.
+        Otherwise, it tries another word in the next round.
 
-            diff_scores = (
-                torch.Tensor([r.score for r in new_results]) - pop_member.result.score
-            )
-            if len(diff_scores) and diff_scores.max() > 0:
-                idx_with_max_score = diff_scores.argmax()
-                pop_member = self._modify_population_member(
-                    pop_member,
-                    transformed_texts[idx_with_max_score],
-                    new_results[idx_with_max_score],
-                    idx,
+        Args:
+            pop_members (list[PopulationMember]): The population members being perturbed.
+            original_result (GoalFunctionResult): Result of original sample being attacked
+            indices (list[int]): Index of word to perturb for each member. `None` picks words at random.
+        Returns:
+            List of perturbed `PopulationMember`
+        """
+        pop_members = list(pop_members)
+        if indices is None:
+            indices = [None] * len(pop_members)
+        # `word_select_prob_weights` are lists of values used for sampling one word to transform
+        word_select_prob_weights = [
+            np.copy(self._get_word_select_prob_weights(pop_member))
+            for pop_member in pop_members
+        ]
+        iterations_left = [
+            np.count_nonzero(weights) for weights in word_select_prob_weights
+        ]
+        active = [i for i in range(len(pop_members)) if iterations_left[i] > 0]
+
+        while active and not self._search_over:
+            # Pick a word for each member, and group the members by the word picked.
+            members_at_idx = {}
+            for i in active:
+                if indices[i]:
+                    idx = indices[i]
+                else:
+                    w_select_probs = word_select_prob_weights[i] / np.sum(
+                        word_select_prob_weights[i]
+                    )
+                    idx = np.random.choice(
+                        pop_members[i].attacked_text.num_words, 1, p=w_select_probs
+                    )[0]
+                members_at_idx.setdefault(idx, []).append(i)
+
+            # Members with transformations, the word picked for them, and their transformations.
+            queried = []
+            transformed_texts = []
+            for idx, members in members_at_idx.items():
+                texts_per_member = self.get_transformations_batched(
+                    [pop_members[i].attacked_text for i in members],
+                    original_text=original_result.attacked_text,
+                    flatten=False,
+                    indices_to_modify=[idx],
                 )
-                return pop_member
-
-            word_select_prob_weights[idx] = 0
-            iterations += 1
-
-            if self._search_over:
-                break
-
-        return pop_member
+                for i, texts in zip(members, texts_per_member):
+                    if not len(texts):
+                        iterations_left[i] -= 1
+                        continue
+                    queried.append((i, idx, len(transformed_texts), len(texts)))
+                    transformed_texts.extend(texts)
+
+            if transformed_texts:
+                new_results, self._search_over = self.get_goal_results(
+                    transformed_texts
+                )
+            for i, idx, start, num_texts in queried:
+                # `new_results` may be cut short by the query budget.
+                member_results = new_results[start : start + num_texts]
+                diff_scores = (
+                    torch.Tensor([r.score for r in member_results])
+                    - pop_members[i].result.score
+                )
+                if len(diff_scores) and diff_scores.max() > 0:
+                    idx_with_max_score = diff_scores.argmax()
+                    pop_members[i] = self._modify_population_member(
+                        pop_members[i],
+                        transformed_texts[start + idx_with_max_score],
+                        member_results[idx_with_max_score],
+                        idx,
+                    )
+                    iterations_left[i] = 0
+                else:
+                    word_select_prob_weights[i][idx] = 0
+                    iterations_left[i] -= 1
+
+            active = [i for i in active if iterations_left[i] > 0]
+
+        return pop_members
 
     @abstractmethod
     def _crossover_operation(self, pop_member1, pop_member2):
@@ -176,6 +217,15 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
         Returns:
             A population member containing the crossover.
         """
+        return self._crossover_many([(pop_member1, pop_member2)], original_text)[0]
+
+    def _crossover_text(self, pop_member1, pop_member2, original_text):
+        """Generates the text of a crossover between pop_member1 and
+        pop_member2, without querying the model.
+
+        Returns:
+            Tuple of `AttackedText` and a dictionary of attributes, or `None` if no child passes the constraints.
+        """
         x1_text = pop_member1.attacked_text
         x2_text = pop_member2.attacked_text
 
@@ -209,15 +259,47 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
             num_tries += 1
 
         if self.post_crossover_check and not passed_constraints:
-            # If we cannot find a child that passes the constraints,
-            # we just randomly pick one of the parents to be the child for the next iteration.
-            pop_mem = pop_member1 if np.random.uniform() < 0.5 else pop_member2
-            return pop_mem
-        else:
-            new_results, self._search_over = self.get_goal_results([new_text])
-            return PopulationMember(
-                new_text, result=new_results[0], attributes=attributes
+            return None
+        return new_text, attributes
+
+    def _crossover_many(self, parent_pairs, original_text):
+        """Generates a crossover between each pair of `parent_pairs`, scoring
+        all children with a single call to ``get_goal_results``.
+
+        Args:
+            parent_pairs (list[tuple[PopulationMember, PopulationMember]]): The parents of each child.
+            original_text (AttackedText): Original text
+        Returns:
+            A list with the population member containing each crossover. If the query budget runs out,
+            only the children before the first one that could not be scored are returned.
+        """
+        children = []
+        new_texts = []
+        for pop_member1, pop_member2 in parent_pairs:
+            crossover = self._crossover_text(pop_member1, pop_member2, original_text)
+            if crossover is None:
+                # If we cannot find a child that passes the constraints,
+                # we just randomly pick one of the parents to be the child for the next iteration.
+                pop_mem = pop_member1 if np.random.uniform() < 0.5 else pop_member2
+                children.append(pop_mem)
+            else:
+                new_text, attributes = crossover
+                children.append((len(new_texts), attributes))
+                new_texts.append(new_text)
+
+        if not new_texts:
+            return children
+        new_results, self._search_over = self.get_goal_results(new_texts)
+        for i, child in enumerate(children):
+            if isinstance(child, PopulationMember):
+                continue
+            text_idx, attributes = child
+            if text_idx >= len(new_results):
+                return children[:i]
+            children[i] = PopulationMember(
+                new_texts[text_idx], result=new_results[text_idx], attributes=attributes
             )
+        return children
 
     @abstractmethod
     def _initialize_population(self, initial_result, pop_size):
@@ -259,23 +341,15 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
             parent1_idx = np.random.choice(pop_size, size=pop_size - 1, p=select_probs)
             parent2_idx = np.random.choice(pop_size, size=pop_size - 1, p=select_probs)
 
-            children = []
-            for idx in range(pop_size - 1):
-                child = self._crossover(
-                    population[parent1_idx[idx]],
-                    population[parent2_idx[idx]],
-                    initial_result.attacked_text,
-                )
-                if self._search_over:
-                    break
-
-                child = self._perturb(child, initial_result)
-                children.append(child)
-
-                # We need two `search_over` checks b/c value might change both in
-                # `crossover` method and `perturb` method.
-                if self._search_over:
-                    break
+            children = self._crossover_many(
+                [
+                    (population[parent1_idx[idx]], population[parent2_idx[idx]])
+                    for idx in range(pop_size - 1)
+                ],
+                initial_result.attacked_text,
+            )
+            if not self._search_over:
+                children = self._perturb_many(children, initial_result)
 
             population = [population[0]] + children
 
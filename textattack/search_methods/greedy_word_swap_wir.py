@@ -63,16 +63,13 @@ class GreedyWordSwapWIR(SearchMethod):
                 torch.Tensor(saliency_scores), dim=0
             ).numpy()
 
-            # compute the largest change in score we can find by swapping each word
-            delta_ps = []
+            # compute the largest change in score we can find by swapping each word.
+            # The swaps of each word are scored while the swaps of the next word are computed.
+            pending_swap_results = []
             for idx in indices_to_order:
 
-                # Exit Loop when search_over is True - but we need to make sure delta_ps
-                # is the same size as softmax_saliency_scores
+                # Exit Loop when search_over is True
                 if search_over:
-                    delta_ps = delta_ps + [0.0] * (
-                        len(softmax_saliency_scores) - len(delta_ps)
-                    )
                     break
 
                 transformed_text_candidates = self.get_transformations(
@@ -82,17 +79,24 @@ class GreedyWordSwapWIR(SearchMethod):
                 )
                 if not transformed_text_candidates:
                     # no valid synonym substitutions for this word
-                    delta_ps.append(0.0)
+                    pending_swap_results.append(None)
                     continue
-                swap_results, search_over = self.get_goal_results(
+                wait_for_swap_results, search_over = self.get_goal_results_async(
                     transformed_text_candidates
                 )
+                pending_swap_results.append(wait_for_swap_results)
+
+            delta_ps = []
+            for wait_for_swap_results in pending_swap_results:
+                swap_results = wait_for_swap_results() if wait_for_swap_results else []
                 score_change = [result.score for result in swap_results]
                 if not score_change:
                     delta_ps.append(0.0)
                     continue
                 max_score_change = np.max(score_change)
                 delta_ps.append(max_score_change)
+            # Make sure delta_ps is the same size as softmax_saliency_scores
+            delta_ps = delta_ps + [0.0] * (len(softmax_saliency_scores) - len(delta_ps))
 
             index_scores = softmax_saliency_scores * np.array(delta_ps)
 
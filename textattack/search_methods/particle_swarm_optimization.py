@@ -63,18 +63,34 @@ class ParticleSwarmOptimization(PopulationBasedSearch):
         Returns:
             `True` if perturbation occured. `False` if not.
         """
-        # TODO: Below is very slow and is the main cause behind memory build up + slowness
-        best_neighbors, prob_list = self._get_best_neighbors(
-            pop_member.result, original_result
-        )
-        random_result = np.random.choice(best_neighbors, 1, p=prob_list)[0]
+        return self._perturb_many([pop_member], original_result)[0]
 
-        if random_result == pop_member.result:
-            return False
-        else:
-            pop_member.attacked_text = random_result.attacked_text
-            pop_member.result = random_result
-            return True
+    def _perturb_many(self, pop_members, original_result):
+        """Perturb each of `pop_members` in-place like `_perturb`, querying
+        the model for the neighbors of all of them at once.
+
+        Args:
+            pop_members (list[PopulationMember]): The population members being perturbed.
+            original_result (GoalFunctionResult): Result of original sample being attacked
+        Returns:
+            List with `True` for each member that was perturbed and `False` for the others.
+        """
+        perturbed = []
+        for pop_member, (best_neighbors, prob_list) in zip(
+            pop_members,
+            self._get_best_neighbors_many(
+                [pop_member.result for pop_member in pop_members], original_result
+            ),
+        ):
+            random_result = np.random.choice(best_neighbors, 1, p=prob_list)[0]
+
+            if random_result == pop_member.result:
+                perturbed.append(False)
+            else:
+                pop_member.attacked_text = random_result.attacked_text
+                pop_member.result = random_result
+                perturbed.append(True)
+        return perturbed
 
     def _equal(self, a, b):
         return -self.v_max if a == b else self.v_max
@@ -155,41 +171,72 @@ class ParticleSwarmOptimization(PopulationBasedSearch):
             best_neighbors (list[GoalFunctionResult]): Best neighboring text for each word
             prob_list (list[float]): discrete probablity distribution for sampling a neighbor from `best_neighbors`
         """
-        current_text = current_result.attacked_text
-        neighbors_list = [[] for _ in range(len(current_text.words))]
-        transformed_texts = self.get_transformations(
-            current_text, original_text=original_result.attacked_text
-        )
-        for transformed_text in transformed_texts:
-            diff_idx = next(
-                iter(transformed_text.attack_attrs["newly_modified_indices"])
-            )
-            neighbors_list[diff_idx].append(transformed_text)
-
-        best_neighbors = []
-        score_list = []
-        for i in range(len(neighbors_list)):
-            if not neighbors_list[i]:
-                best_neighbors.append(current_result)
-                score_list.append(0)
-                continue
-
-            neighbor_results, self._search_over = self.get_goal_results(
-                neighbors_list[i]
-            )
-            if not len(neighbor_results):
-                best_neighbors.append(current_result)
-                score_list.append(0)
-            else:
-                neighbor_scores = np.array([r.score for r in neighbor_results])
-                score_diff = neighbor_scores - current_result.score
-                best_idx = np.argmax(neighbor_scores)
-                best_neighbors.append(neighbor_results[best_idx])
-                score_list.append(score_diff[best_idx])
+        return self._get_best_neighbors_many([current_result], original_result)[0]
 
-        prob_list = normalize(score_list)
+    def _get_best_neighbors_many(self, current_results, original_result):
+        """Finds the best neighbors of each of `current_results` like
+        `_get_best_neighbors`, scoring the neighbors of all of them with a
+        single call to ``get_goal_results``.
 
-        return best_neighbors, prob_list
+        Args:
+            current_results (list[GoalFunctionResult]): `GoalFunctionResult` of each current text
+            original_result (GoalFunctionResult): `GoalFunctionResult` of original text.
+        Returns:
+            List with the tuple `(best_neighbors, prob_list)` of each of `current_results`.
+        """
+        transformed_texts_per_result = self.get_transformations_batched(
+            [current_result.attacked_text for current_result in current_results],
+            original_text=original_result.attacked_text,
+            flatten=False,
+        )
+        # Neighbors of each word of each text, concatenated in order, and where the neighbors
+        # of each word start.
+        neighbors = []
+        neighbors_offsets = []
+        for current_result, transformed_texts in zip(
+            current_results, transformed_texts_per_result
+        ):
+            neighbors_list = [
+                [] for _ in range(len(current_result.attacked_text.words))
+            ]
+            for transformed_text in transformed_texts:
+                diff_idx = next(
+                    iter(transformed_text.attack_attrs["newly_modified_indices"])
+                )
+                neighbors_list[diff_idx].append(transformed_text)
+            offsets = []
+            for word_neighbors in neighbors_list:
+                offsets.append(len(neighbors))
+                neighbors.extend(word_neighbors)
+            offsets.append(len(neighbors))
+            neighbors_offsets.append(offsets)
+
+        if neighbors:
+            # The neighbors are ordered like the queries of `_get_best_neighbors` on each text
+            # in turn, so the query budget cuts them short at the same place.
+            neighbor_results, self._search_over = self.get_goal_results(neighbors)
+        else:
+            neighbor_results = []
+
+        best_neighbors_and_probs = []
+        for current_result, offsets in zip(current_results, neighbors_offsets):
+            best_neighbors = []
+            score_list = []
+            for start, end in zip(offsets[:-1], offsets[1:]):
+                word_results = neighbor_results[start:end]
+                if not len(word_results):
+                    best_neighbors.append(current_result)
+                    score_list.append(0)
+                else:
+                    neighbor_scores = np.array([r.score for r in word_results])
+                    score_diff = neighbor_scores - current_result.score
+                    best_idx = np.argmax(neighbor_scores)
+                    best_neighbors.append(word_results[best_idx])
+                    score_list.append(score_diff[best_idx])
+
+            best_neighbors_and_probs.append((best_neighbors, normalize(score_list)))
+
+        return best_neighbors_and_probs
 
     def _initialize_population(self, initial_result, pop_size):
         """
@@ -294,6 +341,7 @@ class ParticleSwarmOptimization(PopulationBasedSearch):
                 return top_member.result
 
             # Mutation based on the current change rate
+            to_perturb = []
             for k in range(len(population)):
                 change_ratio = initial_result.attacked_text.words_diff_ratio(
                     population[k].attacked_text
@@ -301,10 +349,9 @@ class ParticleSwarmOptimization(PopulationBasedSearch):
                 # Referred from the original source code
                 p_change = 1 - 2 * change_ratio
                 if np.random.uniform() < p_change:
-                    self._perturb(population[k], initial_result)
-
-                if self._search_over:
-                    break
+                    to_perturb.append(population[k])
+            if to_perturb:
+                self._perturb_many(to_perturb, initial_result)
 
             # Check if there is any successful attack in the current population
             top_member = max(population, key=lambda x: x.score)
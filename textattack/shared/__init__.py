@@ -13,6 +13,11 @@ from .utils import logger
 from . import validators
 
 from .attacked_text import AttackedText
+from .neighbour_index import NeighbourIndex, ExactNeighbourIndex, IVFNeighbourIndex
 from .word_embeddings import AbstractWordEmbedding, WordEmbedding, GensimWordEmbedding
-from .checkpoint import AttackCheckpoint
+from .checkpoint import AttackCheckpoint, AttackJournal
+from .persistent_model_cache import PersistentModelCache
+from .async_model_executor import AsyncModelExecutor
+from .coalescing_scheduler import CoalescingScheduler
+from .attack_profile import AttackProfile
 from .system_stats import get_system_info
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Async Model Executor
+========================
+
+The ``AsyncModelExecutor`` class runs victim model calls on a worker thread, so that the search method can prepare the
+next candidates (and the attacker the next example) while the model is busy.
+"""
+
+from concurrent.futures import Future
+import queue
+import threading
+
+
+class AsyncModelExecutor:
+    """Runs calls to a model on a single worker thread, fed by a bounded
+    queue of requests.
+
+    Each request is a list of inputs, and ``submit`` returns a
+    :class:`concurrent.futures.Future` of the list (or tensor) of outputs.
+    Requests are run in the order they are submitted. All calls to the
+    model go through the worker thread, so models and tokenizers that are
+    not thread-safe are never used concurrently.
+
+    Args:
+        call_fn (:obj:`callable`): Function that takes a list of inputs and returns their outputs.
+        max_pending (:obj:`int`, `optional`, defaults to :obj:`2`): Maximum number of requests waiting in the queue.
+            ``submit`` blocks while the queue is full.
+        deterministic (:obj:`bool`, `optional`, defaults to :obj:`True`): If :obj:`True`, each request is passed to
+            ``call_fn`` on its own, so outputs are identical to calling ``call_fn`` synchronously. Otherwise, all requests
+            waiting in the queue are merged into one call, which fills model batches better but can change outputs slightly
+            for models whose outputs depend on the other inputs of the batch (e.g. through padding).
+    """
+
+    def __init__(self, call_fn, max_pending=2, deterministic=True):
+        if max_pending < 1:
+            raise ValueError("`max_pending` must be at least 1.")
+        self.call_fn = call_fn
+        self.max_pending = max_pending
+        self.deterministic = deterministic
+        self._queue = None
+        self._thread = None
+
+    def _start(self):
+        self._queue = queue.Queue(maxsize=self.max_pending)
+        self._thread = threading.Thread(
+            target=self._work, name="AsyncModelExecutor", daemon=True
+        )
+        self._thread.start()
+
+    def _work(self):
+        stop = False
+        while not stop:
+            request = self._queue.get()
+            if request is None:
+                break
+            requests = [request]
+            if not self.deterministic:
+                while True:
+                    try:
+                        request = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if request is None:
+                        stop = True
+                        break
+                    requests.append(request)
+            self._run(requests)
+
+    def _run(self, requests):
+        requests = [
+            (future, inputs)
+            for future, inputs in requests
+            if future.set_running_or_notify_cancel()
+        ]
+        if not requests:
+            return
+        try:
+            outputs = self.call_fn([x for _, inputs in requests for x in inputs])
+        except BaseException as e:
+            for future, _ in requests:
+                future.set_exception(e)
+            return
+        i = 0
+        for future, inputs in requests:
+            future.set_result(outputs[i : i + len(inputs)])
+            i += len(inputs)
+
+    def submit(self, inputs):
+        """Queues a call to ``call_fn`` on ``inputs``.
+
+        Args:
+            inputs (:obj:`list`): Inputs of the model.
+        Returns:
+            :class:`concurrent.futures.Future` of the outputs of ``inputs``.
+        """
+        future = Future()
+        if self._thread is None:
+            self._start()
+        self._queue.put((future, list(inputs)))
+        return future
+
+    def __call__(self, inputs):
+        """Runs ``call_fn`` on ``inputs`` on the worker thread and waits for
+        its outputs."""
+        return self.submit(inputs).result()
+
+    def shutdown(self):
+        """Stops the worker thread once the requests already queued are
+        done."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._queue = None
+            self._thread = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_queue"] = None
+        state["_thread"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__ = state
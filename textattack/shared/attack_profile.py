@@ -0,0 +1,307 @@
+"""
+Attack Profile
+========================
+
+The ``AttackProfile`` class records where an attack spends its time, and how many candidates and cache hits each of its
+stages produces, for each attacked example and in total.
+"""
+
+from contextlib import contextmanager
+import copy
+import json
+from timeit import default_timer
+
+CACHE_NAMES = ("transformation", "constraint", "model", "persistent_model")
+
+
+def _add(totals, values):
+    """Adds the numbers of the nested dictionary ``values`` to ``totals``, in
+    place."""
+    for key, value in values.items():
+        if isinstance(value, dict):
+            _add(totals.setdefault(key, {}), value)
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+
+def _zeros(values):
+    """Returns a copy of the nested dictionary ``values`` with every number
+    set to zero."""
+    return {
+        key: _zeros(value) if isinstance(value, dict) else 0
+        for key, value in values.items()
+    }
+
+
+def _subtract(after, before):
+    """Returns the difference of two nested dictionaries of numbers."""
+    difference = {}
+    for key, value in after.items():
+        if isinstance(value, dict):
+            difference[key] = _subtract(value, before.get(key, {}))
+        else:
+            difference[key] = value - before.get(key, 0)
+    return difference
+
+
+class AttackProfile:
+    """Timings and counters of the stages of an :class:`~textattack.Attack`.
+
+    ``timers`` holds the seconds spent in the search method, goal function,
+    transformation and each constraint (by class name). Stages are nested:
+    the time of the search method includes the calls it makes to the other
+    stages. ``counters`` holds the number of examples and model queries,
+    the number of transformations generated, the number of candidates
+    checked by and passing each constraint, and the hits and misses of the
+    transformation, constraint and model caches.
+
+    ``total_time`` holds the seconds spent attacking the profiled examples.
+    When several examples are attacked at the same time (see
+    ``num_concurrent_examples`` of :class:`~textattack.AttackArgs`), the times
+    of an example include the time it waits for the model calls merged with
+    the other examples, and for those examples to run until they wait too, so
+    the totals can add up to more than the elapsed time.
+    If ``record_examples`` is set, each call to
+    :meth:`~textattack.Attack.attack` also appends a record of what the
+    example added to them to ``examples``.
+
+    Args:
+        constraint_names (:obj:`list[str]`, `optional`): Names of the constraints of the attack.
+        trace (:obj:`bool`, `optional`, defaults to :obj:`False`): If :obj:`True`, also record the start and duration
+            of every timed call, so that they can be exported with :meth:`export_chrome_trace`.
+        record_examples (:obj:`bool`, `optional`, defaults to :obj:`False`): If :obj:`True`, keep a record of each
+            example in ``examples``. Otherwise, only the totals are kept, so that memory does not grow with the number
+            of examples attacked.
+    """
+
+    def __init__(self, constraint_names=(), trace=False, record_examples=False):
+        self.timers = {
+            "constraints": {name: 0 for name in constraint_names},
+            "transformation": 0,
+            "search_method": 0,
+            "goal_function": 0,
+        }
+        self.counters = {
+            "examples": 0,
+            "queries": 0,
+            "transformations": 0,
+            "constraints": {
+                name: {"candidates": 0, "passed": 0} for name in constraint_names
+            },
+            "caches": {name: {"hits": 0, "misses": 0} for name in CACHE_NAMES},
+        }
+        self.total_time = 0.0
+        self.examples = []
+        self.trace = trace
+        self.record_examples = record_examples
+        self._events = []
+
+    @contextmanager
+    def timer(self, *stage):
+        """Adds the time spent in the ``with`` block to ``timers[stage[0]][stage[1]]...``.
+
+        Example::
+
+            >>> with profile.timer("constraints", "MaxWordsPerturbed"):
+            ...     ...
+        """
+        start = default_timer()
+        try:
+            yield
+        finally:
+            duration = default_timer() - start
+            timers = self.timers
+            for key in stage[:-1]:
+                timers = timers.setdefault(key, {})
+            timers[stage[-1]] = timers.get(stage[-1], 0) + duration
+            if self.trace:
+                self._events.append(("/".join(stage), start, duration))
+
+    def count(self, *key, n=1):
+        """Adds ``n`` to ``counters[key[0]][key[1]]...``."""
+        counters = self.counters
+        for k in key[:-1]:
+            counters = counters.setdefault(k, {})
+        counters[key[-1]] = counters.get(key[-1], 0) + n
+
+    def start_example(self, cache_stats=None):
+        """Starts the record of an example.
+
+        Args:
+            cache_stats (:obj:`dict`, `optional`): Running hit and miss counts of caches that are not counted through
+                :meth:`count` (e.g. those of the goal function), by cache name.
+        Returns:
+            State to pass to :meth:`end_example`.
+        """
+        self._events = []
+        if not self.record_examples:
+            return default_timer(), None, None, copy.deepcopy(cache_stats or {})
+        return (
+            default_timer(),
+            copy.deepcopy(self.timers),
+            copy.deepcopy(self.counters),
+            copy.deepcopy(cache_stats or {}),
+        )
+
+    def end_example(self, state, num_queries, cache_stats=None):
+        """Adds an example to the totals, and ends its record and appends it
+        to ``examples`` if ``record_examples`` is set.
+
+        Args:
+            state: What :meth:`start_example` returned.
+            num_queries (:obj:`int`): Number of model queries made for the example.
+            cache_stats (:obj:`dict`, `optional`): Same running counts as passed to :meth:`start_example`.
+        Returns:
+            The record of the example, or :obj:`None` if ``record_examples`` is
+            not set.
+        """
+        start, timers, counters, start_cache_stats = state
+        time = default_timer() - start
+        self.total_time += time
+        self.counters["examples"] += 1
+        self.counters["queries"] += num_queries
+        _add(
+            self.counters["caches"],
+            _subtract(cache_stats or {}, start_cache_stats),
+        )
+        if timers is None:
+            self._events = []
+            return None
+        record = {
+            "time": time,
+            "timers": _subtract(self.timers, timers),
+            "counters": _subtract(self.counters, counters),
+        }
+        if self.trace:
+            record["events"] = [("attack", start, record["time"])] + self._events
+        self._events = []
+        self.examples.append(record)
+        return record
+
+    def add_example(self, record):
+        """Adds the record of an example profiled elsewhere (e.g. in a worker
+        process) to the totals, and to ``examples`` if ``record_examples`` is
+        set."""
+        self.total_time += record["time"]
+        _add(self.timers, record["timers"])
+        _add(self.counters, record["counters"])
+        if self.record_examples:
+            self.examples.append(record)
+
+    def pop_totals(self):
+        """Returns the totals as a record of an example, to be passed to
+        :meth:`add_example` of another profile (e.g. that of the main process
+        for a worker process), and resets them to zero."""
+        record = {
+            "time": self.total_time,
+            "timers": self.timers,
+            "counters": self.counters,
+        }
+        self.total_time = 0.0
+        self.timers = _zeros(self.timers)
+        self.counters = _zeros(self.counters)
+        return record
+
+    def cache_hit_rate(self, name):
+        """Returns the fraction of lookups in cache ``name`` that were hits,
+        or :obj:`None` if it was never used."""
+        stats = self.counters["caches"].get(name, {})
+        lookups = stats.get("hits", 0) + stats.get("misses", 0)
+        if not lookups:
+            return None
+        return stats["hits"] / lookups
+
+    def summary_rows(self):
+        """Returns rows of aggregate statistics, to be logged by
+        :meth:`~textattack.loggers.AttackLogManager.log_summary`."""
+        num_examples = max(self.counters["examples"], 1)
+        rows = [
+            ["Total attack time (s):", round(self.total_time, 2)],
+            [
+                "Avg attack time per example (s):",
+                round(self.total_time / num_examples, 3),
+            ],
+            ["Search method time (s):", round(self.timers["search_method"], 2)],
+            ["Goal function time (s):", round(self.timers["goal_function"], 2)],
+            ["Transformation time (s):", round(self.timers["transformation"], 2)],
+        ]
+        for name, seconds in self.timers["constraints"].items():
+            rows.append([f"{name} time (s):", round(seconds, 2)])
+        rows.append(
+            [
+                "Avg num queries per example:",
+                round(self.counters["queries"] / num_examples, 2),
+            ]
+        )
+        rows.append(
+            [
+                "Avg num transformations per example:",
+                round(self.counters["transformations"] / num_examples, 2),
+            ]
+        )
+        for name, counts in self.counters["constraints"].items():
+            if counts["candidates"]:
+                filtered = counts["candidates"] - counts["passed"]
+                rows.append(
+                    [
+                        f"{name} candidates filtered:",
+                        str(round(100 * filtered / counts["candidates"], 2)) + "%",
+                    ]
+                )
+        for name in CACHE_NAMES:
+            hit_rate = self.cache_hit_rate(name)
+            if hit_rate is not None:
+                label = name.replace("_", " ").capitalize()
+                rows.append(
+                    [f"{label} cache hit rate:", str(round(100 * hit_rate, 2)) + "%"]
+                )
+        return rows
+
+    def example_records(self):
+        """Returns the records of ``examples`` without their trace events,
+        e.g. to be saved as JSON."""
+        return [
+            {key: value for key, value in example.items() if key != "events"}
+            for example in self.examples
+        ]
+
+    def export_chrome_trace(self, path):
+        """Saves the events of the profiled examples in the Chrome trace event
+        format, which can be opened with ``chrome://tracing`` or Perfetto.
+        Each example is shown on its own row.
+
+        Only examples profiled with ``trace=True`` have events.
+
+        Args:
+            path (:obj:`str`): Path of the JSON file to write.
+        """
+        starts = [
+            start
+            for example in self.examples
+            for _, start, _ in example.get("events", [])
+        ]
+        origin = min(starts, default=0)
+        trace_events = []
+        for i, example in enumerate(self.examples):
+            for name, start, duration in example.get("events", []):
+                trace_events.append(
+                    {
+                        "name": name,
+                        "cat": name.split("/")[0],
+                        "ph": "X",
+                        "ts": (start - origin) * 1e6,
+                        "dur": duration * 1e6,
+                        "pid": 0,
+                        "tid": i,
+                    }
+                )
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_events"] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__ = state
@@ -16,7 +16,7 @@ import torch
 
 import textattack
 
-from .utils import device, words_from_text
+from .utils import detect_language, device, words_from_text
 
 flair.device = device
 
@@ -53,7 +53,9 @@ class AttackedText:
                 f"Invalid text_input type {type(text_input)} (required str or OrderedDict)"
             )
         # Process input lazily.
+        self._language = None
         self._words = None
+        self._word_offsets = None
         self._words_per_input = None
         self._pos_tags = None
         self._ner_tags = None
@@ -67,7 +69,8 @@ class AttackedText:
             raise TypeError(f"Invalid type for attack_attrs: {type(attack_attrs)}")
         # Indices of words from the *original* text. Allows us to map
         # indices between original text and this text, and vice-versa.
-        self.attack_attrs.setdefault("original_index_map", np.arange(self.num_words))
+        if "original_index_map" not in self.attack_attrs:
+            self.attack_attrs["original_index_map"] = np.arange(self.num_words)
         # A list of all indices in *this* text that have been modified.
         self.attack_attrs.setdefault("modified_indices", set())
 
@@ -342,8 +345,84 @@ class AttackedText:
             if (i < 0) or (i > len(words)):
                 raise ValueError(f"Cannot assign word at index {i}")
             words[i] = new_word
+        if self._is_single_word_swap(indices, new_words):
+            return self._generate_new_attacked_text_with_swaps(words, indices)
         return self.generate_new_attacked_text(words)
 
+    def _is_single_word_swap(self, indices, new_words):
+        """Returns whether replacing the words at ``indices`` with
+        ``new_words`` swaps single words for single words, so the words of
+        the new text are known without re-tokenizing it."""
+        if self.language in ("Chinese", "ChineseT"):
+            # Segmentation of Chinese text depends on the surrounding words.
+            return False
+        for new_word in new_words:
+            if words_from_text(new_word, language=self.language) != [new_word]:
+                return False
+        return True
+
+    def _get_word_offsets(self):
+        """Returns the character offset of each word in the input texts
+        joined by ``SPLIT_TOKEN``.
+
+        Words are located the same way as in
+        ``generate_new_attacked_text``.
+        """
+        if self._word_offsets is None:
+            joined_text = AttackedText.SPLIT_TOKEN.join(self._text_input.values())
+            offsets = []
+            look_after_index = 0
+            for word in self.words:
+                word_start = joined_text.index(word, look_after_index)
+                offsets.append(word_start)
+                look_after_index = word_start + len(word)
+            self._word_offsets = offsets
+        return self._word_offsets
+
+    def _generate_new_attacked_text_with_swaps(self, new_words, indices):
+        """Fast path of ``generate_new_attacked_text`` for when only the words
+        at ``indices`` changed and each of them is still a single word.
+
+        Only the changed spans of the text are spliced, and the new
+        words are passed on to the new ``AttackedText`` instead of being
+        re-tokenized. Since no words are inserted or deleted,
+        ``original_index_map`` is shared with this text.
+        """
+        joined_text = AttackedText.SPLIT_TOKEN.join(self._text_input.values())
+        offsets = self._get_word_offsets()
+        newly_modified_indices = set()
+        text_pieces = []
+        last_end = 0
+        for i in sorted(set(indices)):
+            if new_words[i] == self.words[i]:
+                continue
+            newly_modified_indices.add(i)
+            text_pieces.append(joined_text[last_end : offsets[i]])
+            text_pieces.append(new_words[i])
+            last_end = offsets[i] + len(self.words[i])
+        text_pieces.append(joined_text[last_end:])
+        perturbed_text = "".join(text_pieces)
+
+        new_attack_attrs = dict()
+        if "label_names" in self.attack_attrs:
+            new_attack_attrs["label_names"] = self.attack_attrs["label_names"]
+        new_attack_attrs["newly_modified_indices"] = newly_modified_indices
+        new_attack_attrs["previous_attacked_text"] = self
+        new_attack_attrs["modified_indices"] = (
+            self.attack_attrs["modified_indices"] | newly_modified_indices
+        )
+        new_attack_attrs["original_index_map"] = self.attack_attrs["original_index_map"]
+        new_attack_attrs["prev_attacked_text"] = self
+
+        perturbed_input_texts = perturbed_text.split(AttackedText.SPLIT_TOKEN)
+        perturbed_input = OrderedDict(
+            zip(self._text_input.keys(), perturbed_input_texts)
+        )
+        new_attacked_text = AttackedText(perturbed_input, attack_attrs=new_attack_attrs)
+        new_attacked_text._language = self.language
+        new_attacked_text._words = new_words
+        return new_attacked_text
+
     def replace_word_at_index(self, index, new_word):
         """This code returns a new AttackedText object where the word at
         ``index`` is replaced with a new word."""
@@ -418,9 +497,11 @@ class AttackedText:
             word_end = word_start + len(input_word)
             perturbed_text += original_text[:word_start]
             original_text = original_text[word_end:]
-            adv_words = words_from_text(adv_word_seq)
+            adv_words = words_from_text(adv_word_seq, language=self.language)
             adv_num_words = len(adv_words)
-            num_words_diff = adv_num_words - len(words_from_text(input_word))
+            num_words_diff = adv_num_words - len(
+                words_from_text(input_word, language=self.language)
+            )
             # Track indices on insertions and deletions.
             if num_words_diff != 0:
                 # Re-calculated modified indices. If words are inserted or deleted,
@@ -478,7 +559,10 @@ class AttackedText:
         perturbed_input = OrderedDict(
             zip(self._text_input.keys(), perturbed_input_texts)
         )
-        return AttackedText(perturbed_input, attack_attrs=new_attack_attrs)
+        new_attacked_text = AttackedText(perturbed_input, attack_attrs=new_attack_attrs)
+        # Perturbed texts keep the language of their parent, so they never need to re-detect it.
+        new_attacked_text._language = self.language
+        return new_attacked_text
 
     def words_diff_ratio(self, x):
         """Get the ratio of words difference between current text and `x`.
@@ -547,14 +631,26 @@ class AttackedText:
         """Returns a list of lists of words corresponding to each input."""
         if not self._words_per_input:
             self._words_per_input = [
-                words_from_text(_input) for _input in self._text_input.values()
+                words_from_text(_input, language=self.language)
+                for _input in self._text_input.values()
             ]
         return self._words_per_input
 
+    @property
+    def language(self):
+        """The language of the text as detected by CLD2.
+
+        Texts perturbed from another ``AttackedText`` inherit the
+        language of the text they were perturbed from.
+        """
+        if self._language is None:
+            self._language = detect_language(self.text)
+        return self._language
+
     @property
     def words(self):
         if not self._words:
-            self._words = words_from_text(self.text)
+            self._words = words_from_text(self.text, language=self.language)
         return self._words
 
     @property
@@ -3,7 +3,10 @@ Misc Checkpoints
 ===================
 
 The ``AttackCheckpoint`` class saves in-progress attacks and loads saved attacks from disk.
+The ``AttackJournal`` class keeps the results of an attack in an append-only file next to its checkpoints, so that
+checkpoints only store what changed since the previous one.
 """
+import collections
 import copy
 import datetime
 import os
@@ -17,11 +20,121 @@ from textattack.attack_results import (
     SkippedAttackResult,
     SuccessfulAttackResult,
 )
-from textattack.shared import logger, utils
+from textattack.shared import AttackedText, logger, utils
 
 # TODO: Consider still keeping the old `Checkpoint` class and allow older checkpoints to be loaded to new TextAttack
 
 
+def _compact_attacked_text(attacked_text):
+    """Returns a copy of ``attacked_text`` without the texts it was
+    perturbed from, which are only needed during the attack."""
+    attack_attrs = {
+        key: value
+        for key, value in attacked_text.attack_attrs.items()
+        if not isinstance(value, AttackedText)
+    }
+    return AttackedText(attacked_text._text_input, attack_attrs)
+
+
+def _compact_result(result, memo):
+    """Returns a copy of the ``AttackResult`` ``result`` that is cheap to
+    pickle.
+
+    ``memo`` maps the ``id`` of each goal function result already compacted
+    to its copy, so that results of the same example still share their
+    original result, which is how they are grouped by example.
+    """
+    result = copy.copy(result)
+    for name in ("original_result", "perturbed_result"):
+        goal_function_result = getattr(result, name)
+        if id(goal_function_result) not in memo:
+            compact_goal_function_result = copy.copy(goal_function_result)
+            compact_goal_function_result.attacked_text = _compact_attacked_text(
+                goal_function_result.attacked_text
+            )
+            memo[id(goal_function_result)] = compact_goal_function_result
+        setattr(result, name, memo[id(goal_function_result)])
+    return result
+
+
+class AttackJournal:
+    """An append-only file of the results of an attack.
+
+    Each record holds the results of one attacked example. Records are
+    buffered in memory and appended to the file on ``flush()``, which
+    checkpoints do before they are saved. A checkpoint then only stores the
+    size of the journal, so saving one takes the same time no matter how
+    many examples were attacked before it.
+
+    Args:
+        path (:obj:`str`): Path of the journal file. It is created on the first ``flush()``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # Size of the part of the file written so far. Flushes resume from here, which
+        # also drops records written after a checkpoint when the attack is resumed from it.
+        self.offset = 0
+        self.num_records = 0
+        self.result_type_counts = collections.Counter()
+        self._pending = []
+
+    @classmethod
+    def create(cls, checkpoint_dir):
+        """Returns an empty journal with a new file name in
+        ``checkpoint_dir``."""
+        file_name = "{}.ta.journal".format(int(time.time() * 1000))
+        return cls(os.path.join(checkpoint_dir, file_name))
+
+    def append(self, results):
+        """Adds a record of the results of one attacked example.
+
+        Args:
+            results (:obj:`list[AttackResult]`): Results of the example, as logged by the attacker.
+        """
+        memo = {}
+        self._pending.append(
+            pickle.dumps(
+                [_compact_result(result, memo) for result in results],
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        )
+        self.num_records += 1
+        self.result_type_counts[type(results[0]).__name__] += 1
+
+    def flush(self):
+        """Appends the pending records to the file."""
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        if self.offset and os.path.exists(self.path):
+            f = open(self.path, "r+b")
+        else:
+            self.offset = 0
+            f = open(self.path, "wb")
+        with f:
+            f.seek(self.offset)
+            f.truncate()
+            for record in self._pending:
+                f.write(record)
+            self.offset = f.tell()
+        self._pending = []
+
+    def read(self):
+        """Yields the results of the records flushed so far, in order."""
+        with open(self.path, "rb") as f:
+            while f.tell() < self.offset:
+                yield from pickle.load(f)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pending"] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__ = state
+
+
 class AttackCheckpoint:
     """An object that stores necessary information for saving and loading
     checkpoints.
@@ -32,6 +145,8 @@ class AttackCheckpoint:
         worklist (deque[int]): List of examples that will be attacked. Examples are represented by their indicies within the dataset.
         worklist_candidates (int): List of other available examples we can attack. Used to get the next dataset element when `attack_n=True`.
         chkpt_time (float): epoch time representing when checkpoint was made
+        journal (textattack.shared.AttackJournal): If set, the results of `attack_log_manager` are saved in this journal
+            instead of in the checkpoint file, and it must already hold a record of every attacked example.
     """
 
     def __init__(
@@ -41,6 +156,7 @@ class AttackCheckpoint:
         worklist,
         worklist_candidates,
         chkpt_time=None,
+        journal=None,
     ):
         assert isinstance(
             attack_args, textattack.AttackArgs
@@ -53,6 +169,7 @@ class AttackCheckpoint:
         self.attack_log_manager = attack_log_manager
         self.worklist = worklist
         self.worklist_candidates = worklist_candidates
+        self.journal = journal
         if chkpt_time:
             self.time = chkpt_time
         else:
@@ -138,6 +255,23 @@ class AttackCheckpoint:
                 f"(Number of skipped attacks): {self.num_skipped_attacks}", 2
             )
         )
+        live_metrics = self.attack_log_manager.live_metrics()
+        breakdown_lines.append(
+            utils.add_indent(
+                f"(Attack success rate): {live_metrics['attack_success_rate']}%", 2
+            )
+        )
+        breakdown_lines.append(
+            utils.add_indent(
+                f"(Average perturbed word %): {live_metrics['avg_word_perturbed_perc']}%",
+                2,
+            )
+        )
+        breakdown_lines.append(
+            utils.add_indent(
+                f"(Average num. queries): {live_metrics['avg_num_queries']}", 2
+            )
+        )
         breakdown_str = utils.add_indent("\n" + "\n".join(breakdown_lines), 2)
         attack_logger_lines.append(
             utils.add_indent(f"(Latest result breakdown): {breakdown_str}", 2)
@@ -153,35 +287,35 @@ class AttackCheckpoint:
 
     __str__ = __repr__
 
+    def _count_results(self, result_type):
+        if self.journal is not None:
+            return self.journal.result_type_counts[result_type.__name__]
+        return sum(
+            isinstance(r[0], result_type) for r in self.attack_log_manager.batched_results
+        )
+
     @property
     def results_count(self):
         """Return number of attacks made so far."""
+        if self.journal is not None:
+            return self.journal.num_records
         return len(self.attack_log_manager.batched_results)
 
     @property
     def num_skipped_attacks(self):
-        return sum(
-            isinstance(r[0], SkippedAttackResult) for r in self.attack_log_manager.batched_results)
+        return self._count_results(SkippedAttackResult)
 
     @property
     def num_failed_attacks(self):
-        return sum(
-            isinstance(r[0], FailedAttackResult) for r in self.attack_log_manager.batched_results
-        )
+        return self._count_results(FailedAttackResult)
 
     @property
     def num_successful_attacks(self):
-        return sum(
-            isinstance(r[0], SuccessfulAttackResult)
-            for r in self.attack_log_manager.batched_results
-        )
+        return self._count_results(SuccessfulAttackResult)
 
     @property
     def num_maximized_attacks(self):
-        return sum(
-            isinstance(r[0], MaximizedAttackResult)
-            for r in self.attack_log_manager.batched_results
-        )
+        return self._count_results(MaximizedAttackResult)
 
     @property
     def num_remaining_attacks(self):
@@ -215,6 +349,8 @@ class AttackCheckpoint:
                 )
             )
             print("=" * 125 + "\n")
+        if self.journal is not None:
+            self.journal.flush()
         with open(path, "wb") as f:
             pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
 
@@ -224,6 +360,21 @@ class AttackCheckpoint:
             checkpoint = pickle.load(f)
         assert isinstance(checkpoint, cls)
 
+        journal = getattr(checkpoint, "journal", None)
+        if journal is None:
+            # Checkpoint saved without a journal.
+            checkpoint.journal = None
+        else:
+            if not os.path.exists(journal.path):
+                # The checkpoint directory may have been moved since.
+                journal.path = os.path.join(
+                    os.path.dirname(path), os.path.basename(journal.path)
+                )
+            attack_log_manager = checkpoint.attack_log_manager
+            attack_log_manager.reset_results()
+            for result in journal.read():
+                attack_log_manager.retain_result(result)
+
         return checkpoint
 
     def _verify(self):
@@ -232,9 +383,24 @@ class AttackCheckpoint:
             self.worklist
         ), "Recorded number of remaining attacks and size of worklist are different."
 
+        if self.journal is not None:
+            # Results are not kept in the checkpoint.
+            return
         results_set = {
             result.original_text for result in self.attack_log_manager.results
         }
         assert (
             len(results_set) == len(self.attack_log_manager.results)
         ), "Duplicate `AttackResults` found."
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.journal is not None:
+            # Results are saved in the journal instead.
+            attack_log_manager = copy.copy(self.attack_log_manager)
+            attack_log_manager.results = []
+            state["attack_log_manager"] = attack_log_manager
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__ = state
@@ -0,0 +1,176 @@
+"""
+Coalescing Scheduler
+========================
+
+The ``CoalescingScheduler`` class runs the searches of several examples together and merges their victim model calls, so
+that the model gets full batches even when each search step only queries a few texts.
+"""
+
+import threading
+
+
+class _ModelRequest:
+    """A model call submitted to a :class:`CoalescingScheduler`."""
+
+    def __init__(self, scheduler, inputs):
+        self.scheduler = scheduler
+        self.inputs = list(inputs)
+        self.outputs = None
+        self.exception = None
+        self.done = False
+
+    def result(self):
+        """Waits for the merged model call to run, and returns the outputs
+        of this request."""
+        return self.scheduler._wait_for(self)
+
+
+class _Task:
+    """A function run by a :class:`CoalescingScheduler` on its own
+    thread."""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.resume = threading.Event()
+        self.waiting_for = None
+        self.finished = False
+        self.result = None
+        self.exception = None
+
+
+class CoalescingScheduler:
+    """Runs several tasks cooperatively and merges the model calls they
+    submit.
+
+    Each task runs on its own thread, but only one runs at a time, like a
+    coroutine: a task runs until it waits for the outputs of a model call
+    or finishes. Once every task is waiting, the inputs of all their
+    pending calls are passed to ``call_fn`` at once and the tasks resume,
+    in the order they were started. Since tasks only switch when they wait
+    for the model, runs are reproducible, and tasks do not need to be
+    thread-safe.
+
+    Tasks submit model calls through the scheduler, which has the same
+    interface as :class:`~textattack.shared.AsyncModelExecutor`, e.g. by
+    setting it as the ``model_executor`` of their goal function.
+
+    Args:
+        call_fn (:obj:`callable`): Function that takes a list of inputs and returns their outputs.
+    """
+
+    def __init__(self, call_fn):
+        self.call_fn = call_fn
+        self._tasks = []
+        self._pending = []
+        self._task_yielded = threading.Event()
+        self._local = threading.local()
+        self.num_model_calls = 0
+        self.num_requests = 0
+
+    def submit(self, inputs):
+        """Queues a model call on ``inputs``, to be merged with the calls of
+        the other tasks.
+
+        Returns:
+            Request whose ``result()`` method waits for the outputs of ``inputs``.
+        """
+        request = _ModelRequest(self, inputs)
+        self._pending.append(request)
+        return request
+
+    def __call__(self, inputs):
+        """Waits for the outputs of ``inputs``."""
+        return self.submit(inputs).result()
+
+    def _wait_for(self, request):
+        if not request.done:
+            task = getattr(self._local, "task", None)
+            if task is None:
+                # Called outside of a task, so nothing can be merged with it.
+                self._run_pending()
+            else:
+                task.waiting_for = request
+                self._yield(task)
+        if request.exception is not None:
+            raise request.exception
+        return request.outputs
+
+    def _yield(self, task):
+        """Gives control back to the scheduler until ``task`` is resumed."""
+        task.resume.clear()
+        self._task_yielded.set()
+        task.resume.wait()
+
+    def _run_task(self, task):
+        self._local.task = task
+        task.resume.wait()
+        try:
+            task.result = task.fn()
+        except BaseException as e:
+            task.exception = e
+        task.finished = True
+        self._task_yielded.set()
+
+    def start(self, fn):
+        """Starts running ``fn`` as a task. It first runs during the next
+        ``step``.
+
+        Returns:
+            A handle to pass to ``wait``.
+        """
+        task = _Task(fn)
+        thread = threading.Thread(
+            target=self._run_task, args=(task,), name="CoalescingScheduler", daemon=True
+        )
+        thread.start()
+        self._tasks.append(task)
+        return task
+
+    def _run_pending(self):
+        requests, self._pending = self._pending, []
+        if not requests:
+            return
+        self.num_model_calls += 1
+        self.num_requests += len(requests)
+        try:
+            outputs = self.call_fn([x for request in requests for x in request.inputs])
+        except BaseException as e:
+            for request in requests:
+                request.exception = e
+                request.done = True
+            return
+        i = 0
+        for request in requests:
+            request.outputs = outputs[i : i + len(request.inputs)]
+            request.done = True
+            i += len(request.inputs)
+
+    def step(self):
+        """Runs each task that is not waiting for the model until it waits
+        or finishes, then runs the model once on the pending calls of all
+        tasks."""
+        for task in self._tasks:
+            if task.waiting_for is not None and not task.waiting_for.done:
+                continue
+            task.waiting_for = None
+            self._task_yielded.clear()
+            task.resume.set()
+            self._task_yielded.wait()
+        self._tasks = [task for task in self._tasks if not task.finished]
+        self._run_pending()
+
+    def done(self, task):
+        """Returns :obj:`True` if ``task`` has finished."""
+        return task.finished
+
+    def wait(self, task):
+        """Runs the scheduler until ``task`` finishes.
+
+        Returns:
+            What the function of ``task`` returned.
+        """
+        while not task.finished:
+            self.step()
+        if task.exception is not None:
+            raise task.exception
+        return task.result
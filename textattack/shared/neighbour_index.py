@@ -0,0 +1,217 @@
+"""
+Nearest Neighbour Indices
+============================
+
+Indices for finding the nearest neighbours (by euclidean distance) of the words of a word embedding.
+They are used by :class:`~textattack.shared.WordEmbedding` when it has no precomputed nearest neighbour matrix,
+and can build such a matrix for any embedding.
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+import torch
+
+from textattack.shared import utils
+
+
+class NeighbourIndex(utils.ReprMixin, ABC):
+    """Abstract class for indices over the rows of an embedding matrix that
+    find the nearest neighbours of many rows at once.
+
+    Args:
+        embedding_matrix (ndarray): 2-D array of shape N x D where N represents size of vocab and D is the dimension of embedding vectors.
+    """
+
+    def __init__(self, embedding_matrix):
+        self.embedding_matrix = embedding_matrix
+
+    @abstractmethod
+    def _search(self, query_vectors, k):
+        """Returns a 2-D integer array with the ids of the ``k`` nearest rows
+        of each of ``query_vectors``, closest first."""
+        raise NotImplementedError()
+
+    def query(self, indices, topn):
+        """
+        Get top-N nearest neighbours for each of a list of words
+        Args:
+            indices (list[int]): IDs of the words for which we're finding the nearest neighbours
+            topn (int): Used for specifying N nearest neighbours
+        Returns:
+            neighbours (ndarray): 2-D array of shape len(indices) x N with the indices of the nearest neighbours of each word,
+                excluding the word itself
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if not len(indices):
+            return np.zeros((0, topn), dtype=np.int64)
+        query_vectors = np.asarray(self.embedding_matrix[indices], dtype=np.float32)
+        # Since closest neighbour will usually be the same word, we consider N+1 nearest neighbours
+        nn = self._search(query_vectors, min(topn + 1, len(self.embedding_matrix)))
+        neighbours = []
+        for index, row in zip(indices, nn):
+            row = row[row != index]
+            neighbours.append(row[:topn])
+        return np.array(neighbours, dtype=np.int64)
+
+    def build_nn_matrix(self, topn=100, batch_size=1024):
+        """Builds a matrix of precomputed nearest neighbours for all words,
+        in the format of ``nn.npy`` used by
+        :meth:`WordEmbedding.counterfitted_GLOVE_embedding`.
+
+        Args:
+            topn (int): Number of neighbours to keep for each word.
+            batch_size (int): Number of words to query at once.
+        Returns:
+            nn_matrix (ndarray): 2-D ``int32`` array of shape N x (topn + 1) where the first column is the word itself.
+        """
+        num_words = len(self.embedding_matrix)
+        nn_matrix = np.zeros((num_words, topn + 1), dtype=np.int32)
+        for i in range(0, num_words, batch_size):
+            indices = np.arange(i, min(i + batch_size, num_words))
+            nn_matrix[indices, 0] = indices
+            nn_matrix[indices, 1:] = self.query(indices, topn)
+        return nn_matrix
+
+
+class ExactNeighbourIndex(NeighbourIndex):
+    """Finds nearest neighbours by brute force.
+
+    The embedding matrix is copied to ``utils.device`` once, then each
+    batch of queries is answered with one matrix multiplication.
+
+    Args:
+        embedding_matrix (ndarray): 2-D array of shape N x D where N represents size of vocab and D is the dimension of embedding vectors.
+        batch_size (int): Maximum number of queries to compute distances for at once.
+    """
+
+    def __init__(self, embedding_matrix, batch_size=256):
+        super().__init__(embedding_matrix)
+        self.batch_size = batch_size
+        self._vectors = None
+        self._squared_norms = None
+
+    def _search(self, query_vectors, k):
+        if self._vectors is None:
+            self._vectors = torch.tensor(
+                np.asarray(self.embedding_matrix), dtype=torch.float32
+            ).to(utils.device)
+            self._squared_norms = (self._vectors**2).sum(dim=1)
+
+        nn = []
+        for i in range(0, len(query_vectors), self.batch_size):
+            queries = torch.tensor(query_vectors[i : i + self.batch_size]).to(
+                utils.device
+            )
+            # Squared euclidean distance, without the squared norm of the queries, which doesn't change the ranking
+            dist = self._squared_norms - 2 * queries @ self._vectors.T
+            nn.append(dist.topk(k, dim=1, largest=False).indices.cpu().numpy())
+        return np.concatenate(nn)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_vectors"] = None
+        state["_squared_norms"] = None
+        return state
+
+    def extra_repr_keys(self):
+        return ["batch_size"]
+
+
+class IVFNeighbourIndex(NeighbourIndex):
+    """Finds approximate nearest neighbours with an inverted file index.
+
+    The rows of the embedding matrix are clustered with k-means. A query
+    only computes distances to the rows of the ``num_probes`` clusters
+    whose centroids are closest to it. Only uses NumPy.
+
+    Args:
+        embedding_matrix (ndarray): 2-D array of shape N x D where N represents size of vocab and D is the dimension of embedding vectors.
+        num_lists (int): Number of clusters. Defaults to the square root of N.
+        num_probes (int): Number of clusters to search for each query. Higher is more accurate but slower.
+        num_iterations (int): Number of k-means iterations when building the index.
+        seed (int): Seed used to initialize the clusters.
+    """
+
+    def __init__(
+        self,
+        embedding_matrix,
+        num_lists=None,
+        num_probes=8,
+        num_iterations=10,
+        seed=0,
+    ):
+        super().__init__(embedding_matrix)
+        if num_lists is None:
+            num_lists = max(1, int(np.sqrt(len(embedding_matrix))))
+        self.num_lists = min(num_lists, len(embedding_matrix))
+        self.num_probes = min(num_probes, self.num_lists)
+        self.num_iterations = num_iterations
+        self.seed = seed
+        self._centroids = None
+        self._list_offsets = None
+        self._list_ids = None
+
+    @staticmethod
+    def _squared_distances(vectors, centroids):
+        return (
+            (vectors**2).sum(axis=1)[:, None]
+            - 2 * vectors @ centroids.T
+            + (centroids**2).sum(axis=1)[None, :]
+        )
+
+    def _assign(self, vectors, centroids, batch_size=4096):
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for i in range(0, len(vectors), batch_size):
+            assignments[i : i + batch_size] = self._squared_distances(
+                vectors[i : i + batch_size], centroids
+            ).argmin(axis=1)
+        return assignments
+
+    def _build(self):
+        vectors = np.asarray(self.embedding_matrix, dtype=np.float32)
+        rng = np.random.default_rng(self.seed)
+        centroids = vectors[rng.choice(len(vectors), self.num_lists, replace=False)]
+        for _ in range(self.num_iterations):
+            assignments = self._assign(vectors, centroids)
+            counts = np.bincount(assignments, minlength=self.num_lists)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            empty = counts == 0
+            centroids = sums / np.maximum(counts, 1)[:, None]
+            # Move empty clusters to random rows.
+            centroids[empty] = vectors[rng.choice(len(vectors), empty.sum())]
+        assignments = self._assign(vectors, centroids)
+        self._centroids = centroids
+        self._list_ids = np.argsort(assignments, kind="stable")
+        self._list_offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(assignments, minlength=self.num_lists))]
+        )
+
+    def _search(self, query_vectors, k):
+        if self._centroids is None:
+            self._build()
+        probes = np.argsort(
+            self._squared_distances(query_vectors, self._centroids), axis=1
+        )[:, : self.num_probes]
+        nn = np.zeros((len(query_vectors), k), dtype=np.int64)
+        for q, query_vector in enumerate(query_vectors):
+            candidates = np.concatenate(
+                [
+                    self._list_ids[self._list_offsets[p] : self._list_offsets[p + 1]]
+                    for p in probes[q]
+                ]
+            )
+            if len(candidates) < k:
+                # Too few rows in the probed clusters, so fall back to searching all of them.
+                candidates = np.arange(len(self.embedding_matrix))
+            candidate_vectors = np.asarray(
+                self.embedding_matrix[candidates], dtype=np.float32
+            )
+            dist = ((candidate_vectors - query_vector) ** 2).sum(axis=1)
+            top = np.argpartition(dist, k - 1)[:k]
+            nn[q] = candidates[top[np.argsort(dist[top], kind="stable")]]
+        return nn
+
+    def extra_repr_keys(self):
+        return ["num_lists", "num_probes"]
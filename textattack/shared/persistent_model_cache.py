@@ -0,0 +1,159 @@
+"""
+Persistent Model Cache
+========================
+
+The ``PersistentModelCache`` class stores victim model outputs in an SQLite database on disk, so they can be reused across runs,
+resumed attacks, different recipes and parallel worker processes.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+
+import torch
+
+
+def model_fingerprint(model_wrapper):
+    """Returns a string that identifies the model behind ``model_wrapper``.
+
+    For PyTorch models, all parameters and buffers are hashed, so two
+    wrappers around models with identical weights share cached outputs.
+    Other models are hashed by pickling them.
+
+    Args:
+        model_wrapper (:class:`~textattack.models.wrappers.ModelWrapper`): Model wrapper of the victim model.
+    Returns:
+        Hex digest identifying the model.
+    """
+    sha = hashlib.sha1()
+    sha.update(type(model_wrapper).__name__.encode())
+    tokenizer = getattr(model_wrapper, "tokenizer", None)
+    if tokenizer is not None:
+        sha.update(type(tokenizer).__name__.encode())
+        sha.update(str(getattr(tokenizer, "name_or_path", "")).encode())
+        sha.update(str(getattr(tokenizer, "model_max_length", "")).encode())
+
+    model = model_wrapper.model
+    sha.update(type(model).__name__.encode())
+    if isinstance(model, torch.nn.Module):
+        for name, tensor in model.state_dict().items():
+            tensor = tensor.detach().cpu().contiguous()
+            sha.update(name.encode())
+            sha.update(f"{tensor.dtype}{tuple(tensor.shape)}".encode())
+            sha.update(tensor.view(-1).view(torch.uint8).numpy().tobytes())
+    else:
+        try:
+            sha.update(pickle.dumps(model))
+        except Exception:
+            raise ValueError(
+                f"Cannot compute a fingerprint for model of type {type(model)}. Please provide one explicitly."
+            )
+    return sha.hexdigest()
+
+
+class PersistentModelCache:
+    """An on-disk cache of model outputs, keyed by a model fingerprint and the
+    text input.
+
+    The cache is an SQLite database in write-ahead-logging mode, so many
+    processes can read it concurrently while one of them writes. Each
+    process opens its own connection lazily, which also makes the cache
+    safe to pickle into worker processes.
+
+    Args:
+        path (:obj:`str`): Path of the SQLite database file. It is created if it does not exist.
+        fingerprint (:obj:`str`): String identifying the model (and how its outputs are processed). Outputs are only shared between
+            caches with the same fingerprint.
+    """
+
+    # Maximum number of keys in a single SQL query (SQLite's default limit on host parameters is 999).
+    _QUERY_CHUNK_SIZE = 500
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, timeout=60, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS model_outputs (key TEXT PRIMARY KEY, output BLOB NOT NULL)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _key(self, attacked_text):
+        text_input = json.dumps(
+            [attacked_text.column_labels, attacked_text.tokenizer_input]
+        )
+        return f"{self.fingerprint}:{text_input}"
+
+    def get_many(self, attacked_texts):
+        """Returns the cached output of each of ``attacked_texts``, or
+        :obj:`None` for texts that are not in the cache."""
+        keys = [self._key(attacked_text) for attacked_text in attacked_texts]
+        found = {}
+        for i in range(0, len(keys), self._QUERY_CHUNK_SIZE):
+            chunk = keys[i : i + self._QUERY_CHUNK_SIZE]
+            query = "SELECT key, output FROM model_outputs WHERE key IN ({})".format(
+                ",".join("?" * len(chunk))
+            )
+            for key, output in self.connection.execute(query, chunk):
+                found[key] = pickle.loads(output)
+        outputs = [found.get(key) for key in keys]
+        num_hits = sum(output is not None for output in outputs)
+        self.hits += num_hits
+        self.misses += len(outputs) - num_hits
+        return outputs
+
+    def put_many(self, attacked_texts, outputs):
+        """Stores ``outputs`` as the outputs of ``attacked_texts``."""
+        rows = []
+        for attacked_text, output in zip(attacked_texts, outputs):
+            if isinstance(output, torch.Tensor):
+                # Copy views so that we do not serialize the whole batch they point into.
+                output = output.detach().cpu().clone()
+            rows.append(
+                (
+                    self._key(attacked_text),
+                    pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL),
+                )
+            )
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO model_outputs (key, output) VALUES (?, ?)", rows
+            )
+
+    def stats(self):
+        """Returns the number of cache hits and misses so far."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__ = state
@@ -1,3 +1,4 @@
+import functools
 import re
 import string
 
@@ -29,33 +30,58 @@ def add_indent(s_, numSpaces):
     return s
 
 
-def words_from_text(s, words_to_ignore=[]):
-    """Lowercases a string, removes all non-alphanumeric characters, and splits
-    into words."""
+# Homoglyphs used by character-level transformations, which are allowed inside words.
+_WORD_HOMOGLYPHS = """˗৭Ȣ𝟕бƼᏎƷᒿlO`ɑЬϲԁе𝚏ɡհіϳ𝒌ⅼｍոорԛⲅѕ𝚝սѵԝ×уᴢ"""
+# Apostrophes, hyphens, underscores, asterisks and at signs are allowed as long as they don't begin the word.
+# TODO: consider whether one should add "." to `_WORD_EXCEPTIONS` (and "\." to `_WORD_PATTERN`)
+# example "My email address is xxx@yyy.com"
+_WORD_EXCEPTIONS = """'-_*@"""
+_WORD_PATTERN = re.compile(f"[\\w{_WORD_HOMOGLYPHS}'\\-_\\*@]+")
+_CHINESE_LANGUAGES = ("Chinese", "ChineseT")
+
+
+@functools.lru_cache(maxsize=2**12)
+def detect_language(s):
+    """Returns the name of the language of ``s`` as detected by CLD2 (e.g.
+    ``"ENGLISH"``), or ``"Unknown"`` if detection fails.
+
+    Results are memoized, since the same text is usually tokenized many
+    times during an attack.
+    """
     try:
         isReliable, textBytesFound, details = cld2.detect(s)
-        if details[0][0] == "Chinese" or details[0][0] == "ChineseT":
-            seg_list = jieba.cut(s, cut_all=False)
-            s = " ".join(seg_list)
-        else:
-            s = " ".join(s.split())
+        return details[0][0]
     except Exception:
-        s = " ".join(s.split())
-
-    homos = """˗৭Ȣ𝟕бƼᏎƷᒿlO`ɑЬϲԁе𝚏ɡհіϳ𝒌ⅼｍոорԛⲅѕ𝚝սѵԝ×уᴢ"""
-    exceptions = """'-_*@"""
-    filter_pattern = homos + """'\\-_\\*@"""
-    # TODO: consider whether one should add "." to `exceptions` (and "\." to `filter_pattern`)
-    # example "My email address is xxx@yyy.com"
-    filter_pattern = f"[\\w{filter_pattern}]+"
+        return "Unknown"
+
+
+@functools.lru_cache(maxsize=2**12)
+def _words_from_text(s, language):
+    if language in _CHINESE_LANGUAGES:
+        s = " ".join(jieba.cut(s, cut_all=False))
     words = []
     for word in s.split():
-        # Allow apostrophes, hyphens, underscores, asterisks and at signs as long as they don't begin the word.
-        word = word.lstrip(exceptions)
-        filt = [w.lstrip(exceptions) for w in re.findall(filter_pattern, word)]
-        words.extend(filt)
-    words = list(filter(lambda w: w not in words_to_ignore + [""], words))
-    return words
+        word = word.lstrip(_WORD_EXCEPTIONS)
+        words.extend(w.lstrip(_WORD_EXCEPTIONS) for w in _WORD_PATTERN.findall(word))
+    return tuple(w for w in words if w)
+
+
+def words_from_text(s, words_to_ignore=[], language=None):
+    """Lowercases a string, removes all non-alphanumeric characters, and splits
+    into words.
+
+    Args:
+        s (str): String to split into words.
+        words_to_ignore (list[str]): Words to leave out of the result.
+        language (str): Language of ``s`` as returned by :func:`detect_language`. If :obj:`None`, it is detected from ``s``.
+            Passing a known language skips detection.
+    """
+    if language is None:
+        language = detect_language(s)
+    words = _words_from_text(s, language)
+    if words_to_ignore:
+        return [w for w in words if w not in words_to_ignore]
+    return list(words)
 
 
 class TextAttackFlairTokenizer(flair.data.Tokenizer):
@@ -255,16 +281,22 @@ stanza = LazyLoader("stanza", globals(), "stanza")
 
 
 def zip_stanza_result(pred, tagset="universal"):
-    """Takes the first sentence from a document from `stanza` and returns two
+    """Takes a document or a single sentence from `stanza` and returns two
     lists, one of words and the other of their corresponding parts-of-
     speech."""
-    if not isinstance(pred, stanza.models.common.doc.Document):
-        raise TypeError("Result from Stanza POS tagger must be a `Document` object.")
+    if isinstance(pred, stanza.models.common.doc.Document):
+        sentences = pred.sentences
+    elif isinstance(pred, stanza.models.common.doc.Sentence):
+        sentences = [pred]
+    else:
+        raise TypeError(
+            "Result from Stanza POS tagger must be a `Document` or `Sentence` object."
+        )
 
     word_list = []
     pos_list = []
 
-    for sentence in pred.sentences:
+    for sentence in sentences:
         for word in sentence.words:
             word_list.append(word.text)
             if tagset == "universal":
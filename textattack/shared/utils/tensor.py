@@ -1,6 +1,15 @@
+import weakref
+
 import numpy as np
 import torch
 
+from .strings import (
+    check_if_punctuations,
+    check_if_subword,
+    is_one_word,
+    strip_BPE_artifacts,
+)
+
 
 def batch_model_predict(model_predict, inputs, batch_size=32):
     """Runs prediction on iterable ``inputs`` using batch size ``batch_size``.
@@ -31,3 +40,148 @@ def batch_model_predict(model_predict, inputs, batch_size=32):
         i += batch_size
 
     return np.concatenate(outputs, axis=0)
+
+
+# Vocabularies by tokenizer, which are dropped along with their tokenizer.
+_MASKED_LM_VOCAB_CACHE = weakref.WeakKeyDictionary()
+
+
+def masked_lm_vocab(tokenizer, model_type, vocab_size, starting=False):
+    """Returns the word each token in the vocabulary of a masked language
+    model stands for when it is predicted for a masked word, and a boolean
+    mask of the tokens that are valid candidate words (a single word that is
+    not just punctuation).
+
+    The result is computed once per tokenizer and cached for as long as the
+    tokenizer is alive.
+
+    Args:
+        tokenizer: Tokenizer of the masked language model.
+        model_type (str): type of model (e.g. "bert", "roberta").
+        vocab_size (int): Size of the output layer of the model.
+        starting (bool): Whether the masked word is the starting token of the text.
+    Returns:
+        Tuple of a list of ``vocab_size`` words and a ``torch.BoolTensor`` of size ``vocab_size``.
+    """
+    vocab_cache = _MASKED_LM_VOCAB_CACHE.setdefault(tokenizer, {})
+    key = (len(tokenizer), model_type, vocab_size, starting)
+    if key not in vocab_cache:
+        words = []
+        valid = torch.zeros(vocab_size, dtype=torch.bool)
+        num_tokens = min(vocab_size, len(tokenizer))
+        for _id, word in enumerate(
+            tokenizer.convert_ids_to_tokens(list(range(num_tokens)))
+        ):
+            if not word:
+                words.append(None)
+                continue
+            if check_if_subword(word, model_type, starting):
+                word = strip_BPE_artifacts(word, model_type)
+            words.append(word)
+            valid[_id] = is_one_word(word) and not check_if_punctuations(word)
+        words += [None] * (vocab_size - len(words))
+        vocab_cache[key] = (words, valid)
+    return vocab_cache[key]
+
+
+def masked_lm_top_words(
+    mask_token_logits,
+    starting,
+    tokenizer,
+    model_type,
+    max_candidates,
+    min_confidence,
+):
+    """Returns the most probable candidate words predicted by a masked
+    language model for each of a batch of masked positions.
+
+    Candidates are the words of ``masked_lm_vocab``, ranked by probability,
+    that have a probability of at least ``min_confidence``.
+
+    Args:
+        mask_token_logits (torch.Tensor): N x V tensor of the logits predicted for N masked positions.
+        starting (list[bool]): Whether each masked position is the starting token of its text.
+        tokenizer: Tokenizer of the masked language model.
+        model_type (str): type of model (e.g. "bert", "roberta").
+        max_candidates (int): Maximum number of words to return for each position.
+        min_confidence (float): Minimum probability of returned words.
+    Returns:
+        2-D list with a list of words for each masked position.
+    """
+    if not len(mask_token_logits):
+        return []
+    vocab_size = mask_token_logits.shape[-1]
+    vocabs = [
+        masked_lm_vocab(tokenizer, model_type, vocab_size, starting=s)
+        for s in (False, True)
+    ]
+    valid = torch.stack([vocab[1] for vocab in vocabs]).to(mask_token_logits.device)
+    starting = torch.tensor(starting, dtype=torch.long, device=valid.device)
+
+    mask_token_probs = torch.softmax(mask_token_logits, dim=-1)
+    # Probabilities are non-negative, so -1 ranks invalid tokens below every valid one.
+    candidate_probs = mask_token_probs.masked_fill(~valid[starting], -1.0)
+    top_probs, top_ids = torch.topk(
+        candidate_probs, min(max_candidates, vocab_size), dim=-1
+    )
+
+    top_words = []
+    for probs, ids, s in zip(top_probs.tolist(), top_ids.tolist(), starting.tolist()):
+        words = vocabs[s][0]
+        top_words.append(
+            [
+                words[_id]
+                for prob, _id in zip(probs, ids)
+                if prob >= min_confidence and prob >= 0
+            ]
+        )
+    return top_words
+
+
+def masked_lm_batch_top_words(
+    input_ids,
+    preds,
+    tokenizer,
+    model_type,
+    max_candidates,
+    min_confidence,
+):
+    """Returns the candidate words predicted by a masked language model for
+    the mask token of each text of a batch, as in ``masked_lm_top_words``.
+
+    Args:
+        input_ids (list[list[int]]): Token ids of each text of the batch.
+        preds (torch.Tensor): B x N x V tensor of the logits predicted for the batch.
+        tokenizer: Tokenizer of the masked language model.
+        model_type (str): type of model (e.g. "bert", "roberta").
+        max_candidates (int): Maximum number of words to return for each text.
+        min_confidence (float): Minimum probability of returned words.
+    Returns:
+        2-D list with a list of words for each text. The list is empty for
+        texts whose mask token was truncated.
+    """
+    # Rows of the batch whose mask-token wasn't truncated, and the position of
+    # their mask-token
+    rows = []
+    masked_indices = []
+    for j, ids in enumerate(input_ids):
+        try:
+            # Need try-except b/c mask-token located past max_length might be
+            # truncated by tokenizer
+            masked_indices.append(ids.index(tokenizer.mask_token_id))
+            rows.append(j)
+        except ValueError:
+            continue
+
+    top_words = masked_lm_top_words(
+        preds[rows, masked_indices],
+        [masked_index == 1 for masked_index in masked_indices],
+        tokenizer,
+        model_type,
+        max_candidates,
+        min_confidence,
+    )
+    batch_words = [[] for _ in input_ids]
+    for j, words in zip(rows, top_words):
+        batch_words[j] = words
+    return batch_words
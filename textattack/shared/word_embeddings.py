@@ -7,11 +7,15 @@ from abc import ABC, abstractmethod
 from collections import defaultdict
 import os
 import pickle
+import shutil
+import tempfile
 
+import lru
 import numpy as np
 import torch
 
 from textattack.shared import utils
+from textattack.shared.neighbour_index import ExactNeighbourIndex
 
 
 class AbstractWordEmbedding(utils.ReprMixin, ABC):
@@ -63,6 +67,32 @@ class AbstractWordEmbedding(utils.ReprMixin, ABC):
         """
         raise NotImplementedError()
 
+    def get_mse_dist_many(self, a, b):
+        """Return MSE distances between the vectors of each pair of words in
+        `a` and `b`.
+
+        Embeddings that can compute many distances at once should override this method.
+        Args:
+            a (list[Union[str|int]]): Words or integers presenting the ids of the words
+            b (list[Union[str|int]]): Words or integers presenting the ids of the words
+        Returns:
+            distances (ndarray): 1-D array of MSE (L2) distances
+        """
+        return np.array([self.get_mse_dist(x, y) for x, y in zip(a, b)])
+
+    def get_cos_sim_many(self, a, b):
+        """Return cosine similarities between the vectors of each pair of words
+        in `a` and `b`.
+
+        Embeddings that can compute many similarities at once should override this method.
+        Args:
+            a (list[Union[str|int]]): Words or integers presenting the ids of the words
+            b (list[Union[str|int]]): Words or integers presenting the ids of the words
+        Returns:
+            similarities (ndarray): 1-D array of cosine similarities
+        """
+        return np.array([self.get_cos_sim(x, y) for x, y in zip(a, b)])
+
     @abstractmethod
     def word2index(self, word):
         """
@@ -97,8 +127,226 @@ class AbstractWordEmbedding(utils.ReprMixin, ABC):
         """
         raise NotImplementedError()
 
+    def nearest_neighbours_many(self, indices, topn):
+        """
+        Get top-N nearest neighbours for each of a list of words. Embeddings that can search for many words at once
+        should override this method.
+        Args:
+            indices (list[int]): IDs of the words for which we're finding the nearest neighbours
+            topn (int): Used for specifying N nearest neighbours
+        Returns:
+            neighbours (list[list[int]]): List of indices of the nearest neighbours of each word
+        """
+        return [self.nearest_neighbours(index, topn) for index in indices]
+
+
+class _NeighbourSearchMixin:
+    """Finds the nearest neighbours of the words of an embedding, reading them
+    from a precomputed ``nn_matrix`` if there is one, or else searching for
+    them with ``neighbour_index`` and caching them.
+
+    Classes using it call :meth:`_init_neighbour_search` and implement
+    :meth:`_neighbour_vectors`.
+    """
+
+    def _init_neighbour_search(self, nn_matrix=None, neighbour_index=None):
+        self.nn_matrix = nn_matrix
+        self._default_neighbour_index = neighbour_index is None
+        self.neighbour_index = neighbour_index
+        self._nn_cache = lru.LRU(2**14)
+
+    def _neighbour_vectors(self):
+        """Returns the N x D matrix of vectors whose nearest rows (by euclidean
+        distance) are the nearest neighbours of the words, used to build the
+        default :class:`~textattack.shared.neighbour_index.ExactNeighbourIndex`."""
+        raise NotImplementedError()
+
+    def _get_neighbour_index(self):
+        if self.neighbour_index is None:
+            self.neighbour_index = ExactNeighbourIndex(self._neighbour_vectors())
+        return self.neighbour_index
+
+    def nearest_neighbours(self, index, topn):
+        """
+        Get top-N nearest neighbours for a word
+        Args:
+            index (int): ID of the word for which we're finding the nearest neighbours
+            topn (int): Used for specifying N nearest neighbours
+        Returns:
+            neighbours (list[int]): List of indices of the nearest neighbours
+        """
+        return self.nearest_neighbours_many([index], topn)[0]
+
+    def nearest_neighbours_many(self, indices, topn):
+        """
+        Get top-N nearest neighbours for each of a list of words. Words whose neighbours are not precomputed
+        or cached are searched for with a single query to `self.neighbour_index`.
+        Args:
+            indices (list[int]): IDs of the words for which we're finding the nearest neighbours
+            topn (int): Used for specifying N nearest neighbours
+        Returns:
+            neighbours (list[list[int]]): List of indices of the nearest neighbours of each word
+        """
+        indices = [
+            self.word2index(index) if isinstance(index, str) else index
+            for index in indices
+        ]
+        if self.nn_matrix is not None:
+            return [self.nn_matrix[index][1 : (topn + 1)] for index in indices]
+
+        neighbours = [None] * len(indices)
+        uncached = {}
+        for i, index in enumerate(indices):
+            if (index, topn) in self._nn_cache:
+                neighbours[i] = self._nn_cache[(index, topn)]
+            else:
+                uncached.setdefault(index, []).append(i)
+        if uncached:
+            nn = self._get_neighbour_index().query(list(uncached), topn)
+            for (index, positions), index_nn in zip(uncached.items(), nn):
+                index_nn = index_nn.tolist()
+                self._nn_cache[(index, topn)] = index_nn
+                for i in positions:
+                    neighbours[i] = index_nn
+        return neighbours
+
+    def build_nn_matrix(self, topn=100, batch_size=1024):
+        """Precomputes the nearest neighbours of every word with
+        `self.neighbour_index` and uses them from then on.
+
+        The matrix is stored by :meth:`WordEmbedding.save`, or can be saved with ``np.save`` in the format of
+        the ``nn.npy`` file of :meth:`WordEmbedding.counterfitted_GLOVE_embedding`.
+
+        Args:
+            topn (int): Number of neighbours to precompute for each word.
+            batch_size (int): Number of words to query at once.
+        Returns:
+            nn_matrix (ndarray): 2-D ``int32`` array of shape N x (topn + 1) where the first column is the word itself.
+        """
+        self.nn_matrix = self._get_neighbour_index().build_nn_matrix(
+            topn=topn, batch_size=batch_size
+        )
+        return self.nn_matrix
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_nn_cache"] = self._nn_cache.get_size()
+        if self._default_neighbour_index:
+            # Built again on first use.
+            state["neighbour_index"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__ = state
+        self._nn_cache = lru.LRU(state["_nn_cache"])
+
+
+class _ArrayWord2Index:
+    """Read-only mapping from words to ids backed by a sorted array of words,
+    so that a vocabulary can be memory-mapped instead of unpickled into a
+    ``dict``."""
+
+    def __init__(self, sorted_words, sorted_ids):
+        self.sorted_words = sorted_words
+        self.sorted_ids = sorted_ids
+
+    def __getitem__(self, word):
+        i = np.searchsorted(self.sorted_words, word)
+        if i < len(self.sorted_words) and self.sorted_words[i] == word:
+            return int(self.sorted_ids[i])
+        raise KeyError(word)
+
+    def get(self, word, default=None):
+        try:
+            return self[word]
+        except KeyError:
+            return default
+
+    def __contains__(self, word):
+        return self.get(word) is not None
+
+    def __len__(self):
+        return len(self.sorted_words)
+
+    def items(self):
+        for word, index in zip(self.sorted_words, self.sorted_ids):
+            yield str(word), int(index)
+
+
+class _ArrayIndex2Word:
+    """Read-only mapping from ids to words backed by an array of words."""
+
+    def __init__(self, words):
+        self.words = words
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self.words) or not self.words[index]:
+            raise KeyError(index)
+        return str(self.words[index])
+
+    def get(self, index, default=None):
+        try:
+            return self[index]
+        except KeyError:
+            return default
+
+    def __contains__(self, index):
+        return self.get(index) is not None
+
+    def __len__(self):
+        return len(self.words)
+
+    def items(self):
+        for index, word in enumerate(self.words):
+            if word:
+                yield index, str(word)
+
 
-class WordEmbedding(AbstractWordEmbedding):
+class _SparseDistanceTable:
+    """Read-only table of precomputed distances between pairs of word ids,
+    stored in compressed sparse row format.
+
+    The distance between ids ``a <= b`` is stored in row ``a``.
+    """
+
+    def __init__(self, indptr, indices, data):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    def get(self, a, b):
+        """Returns the distance between ids ``a <= b``, or ``None`` if it was
+        not precomputed."""
+        if not 0 <= a < len(self.indptr) - 1:
+            return None
+        start, end = self.indptr[a], self.indptr[a + 1]
+        i = start + np.searchsorted(self.indices[start:end], b)
+        if i < end and self.indices[i] == b:
+            return float(self.data[i])
+        return None
+
+    def items(self):
+        for a in range(len(self.indptr) - 1):
+            for i in range(self.indptr[a], self.indptr[a + 1]):
+                yield a, int(self.indices[i]), float(self.data[i])
+
+    @staticmethod
+    def from_items(items, num_rows):
+        """Builds a table from an iterable of ``(a, b, distance)`` with ``a <= b``."""
+        table = {}
+        for a, b, distance in items:
+            table[(a, b)] = distance
+        keys = sorted(table)
+        indptr = np.zeros(num_rows + 1, dtype=np.int64)
+        for a, _ in keys:
+            indptr[a + 1] += 1
+        indptr = np.cumsum(indptr)
+        indices = np.array([b for _, b in keys], dtype=np.int32)
+        data = np.array([table[key] for key in keys], dtype=np.float32)
+        return _SparseDistanceTable(indptr, indices, data)
+
+
+class WordEmbedding(_NeighbourSearchMixin, AbstractWordEmbedding):
     """Object for loading word embeddings and related distances for TextAttack.
     This class has a lot of internal components (e.g. get consine similarity)
     implemented. Consider using this class if you can provide the appropriate
@@ -111,20 +359,34 @@ class WordEmbedding(AbstractWordEmbedding):
         nn_matrix (ndarray): Matrix for precomputed nearest neighbours. It should be a 2-D integer array of shape N x K
             where N represents size of vocab and K is the top-K nearest neighbours. If this is set to `None`, we have to compute nearest neighbours
             on the fly for `nearest_neighbours` method, which is costly.
+        neighbour_index (:class:`~textattack.shared.neighbour_index.NeighbourIndex`): Index used to compute nearest neighbours
+            when `nn_matrix` is `None`. Defaults to an exact :class:`~textattack.shared.neighbour_index.ExactNeighbourIndex`.
+            Use :class:`~textattack.shared.neighbour_index.IVFNeighbourIndex` for faster, approximate neighbours of large vocabularies.
     """
 
     PATH = "word_embeddings"
 
-    def __init__(self, embedding_matrix, word2index, index2word, nn_matrix=None):
+    def __init__(
+        self,
+        embedding_matrix,
+        word2index,
+        index2word,
+        nn_matrix=None,
+        neighbour_index=None,
+    ):
         self.embedding_matrix = embedding_matrix
         self._word2index = word2index
         self._index2word = index2word
-        self.nn_matrix = nn_matrix
+        self._init_neighbour_search(nn_matrix, neighbour_index)
 
         # Dictionary for caching results
         self._mse_dist_mat = defaultdict(dict)
         self._cos_sim_mat = defaultdict(dict)
-        self._nn_cache = {}
+        # Read-only tables of precomputed distances, set when loading a saved embedding
+        self._precomputed_mse_dist = None
+        self._precomputed_cos_sim = None
+        # Directory the arrays were memory-mapped from, if any
+        self._path = None
 
     def __getitem__(self, index):
         """Gets the embedding vector for word/id
@@ -165,6 +427,9 @@ class WordEmbedding(AbstractWordEmbedding):
         """
         return self._index2word[index]
 
+    def _neighbour_vectors(self):
+        return self.embedding_matrix
+
     def get_mse_dist(self, a, b):
         """Return MSE distance between vector for word `a` and vector for word
         `b`.
@@ -184,6 +449,10 @@ class WordEmbedding(AbstractWordEmbedding):
         try:
             mse_dist = self._mse_dist_mat[a][b]
         except KeyError:
+            if self._precomputed_mse_dist is not None:
+                mse_dist = self._precomputed_mse_dist.get(a, b)
+                if mse_dist is not None:
+                    return mse_dist
             e1 = self.embedding_matrix[a]
             e2 = self.embedding_matrix[b]
             e1 = torch.tensor(e1).to(utils.device)
@@ -212,6 +481,10 @@ class WordEmbedding(AbstractWordEmbedding):
         try:
             cos_sim = self._cos_sim_mat[a][b]
         except KeyError:
+            if self._precomputed_cos_sim is not None:
+                cos_sim = self._precomputed_cos_sim.get(a, b)
+                if cos_sim is not None:
+                    return cos_sim
             e1 = self.embedding_matrix[a]
             e2 = self.embedding_matrix[b]
             e1 = torch.tensor(e1).to(utils.device)
@@ -220,37 +493,168 @@ class WordEmbedding(AbstractWordEmbedding):
             self._cos_sim_mat[a][b] = cos_sim
         return cos_sim
 
-    def nearest_neighbours(self, index, topn):
+    def _vectors_of(self, words):
+        ids = [self._word2index[w] if isinstance(w, str) else w for w in words]
+        return np.asarray(self.embedding_matrix[np.array(ids, dtype=np.int64)])
+
+    def get_mse_dist_many(self, a, b):
+        """Return MSE distances between the vectors of each pair of words in
+        `a` and `b`, computed in a single vectorized operation.
+
+        Args:
+            a (list[Union[str|int]]): Words or integers presenting the ids of the words
+            b (list[Union[str|int]]): Words or integers presenting the ids of the words
+        Returns:
+            distances (ndarray): 1-D array of MSE (L2) distances
         """
-        Get top-N nearest neighbours for a word
+        if not len(a):
+            return np.zeros(0)
+        e1, e2 = self._vectors_of(a), self._vectors_of(b)
+        return np.sum((e1 - e2) ** 2, axis=1)
+
+    def get_cos_sim_many(self, a, b):
+        """Return cosine similarities between the vectors of each pair of words
+        in `a` and `b`, computed in a single vectorized operation.
+
         Args:
-            index (int): ID of the word for which we're finding the nearest neighbours
-            topn (int): Used for specifying N nearest neighbours
+            a (list[Union[str|int]]): Words or integers presenting the ids of the words
+            b (list[Union[str|int]]): Words or integers presenting the ids of the words
         Returns:
-            neighbours (list[int]): List of indices of the nearest neighbours
+            similarities (ndarray): 1-D array of cosine similarities
         """
-        if isinstance(index, str):
-            index = self._word2index[index]
+        if not len(a):
+            return np.zeros(0)
+        e1, e2 = self._vectors_of(a), self._vectors_of(b)
+        # Same as `torch.nn.CosineSimilarity`, which clamps the product of the norms by eps=1e-8.
+        norms = np.sqrt(
+            np.maximum(np.sum(e1**2, axis=1) * np.sum(e2**2, axis=1), 1e-16)
+        )
+        return np.sum(e1 * e2, axis=1) / norms
+
+    def save(self, path):
+        """Saves the embedding to directory ``path`` in a compact format that
+        :meth:`load` can memory-map.
+
+        The embedding matrix is stored as ``float32`` and the nearest neighbour
+        matrix as ``int32``. The vocabulary is stored as arrays of words rather
+        than a pickled ``dict``, and distances computed so far (or precomputed)
+        are stored as sparse tables.
+
+        Args:
+            path (str): Directory to save to. It is created if it does not exist.
+        """
+        os.makedirs(path, exist_ok=True)
+        num_words = len(self.embedding_matrix)
+        np.save(
+            os.path.join(path, "embedding_matrix.npy"),
+            np.asarray(self.embedding_matrix, dtype=np.float32),
+        )
         if self.nn_matrix is not None:
-            nn = self.nn_matrix[index][1 : (topn + 1)]
-        else:
-            try:
-                nn = self._nn_cache[index]
-            except KeyError:
-                embedding = torch.tensor(self.embedding_matrix).to(utils.device)
-                vector = torch.tensor(self.embedding_matrix[index]).to(utils.device)
-                dist = torch.norm(embedding - vector, dim=1, p=None)
-                # Since closest neighbour will be the same word, we consider N+1 nearest neighbours
-                nn = dist.topk(topn + 1, largest=False)[1:].tolist()
-                self._nn_cache[index] = nn
+            np.save(
+                os.path.join(path, "nn_matrix.npy"),
+                np.asarray(self.nn_matrix, dtype=np.int32),
+            )
 
-        return nn
+        words = [""] * num_words
+        for index, word in self._index2word.items():
+            words[index] = word
+        np.save(os.path.join(path, "words.npy"), np.array(words, dtype=str))
+        word_ids = sorted(self._word2index.items())
+        np.save(
+            os.path.join(path, "sorted_words.npy"),
+            np.array([word for word, _ in word_ids], dtype=str),
+        )
+        np.save(
+            os.path.join(path, "sorted_word_ids.npy"),
+            np.array([index for _, index in word_ids], dtype=np.int32),
+        )
+
+        for name, dist_mat, precomputed in (
+            ("mse_dist", self._mse_dist_mat, self._precomputed_mse_dist),
+            ("cos_sim", self._cos_sim_mat, self._precomputed_cos_sim),
+        ):
+            items = [] if precomputed is None else list(precomputed.items())
+            for a, row in dist_mat.items():
+                for b, distance in row.items():
+                    items.append((min(a, b), max(a, b), distance))
+            table = _SparseDistanceTable.from_items(items, num_words)
+            np.save(os.path.join(path, f"{name}_indptr.npy"), table.indptr)
+            np.save(os.path.join(path, f"{name}_indices.npy"), table.indices)
+            np.save(os.path.join(path, f"{name}_data.npy"), table.data)
+
+    @staticmethod
+    def load(path, mmap=True):
+        """Loads an embedding saved with :meth:`save`.
+
+        Args:
+            path (str): Directory the embedding was saved to.
+            mmap (bool): If ``True``, arrays are memory-mapped instead of read into memory, so that
+                loading is near-instant and processes using the same embedding share its pages.
+        Returns:
+            :class:`WordEmbedding`
+        """
+        mmap_mode = "r" if mmap else None
+
+        def _load(name):
+            file_path = os.path.join(path, f"{name}.npy")
+            if not os.path.exists(file_path):
+                return None
+            return np.load(file_path, mmap_mode=mmap_mode)
+
+        embedding = WordEmbedding(
+            _load("embedding_matrix"),
+            _ArrayWord2Index(_load("sorted_words"), _load("sorted_word_ids")),
+            _ArrayIndex2Word(_load("words")),
+            _load("nn_matrix"),
+        )
+        embedding._precomputed_mse_dist = _SparseDistanceTable(
+            _load("mse_dist_indptr"), _load("mse_dist_indices"), _load("mse_dist_data")
+        )
+        embedding._precomputed_cos_sim = _SparseDistanceTable(
+            _load("cos_sim_indptr"), _load("cos_sim_indices"), _load("cos_sim_data")
+        )
+        if mmap:
+            embedding._path = path
+        return embedding
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        if self._path is not None:
+            # Memory-mapped arrays would be pickled as copies, so they are mapped again when unpickling.
+            for key in [
+                "embedding_matrix",
+                "nn_matrix",
+                "_word2index",
+                "_index2word",
+                "_precomputed_mse_dist",
+                "_precomputed_cos_sim",
+            ]:
+                del state[key]
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        if self._path is not None:
+            loaded = WordEmbedding.load(self._path)
+            for key in [
+                "embedding_matrix",
+                "nn_matrix",
+                "_word2index",
+                "_index2word",
+                "_precomputed_mse_dist",
+                "_precomputed_cos_sim",
+            ]:
+                setattr(self, key, getattr(loaded, key))
 
     @staticmethod
     def counterfitted_GLOVE_embedding():
         """Returns a prebuilt counter-fitted GLOVE word embedding proposed by
         "Counter-fitting Word Vectors to Linguistic Constraints" (Mrkšić et
-        al., 2016)"""
+        al., 2016)
+
+        The first time it is used, the downloaded files are converted to
+        the compact format of :meth:`save`, which is memory-mapped from then on.
+        """
         if (
             "textattack_counterfitted_GLOVE_embedding" in utils.GLOBAL_OBJECTS
             and isinstance(
@@ -267,49 +671,77 @@ class WordEmbedding(AbstractWordEmbedding):
         mse_dist_file = "mse_dist.p"
         cos_sim_file = "cos_sim.p"
         nn_matrix_file = "nn.npy"
+        compact_folder = "compact"
 
         # Download embeddings if they're not cached.
         word_embeddings_folder = os.path.join(
             WordEmbedding.PATH, word_embeddings_folder
         ).replace("\\", "/")
         word_embeddings_folder = utils.download_from_s3(word_embeddings_folder)
-        # Concatenate folder names to create full path to files.
-        word_embeddings_file = os.path.join(
-            word_embeddings_folder, word_embeddings_file
-        )
-        word_list_file = os.path.join(word_embeddings_folder, word_list_file)
-        mse_dist_file = os.path.join(word_embeddings_folder, mse_dist_file)
-        cos_sim_file = os.path.join(word_embeddings_folder, cos_sim_file)
-        nn_matrix_file = os.path.join(word_embeddings_folder, nn_matrix_file)
+        compact_folder = os.path.join(word_embeddings_folder, compact_folder)
 
-        # loading the files
-        embedding_matrix = np.load(word_embeddings_file)
-        word2index = np.load(word_list_file, allow_pickle=True)
-        index2word = {}
-        for word, index in word2index.items():
-            index2word[index] = word
-        nn_matrix = np.load(nn_matrix_file)
+        if not os.path.exists(compact_folder):
+            # Concatenate folder names to create full path to files.
+            word_embeddings_file = os.path.join(
+                word_embeddings_folder, word_embeddings_file
+            )
+            word_list_file = os.path.join(word_embeddings_folder, word_list_file)
+            mse_dist_file = os.path.join(word_embeddings_folder, mse_dist_file)
+            cos_sim_file = os.path.join(word_embeddings_folder, cos_sim_file)
+            nn_matrix_file = os.path.join(word_embeddings_folder, nn_matrix_file)
+
+            # loading the files
+            embedding_matrix = np.load(word_embeddings_file)
+            word2index = np.load(word_list_file, allow_pickle=True)
+            index2word = {}
+            for word, index in word2index.items():
+                index2word[index] = word
+            nn_matrix = np.load(nn_matrix_file)
+
+            embedding = WordEmbedding(
+                embedding_matrix, word2index, index2word, nn_matrix
+            )
 
-        embedding = WordEmbedding(embedding_matrix, word2index, index2word, nn_matrix)
+            with open(mse_dist_file, "rb") as f:
+                mse_dist_mat = pickle.load(f)
+            with open(cos_sim_file, "rb") as f:
+                cos_sim_mat = pickle.load(f)
 
-        with open(mse_dist_file, "rb") as f:
-            mse_dist_mat = pickle.load(f)
-        with open(cos_sim_file, "rb") as f:
-            cos_sim_mat = pickle.load(f)
+            embedding._mse_dist_mat = mse_dist_mat
+            embedding._cos_sim_mat = cos_sim_mat
 
-        embedding._mse_dist_mat = mse_dist_mat
-        embedding._cos_sim_mat = cos_sim_mat
+            # Save to a temporary folder first, so that other processes never see a partial conversion.
+            tmp_folder = tempfile.mkdtemp(dir=word_embeddings_folder)
+            os.chmod(tmp_folder, 0o755)
+            embedding.save(tmp_folder)
+            try:
+                os.rename(tmp_folder, compact_folder)
+            except OSError:
+                # Another process finished the conversion first.
+                shutil.rmtree(tmp_folder, ignore_errors=True)
+
+        embedding = WordEmbedding.load(compact_folder)
 
         utils.GLOBAL_OBJECTS["textattack_counterfitted_GLOVE_embedding"] = embedding
 
         return embedding
 
 
-class GensimWordEmbedding(AbstractWordEmbedding):
+class GensimWordEmbedding(_NeighbourSearchMixin, AbstractWordEmbedding):
     """Wraps Gensim's `models.keyedvectors` module
-    (https://radimrehurek.com/gensim/models/keyedvectors.html)"""
+    (https://radimrehurek.com/gensim/models/keyedvectors.html)
+
+    Nearest neighbours are the words with the highest cosine similarity, as
+    with ``similar_by_word`` of Gensim, and are searched for and cached like
+    those of :class:`WordEmbedding`.
 
-    def __init__(self, keyed_vectors):
+    Args:
+        keyed_vectors (:obj:`gensim.models.KeyedVectors`): Word vectors to wrap.
+        neighbour_index (:class:`~textattack.shared.neighbour_index.NeighbourIndex`): Index over the normalized vectors
+            used to compute nearest neighbours. Defaults to an exact :class:`~textattack.shared.neighbour_index.ExactNeighbourIndex`.
+    """
+
+    def __init__(self, keyed_vectors, neighbour_index=None):
         gensim = utils.LazyLoader("gensim", globals(), "gensim")
 
         if isinstance(keyed_vectors, gensim.models.KeyedVectors):
@@ -321,6 +753,7 @@ class GensimWordEmbedding(AbstractWordEmbedding):
             )
 
         self.keyed_vectors.init_sims()
+        self._init_neighbour_search(neighbour_index=neighbour_index)
         self._mse_dist_mat = defaultdict(dict)
         self._cos_sim_mat = defaultdict(dict)
 
@@ -410,17 +843,6 @@ class GensimWordEmbedding(AbstractWordEmbedding):
         cos_sim = self.keyed_vectors.similarity(a, b)
         return cos_sim
 
-    def nearest_neighbours(self, index, topn, return_words=True):
-        """
-        Get top-N nearest neighbours for a word
-        Args:
-            index (int): ID of the word for which we're finding the nearest neighbours
-            topn (int): Used for specifying N nearest neighbours
-        Returns:
-            neighbours (list[int]): List of indices of the nearest neighbours
-        """
-        word = self.keyed_vectors.index_to_key[index]
-        return [
-            self.word2index(i[0])
-            for i in self.keyed_vectors.similar_by_word(word, topn)
-        ]
+    def _neighbour_vectors(self):
+        # Euclidean distances between normalized vectors rank neighbours by cosine similarity.
+        return self.keyed_vectors.get_normed_vectors()
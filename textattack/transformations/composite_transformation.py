@@ -39,6 +39,16 @@ class CompositeTransformation(Transformation):
             new_attacked_texts.update(transformation(*args, **kwargs))
         return list(new_attacked_texts)
 
+    def transform_many(self, current_texts, *args, **kwargs):
+        new_attacked_texts = [set() for _ in current_texts]
+        for transformation in self.transformations:
+            for texts, transformed_texts in zip(
+                new_attacked_texts,
+                transformation.transform_many(current_texts, *args, **kwargs),
+            ):
+                texts.update(transformed_texts)
+        return [list(texts) for texts in new_attacked_texts]
+
     def __repr__(self):
         main_str = "CompositeTransformation" + "("
         transformation_lines = []
@@ -55,13 +55,77 @@ class Transformation(ReprMixin, ABC):
             return indices_to_modify
 
         transformed_texts = self._get_transformations(current_text, indices_to_modify)
+        self._set_last_transformation(transformed_texts)
+        return transformed_texts
+
+    def transform_many(
+        self,
+        current_texts,
+        pre_transformation_constraints=[],
+        indices_to_modify=None,
+        shifted_idxs=False,
+    ):
+        """Returns a list of all possible transformations for each of
+        ``current_texts``. Equivalent to calling the transformation on each
+        text, but lets transformations that override
+        ``_get_transformations_many`` share work (e.g. forward passes of a
+        language model) between texts.
+
+        Args:
+            current_texts: The list of ``AttackedText`` to transform.
+            pre_transformation_constraints: The ``PreTransformationConstraint`` to apply before
+                beginning the transformation.
+            indices_to_modify: Which word indices should be modified as dictated by the
+                ``SearchMethod``. The same indices are used for every text.
+            shifted_idxs (bool): Whether indices could have been shifted from
+                their original position in the text.
+        Returns:
+            A list with one list of transformed texts per text in ``current_texts``.
+        """
+        indices_to_modify_list = [
+            self(
+                current_text,
+                pre_transformation_constraints=pre_transformation_constraints,
+                indices_to_modify=indices_to_modify,
+                shifted_idxs=shifted_idxs,
+                return_indices=True,
+            )
+            for current_text in current_texts
+        ]
+        transformed_texts = self._get_transformations_many(
+            current_texts, indices_to_modify_list
+        )
+        for texts in transformed_texts:
+            self._set_last_transformation(texts)
+        return transformed_texts
+
+    def _set_last_transformation(self, transformed_texts):
+        """Marks each of ``transformed_texts`` as produced by this
+        transformation. Items of ``transformed_texts`` can also be lists of
+        texts."""
         for text in transformed_texts:
             if isinstance(text, list):
                 for t in text:
                     t.attack_attrs["last_transformation"] = self
             else:
                 text.attack_attrs["last_transformation"] = self
-        return transformed_texts
+
+    def _get_transformations_many(self, current_texts, indices_to_modify_list):
+        """Returns a list of transformations for each of ``current_texts``,
+        only modifying the corresponding indices in
+        ``indices_to_modify_list``. Transformations that can batch work across
+        texts should override this method.
+
+        Args:
+            current_texts: The list of ``AttackedText`` to transform.
+            indices_to_modify_list: The word indices that can be modified in each text.
+        """
+        return [
+            self._get_transformations(current_text, indices_to_modify)
+            for current_text, indices_to_modify in zip(
+                current_texts, indices_to_modify_list
+            )
+        ]
 
     @abstractmethod
     def _get_transformations(self, current_text, indices_to_modify):
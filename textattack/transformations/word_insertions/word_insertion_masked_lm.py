@@ -111,43 +111,16 @@ class WordInsertionMaskedLM(WordInsertion):
             with torch.no_grad():
                 preds = self._language_model(**inputs)[0]
 
-            for j in range(len(ids)):
-                try:
-                    # Need try-except b/c mask-token located past max_length might be truncated by tokenizer
-                    masked_index = ids[j].index(self._lm_tokenizer.mask_token_id)
-                except ValueError:
-                    new_words.append([])
-                    continue
-
-                mask_token_logits = preds[j, masked_index]
-                mask_token_probs = torch.softmax(mask_token_logits, dim=0)
-                ranked_indices = torch.argsort(mask_token_probs, descending=True)
-                top_words = []
-                for _id in ranked_indices:
-                    _id = _id.item()
-                    word = self._lm_tokenizer.convert_ids_to_tokens(_id)
-                    if utils.check_if_subword(
-                        word,
-                        self._language_model.config.model_type,
-                        (masked_index == 1),
-                    ):
-                        word = utils.strip_BPE_artifacts(
-                            word, self._language_model.config.model_type
-                        )
-                    if (
-                        mask_token_probs[_id] >= self.min_confidence
-                        and utils.is_one_word(word)
-                        and not utils.check_if_punctuations(word)
-                    ):
-                        top_words.append(word)
-
-                    if (
-                        len(top_words) >= self.max_candidates
-                        or mask_token_probs[_id] < self.min_confidence
-                    ):
-                        break
-
-                new_words.append(top_words)
+            new_words.extend(
+                utils.masked_lm_batch_top_words(
+                    ids,
+                    preds,
+                    self._lm_tokenizer,
+                    self._language_model.config.model_type,
+                    self.max_candidates,
+                    self.min_confidence,
+                )
+            )
 
             i += self.batch_size
 
@@ -48,12 +48,32 @@ class WordMerge(Transformation):
                     indices_to_modify.remove(i)
 
         transformed_texts = self._get_transformations(current_text, indices_to_modify)
-        for text in transformed_texts:
-            text.attack_attrs["last_transformation"] = self
-            if len(text.attack_attrs["newly_modified_indices"]) == 0:
-                print("xcv", text, len(text.attack_attrs["newly_modified_indices"]))
+        self._set_last_transformation(transformed_texts)
         return transformed_texts
 
+    def transform_many(
+        self,
+        current_texts,
+        pre_transformation_constraints=[],
+        indices_to_modify=None,
+        shifted_idxs=True,
+    ):
+        """Returns a list of all possible transformations for each of
+        ``current_texts``, by calling the transformation on each text.
+
+        Word merges apply the ``pre_transformation_constraints`` to pairs of
+        words, so each text goes through ``__call__``.
+        """
+        return [
+            self(
+                current_text,
+                pre_transformation_constraints=pre_transformation_constraints,
+                indices_to_modify=indices_to_modify,
+                shifted_idxs=shifted_idxs,
+            )
+            for current_text in current_texts
+        ]
+
     def _get_new_words(self, current_text, index):
         """Returns a set of new words we can insert at position `index` of `current_text`
         Args:
@@ -57,6 +57,43 @@ class WordSwapEmbedding(WordSwap):
             # This word is not in our word embedding database, so return an empty list.
             return []
 
+    def _get_transformations(self, current_text, indices_to_modify):
+        """Same as ``WordSwap._get_transformations``, but looks up the
+        neighbours of all words to replace with one batched query."""
+        words = current_text.words
+        indices_to_modify = list(indices_to_modify)
+        word_ids = []
+        for i in indices_to_modify:
+            try:
+                word_ids.append(self.embedding.word2index(words[i].lower()))
+            except KeyError:
+                # This word is not in our word embedding database, so it has no candidates.
+                word_ids.append(None)
+        nnids = iter(
+            self.embedding.nearest_neighbours_many(
+                [word_id for word_id in word_ids if word_id is not None],
+                self.max_candidates,
+            )
+        )
+
+        transformed_texts = []
+        for i, word_id in zip(indices_to_modify, word_ids):
+            if word_id is None:
+                continue
+            word_to_replace = words[i]
+            try:
+                candidate_words = [
+                    recover_word_case(self.embedding.index2word(nbr_id), word_to_replace)
+                    for nbr_id in next(nnids)
+                ]
+            except KeyError:
+                continue
+            for r in candidate_words:
+                if r == word_to_replace:
+                    continue
+                transformed_texts.append(current_text.replace_word_at_index(i, r))
+        return transformed_texts
+
     def extra_repr_keys(self):
         return ["max_candidates", "embedding"]
 
@@ -4,7 +4,7 @@ Word Swap by BERT-Masked LM.
 """
 
 
-import itertools
+import collections
 import re
 
 import torch
@@ -46,7 +46,7 @@ class WordSwapMaskedLM(WordSwap):
             to the masked language model. Default is `float("inf")`, which is equivalent to using the whole text.
         max_candidates (int): maximum number of candidates to consider as replacements for each word. Replacements are ranked by model's confidence.
         min_confidence (float): minimum confidence threshold each replacement word must pass.
-        batch_size (int): Size of batch for "bae" replacement method.
+        batch_size (int): Number of texts passed to the masked language model at once.
     """
 
     def __init__(
@@ -117,7 +117,16 @@ class WordSwapMaskedLM(WordSwap):
                 index, self._lm_tokenizer.mask_token
             )
             masked_texts.append(masked_text.text)
+        return self._bae_replacement_words_for_masked_texts(masked_texts)
 
+    def _bae_replacement_words_for_masked_texts(self, masked_texts):
+        """Get replacement words for the masked word of each of
+        ``masked_texts``, running the masked language model in batches of
+        ``self.batch_size``.
+
+        Args:
+            masked_texts (list[str]): Texts where the word to replace is replaced by the mask token.
+        """
         i = 0
         # 2-D list where for each index to modify we have a list of replacement words
         replacement_words = []
@@ -127,177 +136,315 @@ class WordSwapMaskedLM(WordSwap):
             with torch.no_grad():
                 preds = self._language_model(**inputs)[0]
 
-            for j in range(len(ids)):
-                try:
-                    # Need try-except b/c mask-token located past max_length might be truncated by tokenizer
-                    masked_index = ids[j].index(self._lm_tokenizer.mask_token_id)
-                except ValueError:
-                    replacement_words.append([])
-                    continue
-
-                mask_token_logits = preds[j, masked_index]
-                mask_token_probs = torch.softmax(mask_token_logits, dim=0)
-                ranked_indices = torch.argsort(mask_token_probs, descending=True)
-                top_words = []
-                for _id in ranked_indices:
-                    _id = _id.item()
-                    word = self._lm_tokenizer.convert_ids_to_tokens(_id)
-                    if utils.check_if_subword(
-                        word,
-                        self._language_model.config.model_type,
-                        (masked_index == 1),
-                    ):
-                        word = utils.strip_BPE_artifacts(
-                            word, self._language_model.config.model_type
-                        )
-                    if (
-                        mask_token_probs[_id] >= self.min_confidence
-                        and utils.is_one_word(word)
-                        and not utils.check_if_punctuations(word)
-                    ):
-                        top_words.append(word)
-
-                    if (
-                        len(top_words) >= self.max_candidates
-                        or mask_token_probs[_id] < self.min_confidence
-                    ):
-                        break
-
-                replacement_words.append(top_words)
+            replacement_words.extend(
+                utils.masked_lm_batch_top_words(
+                    ids,
+                    preds,
+                    self._lm_tokenizer,
+                    self._language_model.config.model_type,
+                    self.max_candidates,
+                    self.min_confidence,
+                )
+            )
 
             i += self.batch_size
 
         return replacement_words
 
+    def _bert_attack_target_positions(self, current_text, indices_to_modify):
+        """Returns, for each index to modify, the positions of the tokens of
+        its word in the encoded ``current_text``, or an empty list if they
+        were truncated."""
+        # We need to find which BPE tokens belong to the words we want to replace,
+        # so we tokenize all the masked texts and all the target words at once.
+        masked_texts = [
+            current_text.replace_word_at_index(
+                index, self._lm_tokenizer.mask_token
+            ).text
+            for index in indices_to_modify
+        ]
+        masked_ids = self._lm_tokenizer(
+            masked_texts, max_length=self.max_length, truncation=True
+        )["input_ids"]
+        word_tokens = self._lm_tokenizer(
+            [current_text.words[index] for index in indices_to_modify],
+            add_special_tokens=False,
+        )["input_ids"]
+
+        target_positions = []
+        for i in range(len(indices_to_modify)):
+            try:
+                # Need try-except b/c mask-token located past max_length might be truncated by tokenizer
+                masked_index = masked_ids[i].index(self._lm_tokenizer.mask_token_id)
+            except ValueError:
+                target_positions.append([])
+                continue
+            target_positions.append(
+                list(
+                    range(
+                        masked_index,
+                        min(masked_index + len(word_tokens[i]), self.max_length),
+                    )
+                )
+            )
+        return target_positions
+
     def _bert_attack_replacement_words(
         self,
         current_text,
-        index,
+        indices_to_modify,
+        target_positions,
+        positions,
         id_preds,
-        masked_lm_logits,
+        top_log_probs,
     ):
-        """Get replacement words for the word we want to replace using BERT-
+        """Get replacement words for the words we want to replace using BERT-
         Attack method.
 
         Args:
             current_text (AttackedText): Text we want to get replacements for.
-            index (int): index of word we want to replace
-            id_preds (torch.Tensor): N x K tensor of top-K ids for each token-position predicted by the masked language model.
-                N is equivalent to `self.max_length`.
-            masked_lm_logits (torch.Tensor): N x V tensor of the raw logits outputted by the masked language model.
-                N is equivlaent to `self.max_length` and V is dictionary size of masked language model.
+            indices_to_modify (list[int]): indices of words we want to replace
+            target_positions (list[list[int]]): Positions of the tokens of each word to replace, as returned by
+                ``_bert_attack_target_positions``.
+            positions (list[int]): The P token-positions for which the masked language model's predictions were kept.
+            id_preds (torch.Tensor): P x K tensor of top-K ids for each of ``positions``.
+            top_log_probs (torch.Tensor): P x K tensor of the log-probability of each of ``id_preds``, as outputted by
+                the masked language model.
+        Returns:
+            2-D list where for each index to modify we have a list of replacement words
         """
-        # We need to find which BPE tokens belong to the word we want to replace
-        masked_text = current_text.replace_word_at_index(
-            index, self._lm_tokenizer.mask_token
-        )
-        current_inputs = self._encode_text(masked_text.text)
-        current_ids = current_inputs["input_ids"].tolist()[0]
-        word_tokens = self._lm_tokenizer.encode(
-            current_text.words[index], add_special_tokens=False
-        )
+        row_of_position = {position: row for row, position in enumerate(positions)}
+        replacement_words = [[] for _ in indices_to_modify]
+        # Indices (into `indices_to_modify`) of multi-token words, grouped by number of tokens
+        multi_token_words = collections.defaultdict(list)
+        for i, index in enumerate(indices_to_modify):
+            target_ids_pos = [
+                row_of_position[position] for position in target_positions[i]
+            ]
 
-        try:
-            # Need try-except b/c mask-token located past max_length might be truncated by tokenizer
-            masked_index = current_ids.index(self._lm_tokenizer.mask_token_id)
-        except ValueError:
-            return []
+            if len(target_ids_pos) == 1:
+                # Word to replace is tokenized as a single word
+                top_preds = id_preds[target_ids_pos[0]].tolist()
+                for id in top_preds:
+                    token = self._lm_tokenizer.convert_ids_to_tokens(id)
+                    if utils.is_one_word(token) and not utils.check_if_subword(
+                        token, self._language_model.config.model_type, index == 0
+                    ):
+                        replacement_words[i].append(token)
+            elif len(target_ids_pos) > 1:
+                multi_token_words[len(target_ids_pos)].append((i, target_ids_pos))
+
+        # Words tokenized as multiple sub-words: rank the combinations of the top-K
+        # sub-words of each position by their perplexity, for all words of the same length
+        # at once. Original BERT-Attack implement uses cross-entropy loss.
+        for num_tokens, words in multi_token_words.items():
+            target_ids_pos = torch.tensor([pos for _, pos in words])
+            # W x T x K tensor of the top-K ids of each of T positions of W words
+            top_preds = id_preds[target_ids_pos]
+            # W x T x K tensor of the log-probability of each of these ids
+            word_top_log_probs = top_log_probs[target_ids_pos]
+            num_combinations = top_preds.shape[-1] ** num_tokens
+
+            # Only rank as many combinations as the candidates we need, and rank more
+            # for the words whose best combinations are not all single words.
+            pending_words = list(range(len(words)))
+            num_ranked = 0
+            num_to_rank = min(self.max_candidates, num_combinations)
+            while pending_words:
+                ranked_combinations = self._top_combinations(
+                    word_top_log_probs[pending_words], num_to_rank
+                )
+                still_pending_words = []
+                for row, w in enumerate(pending_words):
+                    i = words[w][0]
+                    word_top_preds = top_preds[w].tolist()
+                    for combination in ranked_combinations[row, num_ranked:].tolist():
+                        bpe_tokens = [
+                            word_top_preds[t][k] for t, k in enumerate(combination)
+                        ]
+                        word = "".join(
+                            self._lm_tokenizer.convert_ids_to_tokens(bpe_tokens)
+                        ).replace("##", "")
+                        if utils.is_one_word(word):
+                            replacement_words[i].append(word)
+                            if len(replacement_words[i]) >= self.max_candidates:
+                                break
+                    if (
+                        len(replacement_words[i]) < self.max_candidates
+                        and num_to_rank < num_combinations
+                    ):
+                        still_pending_words.append(w)
+                pending_words = still_pending_words
+                num_ranked = num_to_rank
+                num_to_rank = min(2 * num_to_rank, num_combinations)
 
-        # List of indices of tokens that are part of the target word
-        target_ids_pos = list(
-            range(masked_index, min(masked_index + len(word_tokens), self.max_length))
-        )
+        return replacement_words
 
-        if not len(target_ids_pos):
-            return []
-        elif len(target_ids_pos) == 1:
-            # Word to replace is tokenized as a single word
-            top_preds = id_preds[target_ids_pos[0]].tolist()
-            replacement_words = []
-            for id in top_preds:
-                token = self._lm_tokenizer.convert_ids_to_tokens(id)
-                if utils.is_one_word(token) and not utils.check_if_subword(
-                    token, self._language_model.config.model_type, index == 0
-                ):
-                    replacement_words.append(token)
-            return replacement_words
-        else:
-            # Word to replace is tokenized as multiple sub-words
-            top_preds = [id_preds[i] for i in target_ids_pos]
-            products = itertools.product(*top_preds)
-            combination_results = []
-            # Original BERT-Attack implement uses cross-entropy loss
-            cross_entropy_loss = torch.nn.CrossEntropyLoss(reduction="none")
-            target_ids_pos_tensor = torch.tensor(target_ids_pos)
-            word_tensor = torch.zeros(len(target_ids_pos), dtype=torch.long)
-            for bpe_tokens in products:
-                for i in range(len(bpe_tokens)):
-                    word_tensor[i] = bpe_tokens[i]
-
-                logits = torch.index_select(masked_lm_logits, 0, target_ids_pos_tensor)
-                loss = cross_entropy_loss(logits, word_tensor)
-                perplexity = torch.exp(torch.mean(loss, dim=0)).item()
-                word = "".join(
-                    self._lm_tokenizer.convert_ids_to_tokens(word_tensor)
-                ).replace("##", "")
-                if utils.is_one_word(word):
-                    combination_results.append((word, perplexity))
-            # Sort to get top-K results
-            sorted(combination_results, key=lambda x: x[1])
-            top_replacements = [
-                x[0] for x in combination_results[: self.max_candidates]
-            ]
-            return top_replacements
+    @staticmethod
+    def _top_combinations(log_probs, num_combinations):
+        """Ranks the combinations of one of the top-K ids of each position by
+        their perplexity, without enumerating all K^T of them.
 
-    def _get_transformations(self, current_text, indices_to_modify):
-        indices_to_modify = list(indices_to_modify)
-        if self.method == "bert-attack":
-            current_inputs = self._encode_text(current_text.text)
+        Args:
+            log_probs (torch.Tensor): W x T x K tensor of the log-probability of the top-K ids of each of T positions
+                of W words.
+            num_combinations (int): Number of combinations to return for each word.
+        Returns:
+            W x N x T tensor of the N combinations with the lowest perplexity for each word, as indices into the
+            top-K ids of each position. Ties are in the order of ``itertools.product``.
+        """
+        num_words, num_tokens, num_preds = log_probs.shape
+        log_probs_sum = torch.zeros(num_words, 1, dtype=log_probs.dtype)
+        combinations = torch.zeros(num_words, 1, 0, dtype=torch.long)
+        top_ids = torch.arange(num_preds)
+        for t in range(num_tokens):
+            # Extend each kept combination with each of the top-K ids of position t.
+            log_probs_sum = (
+                log_probs_sum.unsqueeze(-1) + log_probs[:, t].unsqueeze(1)
+            ).flatten(1)
+            num_prefixes = combinations.shape[1]
+            combinations = torch.cat(
+                (
+                    combinations.unsqueeze(2).expand(-1, -1, num_preds, -1),
+                    top_ids.expand(num_words, num_prefixes, num_preds).unsqueeze(-1),
+                ),
+                dim=-1,
+            ).flatten(1, 2)
+            # Order by decreasing sum of log-probabilities, then as `itertools.product`.
+            # The first positions of each of the best combinations are among the best
+            # combinations of the first positions, so only those are kept.
+            order = torch.arange(combinations.shape[1]).expand(num_words, -1)
+            for j in reversed(range(t + 1)):
+                keys = combinations[:, :, j].gather(1, order)
+                order = order.gather(1, torch.sort(keys, dim=1, stable=True).indices)
+            ranks = torch.sort(
+                log_probs_sum.gather(1, order), dim=1, descending=True, stable=True
+            ).indices
+            order = order.gather(1, ranks)[:, :num_combinations]
+            log_probs_sum = log_probs_sum.gather(1, order)
+            combinations = combinations.gather(
+                1, order.unsqueeze(-1).expand(-1, -1, t + 1)
+            )
+        return combinations
+
+    def _bert_attack_predictions(self, current_texts, target_positions_list):
+        """Runs the masked language model over ``current_texts`` in batches of
+        ``self.batch_size``.
+
+        Yields a tuple ``(positions, id_preds, top_log_probs)`` for each
+        text, as expected by ``_bert_attack_replacement_words``. Only the
+        top-K ids and their log-probabilities at the target positions of the
+        text are kept, and each batch is only run once the texts of the
+        previous one were used.
+        """
+        for i in range(0, len(current_texts), self.batch_size):
+            batch = [text.text for text in current_texts[i : i + self.batch_size]]
+            current_inputs = self._encode_text(batch)
             with torch.no_grad():
-                pred_probs = self._language_model(**current_inputs)[0][0]
-            top_probs, top_ids = torch.topk(pred_probs, self.max_candidates)
-            id_preds = top_ids.cpu()
-            masked_lm_logits = pred_probs.cpu()
-
-            transformed_texts = []
-
-            for i in indices_to_modify:
-                word_at_index = current_text.words[i]
-                replacement_words = self._bert_attack_replacement_words(
-                    current_text,
-                    i,
-                    id_preds=id_preds,
-                    masked_lm_logits=masked_lm_logits,
+                pred_logits = self._language_model(**current_inputs)[0]
+            for j, target_positions in enumerate(
+                target_positions_list[i : i + self.batch_size]
+            ):
+                positions = sorted(
+                    {position for word in target_positions for position in word}
+                )
+                position_logits = pred_logits[j, positions]
+                top_ids = torch.topk(position_logits, self.max_candidates).indices
+                top_log_probs = torch.gather(
+                    torch.log_softmax(position_logits, dim=-1), 1, top_ids
                 )
+                yield positions, top_ids.cpu(), top_log_probs.cpu()
 
-                for r in replacement_words:
-                    r = r.strip("Ġ")
-                    if r != word_at_index:
-                        transformed_texts.append(
-                            current_text.replace_word_at_index(i, r)
-                        )
+    def _get_transformations(self, current_text, indices_to_modify):
+        return self._get_transformations_many([current_text], [indices_to_modify])[0]
 
-            return transformed_texts
+    def _get_transformations_many(self, current_texts, indices_to_modify_list):
+        indices_to_modify_list = [
+            list(indices_to_modify) for indices_to_modify in indices_to_modify_list
+        ]
+        if self.method == "bert-attack":
+            # Only texts with indices to modify need a forward pass.
+            texts_to_predict = []
+            target_positions_list = []
+            for current_text, indices_to_modify in zip(
+                current_texts, indices_to_modify_list
+            ):
+                if indices_to_modify:
+                    texts_to_predict.append(current_text)
+                    target_positions_list.append(
+                        self._bert_attack_target_positions(
+                            current_text, indices_to_modify
+                        )
+                    )
+            predictions = self._bert_attack_predictions(
+                texts_to_predict, target_positions_list
+            )
+            target_positions_list = iter(target_positions_list)
+
+            all_transformed_texts = []
+            for current_text, indices_to_modify in zip(
+                current_texts, indices_to_modify_list
+            ):
+                transformed_texts = []
+                if indices_to_modify:
+                    positions, id_preds, top_log_probs = next(predictions)
+                    replacement_words = self._bert_attack_replacement_words(
+                        current_text,
+                        indices_to_modify,
+                        next(target_positions_list),
+                        positions,
+                        id_preds,
+                        top_log_probs,
+                    )
+                    for i, words in zip(indices_to_modify, replacement_words):
+                        word_at_index = current_text.words[i]
+                        for r in words:
+                            r = r.strip("Ġ")
+                            if r != word_at_index:
+                                transformed_texts.append(
+                                    current_text.replace_word_at_index(i, r)
+                                )
+                all_transformed_texts.append(transformed_texts)
+
+            return all_transformed_texts
 
         elif self.method == "bae":
-            replacement_words = self._bae_replacement_words(
-                current_text, indices_to_modify
+            # Mask every index of every text, so that the masked language model
+            # runs over all of them in as few batches as possible.
+            masked_texts = []
+            for current_text, indices_to_modify in zip(
+                current_texts, indices_to_modify_list
+            ):
+                for index in indices_to_modify:
+                    masked_text = current_text.replace_word_at_index(
+                        index, self._lm_tokenizer.mask_token
+                    )
+                    masked_texts.append(masked_text.text)
+            replacement_words = iter(
+                self._bae_replacement_words_for_masked_texts(masked_texts)
             )
-            transformed_texts = []
-            for i in range(len(replacement_words)):
-                index_to_modify = indices_to_modify[i]
-                word_at_index = current_text.words[index_to_modify]
-                for word in replacement_words[i]:
-                    word = word.strip("Ġ")
-                    if (
-                        word != word_at_index
-                        and re.search("[a-zA-Z]", word)
-                        and len(utils.words_from_text(word)) == 1
-                    ):
-                        transformed_texts.append(
-                            current_text.replace_word_at_index(index_to_modify, word)
-                        )
-            return transformed_texts
+
+            all_transformed_texts = []
+            for current_text, indices_to_modify in zip(
+                current_texts, indices_to_modify_list
+            ):
+                transformed_texts = []
+                for index_to_modify in indices_to_modify:
+                    word_at_index = current_text.words[index_to_modify]
+                    for word in next(replacement_words):
+                        word = word.strip("Ġ")
+                        if (
+                            word != word_at_index
+                            and re.search("[a-zA-Z]", word)
+                            and len(utils.words_from_text(word)) == 1
+                        ):
+                            transformed_texts.append(
+                                current_text.replace_word_at_index(
+                                    index_to_modify, word
+                                )
+                            )
+                all_transformed_texts.append(transformed_texts)
+            return all_transformed_texts
         else:
             raise ValueError(f"Unrecognized value {self.method} for `self.method`.")
 